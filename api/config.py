@@ -8,6 +8,8 @@ Variables opcionales:
     API_ACCESS_TOKEN_MINUTES=480   # token de sesión (default 8 hs)
     API_PREAUTH_TOKEN_MINUTES=5    # tokens intermedios (2FA, cambio de clave)
     API_SETUP_2FA_TOKEN_MINUTES=10 # token de configuración de 2FA (lleva el secret)
+    API_CACHE_USUARIOS_SEGUNDOS=30 # caché del usuario autenticado (0 = sin caché)
+    API_CACHE_USUARIOS_MAX=1024    # usuarios retenidos en esa caché
 """
 
 import os
@@ -20,6 +22,8 @@ API_SECRET_KEY = os.environ.get("API_SECRET_KEY", "")
 ACCESS_TOKEN_MINUTES = int(os.environ.get("API_ACCESS_TOKEN_MINUTES", "480"))
 PREAUTH_TOKEN_MINUTES = int(os.environ.get("API_PREAUTH_TOKEN_MINUTES", "5"))
 SETUP_2FA_TOKEN_MINUTES = int(os.environ.get("API_SETUP_2FA_TOKEN_MINUTES", "10"))
+CACHE_USUARIOS_SEGUNDOS = int(os.environ.get("API_CACHE_USUARIOS_SEGUNDOS", "30"))
+CACHE_USUARIOS_MAX = int(os.environ.get("API_CACHE_USUARIOS_MAX", "1024"))
 JWT_ALGORITHM = "HS256"
 
 
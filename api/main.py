@@ -11,7 +11,7 @@ de models.py, database.py y utils/):
 from fastapi import FastAPI
 
 from api import config
-from api.routers import auth, clientes
+from api.routers import auth, clientes, cobros, simulaciones
 
 config.validar_config()
 
@@ -23,6 +23,8 @@ app = FastAPI(
 
 app.include_router(auth.router)
 app.include_router(clientes.router)
+app.include_router(simulaciones.router)
+app.include_router(cobros.router)
 
 
 @app.get("/health", tags=["infra"])
@@ -28,8 +28,9 @@ MENSAJE_CREDENCIALES = "Usuario o contraseña incorrectos"
 
 
 @router.post("/login", response_model=LoginResponse, response_model_exclude_none=True)
-def login(datos: LoginRequest) -> LoginResponse:
-    resultado = auth_service.login(datos.usuario, datos.password)
+async def login(datos: LoginRequest) -> LoginResponse:
+    # async: el hash se espera sin ocupar un hilo del threadpool (ver auth_service)
+    resultado = await auth_service.login_async(datos.usuario, datos.password)
 
     if resultado.status == auth_service.STATUS_INVALID:
         # Mensaje genérico: no revelar si falló el usuario o la contraseña
@@ -0,0 +1,43 @@
+"""Endpoints de cobros: imputación de un pago a las cuotas de una venta."""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from api.deps import get_current_user
+from api.schemas import CobroCreate, CobroResponse
+from api.services import cobros_service
+from api.services.auth_service import UsuarioActual
+
+router = APIRouter(
+    prefix="/ventas",
+    tags=["cobros"],
+    dependencies=[Depends(get_current_user)],
+)
+
+
+@router.post(
+    "/{venta_id}/cobros",
+    response_model=CobroResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+def registrar_cobro(
+    venta_id: int,
+    datos: CobroCreate,
+    usuario: UsuarioActual = Depends(get_current_user),
+) -> CobroResponse:
+    try:
+        resultado = cobros_service.registrar(venta_id, datos.model_dump(), usuario.id)
+    except cobros_service.VentaNoEncontrada:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Venta no encontrada"
+        )
+    except cobros_service.VentaNoCobrable:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="La venta está anulada o finalizada y no admite cobros.",
+        )
+    except cobros_service.MontoInvalido:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="El monto debe ser de al menos $ 0,01.",
+        )
+    return CobroResponse(**resultado)
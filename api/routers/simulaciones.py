@@ -0,0 +1,40 @@
+"""Endpoints de simulación de cuotas (cotizador de mostrador)."""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from api.deps import get_current_user
+from api.schemas import SimulacionResponse
+from api.services import simulaciones_service
+from utils.cotizador import N_CUOTAS_MAX
+
+router = APIRouter(
+    prefix="/simulaciones",
+    tags=["simulaciones"],
+    dependencies=[Depends(get_current_user)],
+)
+
+
+@router.get("/productos/{producto_id}", response_model=SimulacionResponse)
+def simular_producto(
+    producto_id: int,
+    monto: float = Query(gt=0, description="Monto a financiar"),
+    plan: str = Query(default="mensual", description="mensual, semanal o diaria"),
+    max_cuotas: int = Query(default=N_CUOTAS_MAX, ge=1, le=N_CUOTAS_MAX),
+) -> SimulacionResponse:
+    try:
+        simulacion = simulaciones_service.simular(producto_id, monto, plan, max_cuotas)
+    except simulaciones_service.ProductoSinTasa:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="El producto no tiene TEM base cargada.",
+        )
+    except simulaciones_service.PlanDesconocido:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Plan de pago desconocido (mensual, semanal o diaria).",
+        )
+    if simulacion is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado"
+        )
+    return SimulacionResponse(**simulacion)
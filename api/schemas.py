@@ -127,3 +127,47 @@ class ClienteListResponse(BaseModel):
     total: int
     pagina: int
     tamanio: int
+
+
+# --- Simulaciones ---
+
+class OpcionCuotas(BaseModel):
+    n_cuotas: int
+    cuota: float
+    ptf: float
+
+
+class SimulacionResponse(BaseModel):
+    producto_id: int
+    producto: str
+    tem: float = Field(description="TEM base del producto, en porcentaje")
+    plan_pago: str
+    monto: float
+    opciones: List[OpcionCuotas]
+
+
+# --- Cobros ---
+
+class CobroCreate(BaseModel):
+    monto: float = Field(gt=0)
+    fecha: Optional[date] = Field(default=None, description="Por defecto, hoy")
+    tipo: str = Field(default="CUOTA", max_length=20)
+    metodo: Optional[str] = Field(default=None, max_length=30)
+    lugar: Optional[str] = Field(default=None, max_length=30)
+    comprobante: Optional[str] = Field(default=None, max_length=50)
+    observaciones: Optional[str] = None
+
+
+class ImputacionCuota(BaseModel):
+    cuota_id: int
+    numero: int
+    monto: float
+    pagada: bool
+
+
+class CobroResponse(BaseModel):
+    venta_id: int
+    aplicado: float
+    sobrante: float = Field(description="Parte del monto que excede el saldo y no se imputó")
+    venta_saldada: bool
+    imputaciones: List[ImputacionCuota]
@@ -1,51 +1,50 @@
 """
-Servicio de autenticación.
-
-Replica EXACTAMENTE la lógica de verificar_credenciales (gui/login_form.py),
-en el mismo orden de pasos, incluyendo:
-  - error genérico único para usuario inexistente / inactivo / password mala,
-  - bloqueo por 5 intentos fallidos durante 15 minutos,
-  - migración transparente de hashes legacy SHA-256 → Argon2id,
-  - expiración de contraseña a los 60 días / must_change_password,
-  - política 2FA: global (SystemSetting) OR por usuario OR TOTP ya configurado.
-
-Fidelidad al flujo original: last_login_at / previous_login_at se actualizan
-ANTES de la verificación 2FA (paso 8 antes del 9), igual que la desktop app.
-
-Reusa models.py, database.py y utils/security.py de la raíz del proyecto:
-NO duplica lógica de hashing ni de acceso a datos.
+Servicio de autenticación de la API.
+
+El login (bloqueo, Argon2, migración de hash, vencimiento, marcas de
+acceso, política 2FA) es el de services/auth.py, el mismo que usa la
+desktop app; acá se le suma:
+  - login_async: el request espera el hash (paso 4, en el ejecutor
+    acotado de utils.security) sin ocupar un hilo del threadpool, y las
+    dos sesiones (buscar y registrar) van al threadpool,
+  - el descarte de la caché de usuarios cuando inicia sesión uno dado de baja.
+
+obtener_usuario_actual (cada request autenticado) responde desde una caché
+LRU con TTL por usuario; los servicios de este módulo que cambian la
+contraseña o el 2FA la invalidan. Una baja hecha desde el escritorio (otro
+proceso) se aplica al vencer el TTL (config.CACHE_USUARIOS_SEGUNDOS).
+
+Las marcas de tiempo son UTC sin zona, como en services/auth.py.
 """
 
+import asyncio
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Optional
 
 import pyotp
-from sqlalchemy.orm import joinedload
+from starlette.concurrency import run_in_threadpool
 
+from api import config
 from database import get_session
-from models import Usuario, get_setting
-from utils.security import hash_password, verify_password
-
-# Mismas constantes que la desktop app (gui/login_form.py)
-PASSWORD_MAX_AGE_DAYS = 60
-LOCK_THRESHOLD = 5
-LOCK_MINUTES = 15
-
-# Estados posibles del intento de login
-STATUS_OK = "ok"
-STATUS_INVALID = "invalid"
-STATUS_LOCKED = "locked"
-STATUS_PASSWORD_CHANGE = "password_change_required"
-STATUS_2FA_SETUP = "2fa_setup_required"
-STATUS_2FA_REQUIRED = "2fa_required"
-
-
-@dataclass
-class LoginResult:
-    status: str
-    usuario_id: Optional[int] = None
-    minutos_restantes: Optional[int] = None
+from models import Usuario
+from services import auth
+from services.auth import (  # noqa: F401  (los routers los usan desde acá)
+    LOCK_MINUTES,
+    LOCK_THRESHOLD,
+    PASSWORD_MAX_AGE_DAYS,
+    STATUS_2FA_REQUIRED,
+    STATUS_2FA_SETUP,
+    STATUS_INVALID,
+    STATUS_LOCKED,
+    STATUS_OK,
+    STATUS_PASSWORD_CHANGE,
+    LoginResult,
+)
+from utils.security import hash_executor, hash_password
 
 
 @dataclass
@@ -63,97 +62,21 @@ class UsuarioActual:
     activo: bool
 
 
-def _require_2fa_global(session) -> bool:
-    """Lee la política global de 2FA desde SystemSetting.
-
-    Normaliza valores tipo "1"/"true"/"True" a booleano.
-    """
-    valor = get_setting(session, "require_2fa_global", "0")
-    return str(valor).strip().lower() in ("1", "true", "si", "sí")
-
-
 def login(nombre_usuario: str, password: str) -> LoginResult:
-    ahora = datetime.now()
-
-    with get_session() as session:
-        # Paso 1: buscar por NOMBRE (no email), con eager loading
-        usuario = (
-            session.query(Usuario)
-            .options(
-                joinedload(Usuario.permisos),
-                joinedload(Usuario.rol),
-                joinedload(Usuario.personal),
-            )
-            .filter(Usuario.nombre == nombre_usuario)
-            .first()
-        )
+    """services.auth.login; un usuario dado de baja sale de la caché."""
+    return auth.login(nombre_usuario, password, al_inactivo=invalidar_usuario)
 
-        # Paso 2: inexistente o inactivo → error genérico (no revelar cuál falló)
-        if usuario is None or not usuario.activo:
-            return LoginResult(status=STATUS_INVALID)
-
-        # Paso 3: cuenta bloqueada
-        if usuario.lock_until and usuario.lock_until > ahora:
-            restantes = int((usuario.lock_until - ahora).total_seconds() // 60) + 1
-            return LoginResult(status=STATUS_LOCKED, minutos_restantes=restantes)
-
-        # Paso 4: verificar contraseña (Argon2id o legacy SHA-256)
-        ok, legacy = verify_password(password, usuario.password)
-
-        # Paso 5: contraseña incorrecta → contar intentos y bloquear si corresponde
-        if not ok:
-            usuario.failed_attempts = (usuario.failed_attempts or 0) + 1
-            if usuario.failed_attempts >= LOCK_THRESHOLD:
-                usuario.failed_attempts = 0
-                usuario.lock_until = ahora + timedelta(minutes=LOCK_MINUTES)
-                session.commit()
-                return LoginResult(
-                    status=STATUS_LOCKED, minutos_restantes=LOCK_MINUTES
-                )
-            session.commit()
-            return LoginResult(status=STATUS_INVALID)
-
-        # Paso 6: contraseña correcta → resetear contadores y migrar hash legacy
-        usuario.failed_attempts = 0
-        usuario.lock_until = None
-        if legacy:
-            usuario.password = hash_password(password)
-            if usuario.last_password_change is None:
-                usuario.last_password_change = ahora
-
-        # Paso 7: cambio de contraseña obligatorio o vencida (>= 60 días)
-        vencida = (
-            usuario.last_password_change is not None
-            and (ahora - usuario.last_password_change).days >= PASSWORD_MAX_AGE_DAYS
-        )
-        if usuario.must_change_password or vencida:
-            session.commit()  # persistir reset de intentos y migración de hash
-            return LoginResult(
-                status=STATUS_PASSWORD_CHANGE, usuario_id=usuario.id
-            )
-
-        # Paso 8: actualizar marcas de login (antes del 2FA, igual que la desktop app)
-        usuario.previous_login_at = usuario.last_login_at
-        usuario.last_login_at = ahora
-
-        # Paso 9: política de 2FA
-        need_token = (
-            _require_2fa_global(session)
-            or bool(usuario.require_2fa)
-            or (bool(usuario.totp_enabled) and bool(usuario.totp_secret))
-        )
-
-        session.commit()
-
-        if need_token:
-            # Paso 10: exige 2FA pero no está configurado → setup pendiente
-            if not (usuario.totp_enabled and usuario.totp_secret):
-                return LoginResult(status=STATUS_2FA_SETUP, usuario_id=usuario.id)
-            # Paso 11: exigir código de 6 dígitos (segundo paso vía /auth/verify-2fa)
-            return LoginResult(status=STATUS_2FA_REQUIRED, usuario_id=usuario.id)
 
-        # Paso 12: login completo
-        return LoginResult(status=STATUS_OK, usuario_id=usuario.id)
+async def login_async(nombre_usuario: str, password: str) -> LoginResult:
+    """Igual que login, pero el request espera el hash sin ocupar un hilo del threadpool."""
+    ahora = datetime.utcnow()
+    datos = await run_in_threadpool(auth.login_buscar, nombre_usuario, ahora, invalidar_usuario)
+    if isinstance(datos, LoginResult):
+        return datos
+    ok, hash_nuevo = await asyncio.get_running_loop().run_in_executor(
+        hash_executor(), auth.login_verificar, datos, password
+    )
+    return await run_in_threadpool(auth.login_registrar, datos, ok, hash_nuevo, ahora)
 
 
 def verificar_codigo_2fa(usuario_id: int, code: str) -> bool:
@@ -173,15 +96,39 @@ def verificar_codigo_2fa(usuario_id: int, code: str) -> bool:
         return bool(totp.verify(code, valid_window=1))
 
 
+# usuario_id -> (vence, UsuarioActual); el orden es el de uso (LRU)
+_cache_usuarios: "OrderedDict[int, tuple]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def invalidar_usuario(usuario_id: Optional[int] = None) -> None:
+    """Saca al usuario (o a todos) de la caché de obtener_usuario_actual."""
+    with _cache_lock:
+        if usuario_id is None:
+            _cache_usuarios.clear()
+        else:
+            _cache_usuarios.pop(usuario_id, None)
+
+
 def obtener_usuario_actual(usuario_id: int) -> Optional[UsuarioActual]:
     """Carga el usuario para endpoints protegidos. Devuelve None si no existe
     o está inactivo (un token válido de un usuario desactivado no debe servir).
+    Los usuarios válidos se cachean; los None no, para no demorar una reactivación.
     """
+    ahora = time.monotonic()
+    with _cache_lock:
+        entrada = _cache_usuarios.get(usuario_id)
+        if entrada is not None:
+            if entrada[0] > ahora:
+                _cache_usuarios.move_to_end(usuario_id)
+                return entrada[1]
+            del _cache_usuarios[usuario_id]
+
     with get_session() as session:
         usuario = session.get(Usuario, usuario_id)
         if usuario is None or not usuario.activo:
             return None
-        return UsuarioActual(
+        actual = UsuarioActual(
             id=usuario.id,
             nombre=usuario.nombre,
             email=usuario.email,
@@ -189,6 +136,14 @@ def obtener_usuario_actual(usuario_id: int) -> Optional[UsuarioActual]:
             activo=usuario.activo,
         )
 
+    if config.CACHE_USUARIOS_SEGUNDOS > 0:
+        with _cache_lock:
+            _cache_usuarios[usuario_id] = (ahora + config.CACHE_USUARIOS_SEGUNDOS, actual)
+            _cache_usuarios.move_to_end(usuario_id)
+            while len(_cache_usuarios) > config.CACHE_USUARIOS_MAX:
+                _cache_usuarios.popitem(last=False)
+    return actual
+
 
 # ---------------------------------------------------------------------------
 # Fase 2 / Sesión 2: cambio de contraseña y configuración de 2FA
@@ -215,10 +170,6 @@ def cambiar_password(usuario_id: int, nueva_password: str) -> str:
       - no puede contener el nombre de usuario (case-insensitive),
       - al guardar: hash Argon2, last_password_change=utcnow(),
         must_change_password=False, failed_attempts=0, lock_until=None.
-
-    Nota de fidelidad: se usa datetime.utcnow() porque es lo que escribe la
-    desktop app (aunque el login compara con now() local; desfase de horas,
-    irrelevante para el umbral de 60 días — pendiente de unificar).
     """
     pwd = (nueva_password or "").strip()
 
@@ -239,7 +190,8 @@ def cambiar_password(usuario_id: int, nueva_password: str) -> str:
         usuario.failed_attempts = 0
         usuario.lock_until = None
         session.commit()
-        return PW_OK
+    invalidar_usuario(usuario_id)
+    return PW_OK
 
 
 def iniciar_setup_2fa(usuario_id: int):
@@ -280,7 +232,8 @@ def confirmar_setup_2fa(usuario_id: int, secret: str, code: str) -> bool:
         usuario.totp_secret = secret
         usuario.totp_enabled = True
         session.commit()
-        return True
+    invalidar_usuario(usuario_id)
+    return True
 
 
 def desactivar_2fa(usuario_id: int) -> str:
@@ -300,4 +253,5 @@ def desactivar_2fa(usuario_id: int) -> str:
         usuario.totp_enabled = False
         usuario.totp_secret = None
         session.commit()
-        return DIS_OK
+    invalidar_usuario(usuario_id)
+    return DIS_OK
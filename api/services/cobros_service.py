@@ -0,0 +1,38 @@
+"""
+Servicio de cobros de la API.
+
+La imputación (lock de la venta, reparto en centavos, inserción en lote)
+es la misma que usa el escritorio: services/cobros.py. Acá sólo se adapta
+el resultado a los tipos del contrato HTTP.
+"""
+
+from datetime import date
+from typing import Optional
+
+from services import cobros
+from services.cobros import MontoInvalido, VentaNoCobrable, VentaNoEncontrada  # noqa: F401
+
+
+def registrar(venta_id: int, datos: dict, usuario_id: Optional[int]) -> dict:
+    """Imputa el cobro; propaga VentaNoEncontrada / VentaNoCobrable / MontoInvalido."""
+    r = cobros.registrar_cobro(
+        venta_id,
+        datos["monto"],
+        datos.get("fecha") or date.today(),
+        tipo=datos.get("tipo") or "CUOTA",
+        metodo=datos.get("metodo"),
+        lugar=datos.get("lugar"),
+        comprobante=datos.get("comprobante"),
+        observaciones=datos.get("observaciones"),
+        registrado_por_id=usuario_id,
+    )
+    return {
+        "venta_id": r.venta_id,
+        "aplicado": float(r.aplicado),
+        "sobrante": float(r.sobrante),
+        "venta_saldada": r.venta_saldada,
+        "imputaciones": [
+            {"cuota_id": cuota_id, "numero": numero, "monto": float(monto), "pagada": pagada}
+            for cuota_id, numero, monto, pagada in r.imputaciones
+        ],
+    }
@@ -0,0 +1,49 @@
+"""
+Servicio de simulaciones: tabla de cuotas de un producto para un monto.
+
+Las cuotas salen de la matriz de cotización precalculada del producto
+(utils/cotizador.py), que se reconstruye sola cuando cambia su tem_base.
+"""
+
+from typing import Optional
+
+from database import get_session
+from models import Producto
+from utils import cotizador
+
+
+class ProductoSinTasa(Exception):
+    """El producto no tiene tem_base cargada y no se puede cotizar."""
+
+
+class PlanDesconocido(Exception):
+    """El plan de pago no es 'mensual', 'semanal' ni 'diaria'."""
+
+
+def simular(producto_id: int, monto: float, plan: str, max_cuotas: int) -> Optional[dict]:
+    """Devuelve None si el producto no existe."""
+    with get_session() as session:
+        producto = session.get(Producto, producto_id)
+        if producto is None:
+            return None
+        if producto.tem_base is None:
+            raise ProductoSinTasa()
+        nombre = producto.nombre
+        tem_base = float(producto.tem_base)
+
+    matriz = cotizador.obtener_matriz(producto_id, tem_base)
+    try:
+        cuotas = matriz.tabla(plan, [monto])[0][:max_cuotas]
+    except ValueError as exc:
+        raise PlanDesconocido() from exc
+    return {
+        "producto_id": producto_id,
+        "producto": nombre,
+        "tem": round(tem_base * 100, 4),
+        "plan_pago": plan,
+        "monto": monto,
+        "opciones": [
+            {"n_cuotas": n, "cuota": round(float(c), 2), "ptf": round(float(c) * n, 2)}
+            for n, c in enumerate(cuotas, start=1)
+        ],
+    }
@@ -0,0 +1,180 @@
+"""
+backfill_tasas_ventas.py — Audita y recalcula TEM/TNA/TEA de las ventas a partir de su cuota.
+
+Para cada venta toma (monto, valor_cuota, num_cuotas, plan_pago), obtiene la
+tasa efectiva implícita en la cuota (sistema francés, Newton vectorizado sobre
+toda la tabla) y la compara con la TEM/TNA/TEA guardadas.
+
+Por defecto sólo informa (auditoría). Con --aplicar reescribe tem/tna/tea
+(en porcentaje, como las guarda FormVenta) de las ventas con diferencias.
+Es idempotente: una segunda corrida ya no encuentra diferencias.
+
+Uso:
+    python backfill_tasas_ventas.py                     # auditoría
+    python backfill_tasas_ventas.py --csv auditoria.csv # auditoría + detalle en CSV
+    python backfill_tasas_ventas.py --aplicar           # recalcula y guarda
+"""
+
+import argparse
+import csv
+import os
+import sys
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import numpy as np
+import sqlalchemy as sa
+
+from database import engine
+from models import Venta
+from utils.finanzas import tna_desde_tem, tea_desde_tem
+from utils.finanzas_lote import tasas_desde_cuotas, tems_desde_tasas_periodo
+
+DB_NAME = os.getenv("DB_NAME", "")
+DB_TEST = "credanzadb_test"
+
+# Diferencia mínima (en puntos porcentuales de TEM) para considerar que una venta difiere
+TOLERANCIA_PP = 0.001
+LOTE_UPDATE = 1000
+
+
+# ── Confirmación para producción ───────────────────────────────────────────────
+
+def confirmar_si_produccion():
+    if DB_NAME == DB_TEST:
+        print(f"ℹ  Base de datos de test detectada ({DB_TEST}). Continuando sin confirmación.\n")
+        return
+
+    print()
+    print("=" * 60)
+    print("  ⚠️  ATENCIÓN: BASE DE DATOS DE PRODUCCIÓN")
+    print("=" * 60)
+    print(f"  Base apuntada: {DB_NAME}")
+    print()
+    print("  Esta operación va a:")
+    print("    • Reescribir tem/tna/tea de las ventas cuya tasa guardada no")
+    print("      coincide con la implícita en su valor de cuota")
+    print()
+    print("  ASEGURATE de tener un dump completo de la base antes de continuar.")
+    print("  Ejemplo:  mysqldump -u root -p credanzadb > backup_pre_backfill_tasas.sql")
+    print()
+    respuesta = input("  Para confirmar, escribí exactamente CONFIRMAR: ").strip()
+    if respuesta != "CONFIRMAR":
+        print("\n  Operación cancelada. No se aplicó ningún cambio.")
+        sys.exit(0)
+    print()
+
+
+# ── Cálculo ───────────────────────────────────────────────────────────────────
+
+def leer_ventas(conn):
+    """Lee sólo las columnas necesarias de todas las ventas, en una consulta."""
+    filas = conn.execute(
+        sa.select(
+            Venta.id, Venta.monto, Venta.valor_cuota, Venta.num_cuotas,
+            Venta.plan_pago, Venta.tem,
+        ).order_by(Venta.id)
+    ).all()
+    if not filas:
+        return None
+    ids, montos, cuotas, n, planes, tems = zip(*filas)
+    a_float = lambda xs: np.array([np.nan if x is None else float(x) for x in xs])
+    return {
+        "id": np.array(ids),
+        "monto": a_float(montos),
+        "valor_cuota": a_float(cuotas),
+        "num_cuotas": a_float(n),
+        "plan_pago": np.array([p or "mensual" for p in planes], dtype=object),
+        "tem_guardada": a_float(tems),
+    }
+
+
+def calcular_tasas_implicitas(datos):
+    """Devuelve la TEM implícita de cada venta, en porcentaje (NaN si no hay solución)."""
+    tasas = tasas_desde_cuotas(datos["monto"], datos["valor_cuota"], datos["num_cuotas"])
+    con_tasa = np.isfinite(tasas)
+    tems = np.full(tasas.shape, np.nan)
+    tems[con_tasa] = tems_desde_tasas_periodo(tasas[con_tasa], datos["plan_pago"][con_tasa])
+    return tems * 100
+
+
+def aplicar(conn, ids, tems_pct):
+    filas = [
+        {
+            "vid": int(vid),
+            "tem": round(float(tem), 4),
+            "tna": round(tna_desde_tem(tem / 100) * 100, 4),
+            "tea": round(tea_desde_tem(tem / 100) * 100, 4),
+        }
+        for vid, tem in zip(ids, tems_pct)
+    ]
+    stmt = sa.text("UPDATE ventas SET tem = :tem, tna = :tna, tea = :tea WHERE id = :vid")
+    for desde in range(0, len(filas), LOTE_UPDATE):
+        conn.execute(stmt, filas[desde:desde + LOTE_UPDATE])
+    return len(filas)
+
+
+# ── Main ───────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="Auditoría / back-fill de TEM, TNA y TEA de ventas.")
+    parser.add_argument("--aplicar", action="store_true", help="guardar las tasas recalculadas")
+    parser.add_argument("--csv", help="escribir el detalle de las ventas con diferencias")
+    args = parser.parse_args()
+
+    print()
+    print("═══════════════════════════════════════════════════")
+    print("  BACK-FILL: TEM/TNA/TEA implícitas en ventas")
+    print("═══════════════════════════════════════════════════")
+    print()
+
+    if args.aplicar:
+        confirmar_si_produccion()
+
+    with engine.connect() as conn:
+        datos = leer_ventas(conn)
+        if datos is None:
+            print("   · No hay ventas cargadas, sin acción")
+            return
+
+        tems = calcular_tasas_implicitas(datos)
+        sin_solucion = ~np.isfinite(tems)
+        guardada = datos["tem_guardada"]
+        difiere = ~sin_solucion & (
+            ~np.isfinite(guardada) | (np.abs(tems - np.nan_to_num(guardada)) > TOLERANCIA_PP)
+        )
+
+        print(f"   Ventas analizadas:            {len(tems)}")
+        print(f"   Sin tasa posible (datos):     {int(sin_solucion.sum())}")
+        print(f"   Con TEM distinta a la cuota:  {int(difiere.sum())}")
+
+        if args.csv:
+            with open(args.csv, "w", newline="", encoding="utf-8") as f:
+                w = csv.writer(f, delimiter=";")
+                w.writerow(["venta_id", "plan_pago", "monto", "valor_cuota", "num_cuotas",
+                            "tem_guardada_pct", "tem_implicita_pct"])
+                for idx in np.flatnonzero(difiere | sin_solucion):
+                    w.writerow([
+                        int(datos["id"][idx]), datos["plan_pago"][idx], datos["monto"][idx],
+                        datos["valor_cuota"][idx], datos["num_cuotas"][idx],
+                        "" if np.isnan(guardada[idx]) else round(guardada[idx], 4),
+                        "" if np.isnan(tems[idx]) else round(tems[idx], 4),
+                    ])
+            print(f"   Detalle escrito en {args.csv}")
+
+        if not args.aplicar:
+            print()
+            print("ℹ  Auditoría solamente. Usá --aplicar para guardar las tasas recalculadas.")
+            return
+
+        n = aplicar(conn, datos["id"][difiere], tems[difiere])
+        conn.commit()
+
+    print()
+    print(f"✅ Back-fill completado: {n} ventas actualizadas.")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+calibrar_argon2.py — Elige los parámetros de Argon2id para ESTE servidor.
+
+Mide cuánto tarda un hash con distintas combinaciones de memoria y
+pasadas (time_cost), con el paralelismo configurado, y sugiere la más
+costosa que no pase del objetivo por login. También mide cuánto tarda un
+login cuando llegan ARGON2_CONCURRENCIA a la vez (lo que ve cada usuario
+en la ráfaga de la mañana).
+
+Los valores sugeridos se copian al entorno de la API y del escritorio:
+
+    ARGON2_TIME_COST, ARGON2_MEMORY_KIB, ARGON2_PARALLELISM
+
+Los hashes existentes siguen verificando; se rehacen con los parámetros
+nuevos la próxima vez que cada usuario inicia sesión.
+
+Uso:
+    python calibrar_argon2.py                    # objetivo 250 ms por hash
+    python calibrar_argon2.py --objetivo-ms 400
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from passlib.hash import argon2
+
+from utils.security import ARGON2_CONCURRENCIA, ARGON2_PARALLELISM
+
+MEMORIAS_KIB = (19456, 32768, 65536, 131072)
+MAX_TIME_COST = 10
+REPETICIONES = 3
+
+
+def medir_ms(hasher, repeticiones=REPETICIONES) -> float:
+    """Mediana de los ms que tarda un hash (el primero, de calentamiento, no cuenta)."""
+    hasher.hash("calibracion")
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        hasher.hash("calibracion")
+        tiempos.append((time.perf_counter() - t0) * 1000)
+    return sorted(tiempos)[len(tiempos) // 2]
+
+
+def medir_rafaga_ms(hasher, concurrentes: int) -> float:
+    """Ms hasta terminar 'concurrentes' hashes lanzados a la vez."""
+    with ThreadPoolExecutor(max_workers=concurrentes) as ejecutor:
+        t0 = time.perf_counter()
+        list(ejecutor.map(lambda _: hasher.hash("calibracion"), range(concurrentes)))
+    return (time.perf_counter() - t0) * 1000
+
+
+def calibrar(objetivo_ms: float, paralelismo: int) -> list:
+    """Devuelve [(memoria_kib, time_cost, ms)] de todas las combinaciones medidas."""
+    medidas = []
+    for memoria in MEMORIAS_KIB:
+        for time_cost in range(1, MAX_TIME_COST + 1):
+            hasher = argon2.using(rounds=time_cost, memory_cost=memoria, parallelism=paralelismo)
+            ms = medir_ms(hasher)
+            medidas.append((memoria, time_cost, ms))
+            print(f"  m={memoria:>6} KiB  t={time_cost:>2}  p={paralelismo}  → {ms:7.1f} ms")
+            if ms > objetivo_ms:
+                break  # más pasadas con esta memoria sólo tardan más
+    return medidas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibra Argon2id para este servidor.")
+    parser.add_argument("--objetivo-ms", type=float, default=250, help="tiempo buscado por hash (default 250)")
+    parser.add_argument("--paralelismo", type=int, default=ARGON2_PARALLELISM,
+                        help=f"hilos de Argon2 por hash (default {ARGON2_PARALLELISM})")
+    args = parser.parse_args()
+
+    print(f"── Midiendo (objetivo {args.objetivo_ms:.0f} ms por hash)")
+    medidas = calibrar(args.objetivo_ms, args.paralelismo)
+
+    # La más costosa dentro del objetivo: primero más memoria, después más pasadas
+    dentro = [m for m in medidas if m[2] <= args.objetivo_ms]
+    if not dentro:
+        memoria, time_cost, ms = min(medidas, key=lambda m: m[2])
+        print(f"⚠️ Ninguna combinación entra en {args.objetivo_ms:.0f} ms; la más rápida tarda {ms:.0f} ms.")
+    else:
+        memoria, time_cost, ms = max(dentro, key=lambda m: (m[0], m[1]))
+
+    hasher = argon2.using(rounds=time_cost, memory_cost=memoria, parallelism=args.paralelismo)
+    rafaga = medir_rafaga_ms(hasher, ARGON2_CONCURRENCIA)
+    print()
+    print(f"✅ Sugerido: {ms:.0f} ms por hash; {ARGON2_CONCURRENCIA} logins a la vez "
+          f"terminan en {rafaga:.0f} ms (ARGON2_CONCURRENCIA={ARGON2_CONCURRENCIA})")
+    print(f"   ARGON2_TIME_COST={time_cost}")
+    print(f"   ARGON2_MEMORY_KIB={memoria}")
+    print(f"   ARGON2_PARALLELISM={args.paralelismo}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+gui/completador_remoto.py
+
+QCompleter alimentado por consultas a la base a medida que el usuario tipea.
+
+En lugar de cargar todas las opciones al abrir el formulario, cada búsqueda
+pide a la base como máximo LIMITE coincidencias para el texto actual:
+
+  - Espera DEMORA_MS desde la última tecla antes de consultar (debounce).
+  - La consulta corre en segundo plano (utils.carga_async); si llega la
+    respuesta de un texto viejo, se descarta.
+  - El filtrado lo hace la base, así que el popup muestra la lista tal cual
+    (UnfilteredPopupCompletion).
+
+La función de búsqueda recibe (texto, limite) y devuelve tuplas
+(id, texto_visible). Al elegir una opción se emite seleccionado(id).
+"""
+
+from PySide6.QtCore import Qt, QStringListModel, QTimer, Signal
+from PySide6.QtWidgets import QCompleter, QLineEdit
+
+from utils.carga_async import CargadorDatos
+
+
+class CompletadorRemoto(QCompleter):
+    LIMITE = 20
+    DEMORA_MS = 250
+    MIN_CARACTERES = 2
+
+    seleccionado = Signal(int)
+
+    def __init__(self, editor: QLineEdit, buscar, limite: int | None = None,
+                 demora_ms: int | None = None, min_caracteres: int | None = None):
+        super().__init__(editor)
+        self._editor = editor
+        self._buscar = buscar
+        self._limite = limite or self.LIMITE
+        self._min = self.MIN_CARACTERES if min_caracteres is None else min_caracteres
+        self._ids = {}
+
+        self._modelo = QStringListModel(self)
+        self.setModel(self._modelo)
+        self.setCaseSensitivity(Qt.CaseInsensitive)
+        self.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.setMaxVisibleItems(12)
+        editor.setCompleter(self)
+
+        self._cargador = CargadorDatos(self)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.DEMORA_MS if demora_ms is None else demora_ms)
+        self._timer.timeout.connect(self._consultar)
+        # textEdited: sólo lo que tipea el usuario, no los setText del programa
+        editor.textEdited.connect(lambda _: self._timer.start())
+        self.activated[str].connect(self._on_activado)
+
+    # ---------- API ----------
+    def id_para(self, texto: str) -> int | None:
+        """ID de una opción mostrada (None si el texto no es una de ellas)."""
+        return self._ids.get((texto or "").strip())
+
+    def actualizar(self):
+        """Vuelve a consultar el texto actual sin esperar la demora."""
+        self._timer.stop()
+        self._consultar()
+
+    def limpiar(self):
+        self._timer.stop()
+        self._cargador.cancelar()
+        self._ids = {}
+        self._modelo.setStringList([])
+
+    # ---------- Internos ----------
+    def _consultar(self):
+        texto = self._editor.text().strip()
+        if len(texto) < self._min and not texto.lstrip("#").isdigit():
+            self.limpiar()
+            return
+        self._cargador.ejecutar(
+            self._buscar, texto, self._limite,
+            al_terminar=lambda opciones: self._mostrar(texto, opciones),
+        )
+
+    def _mostrar(self, texto: str, opciones: list):
+        if self._editor.text().strip() != texto:
+            return   # el usuario siguió tipeando; viene otra consulta
+        self._ids = {visible: id_ for id_, visible in opciones}
+        self._modelo.setStringList([visible for _, visible in opciones])
+        if opciones and self._editor.hasFocus():
+            self.complete()
+
+    def _on_activado(self, texto: str):
+        id_ = self.id_para(texto)
+        if id_ is not None:
+            self.seleccionado.emit(id_)
@@ -6,18 +6,22 @@ from datetime import date
 
 from PySide6.QtWidgets import (
     QWidget, QLabel, QVBoxLayout, QPushButton,
-    QTableWidget, QTableWidgetItem, QLineEdit, QCompleter,
+    QTableWidget, QTableWidgetItem, QLineEdit,
     QDoubleSpinBox, QInputDialog, QMessageBox, QHBoxLayout, QDialog,
     QFormLayout, QDialogButtonBox, QSizePolicy, QComboBox, QFrame
 )
 from PySide6.QtCore import QDate, Qt, Signal, QEvent, QTimer
 from database import get_session
-from models import Venta, Cuota, Cobro, Usuario
+from models import Venta, Cuota, Cobro, Usuario, Cliente
 from utils.formato import formato_documento
 from sqlalchemy.orm import joinedload
 from utils.widgets_custom import ComboBoxSinScroll, DateEditSinScroll, DoubleSpinBoxSinScroll
 from utils.dialogos import confirmar
 from utils.estilos import PALETA
+from gui.completador_remoto import CompletadorRemoto
+from services import cobros
+from services.busquedas import sentencia_busqueda_ventas
+from services.cobros import sentencia_cuotas, sentencia_ultimos_cobros
 
 # ---------- Constantes de layout fijo ----------
 HEIGHT_SEARCH   = 30   # Buscar Venta (alto de controles)
@@ -40,6 +44,29 @@ QComboBox::drop-down { width: 24px; }
 """
 
 
+# ---------------- Búsqueda de ventas (autocompletar) ----------------
+def buscar_ventas(texto: str, limite: int) -> list:
+    """
+    Ventas no anuladas que coinciden con lo tipeado, como (id, texto visible).
+
+      "#125" → la venta 125
+      "3012" → venta 3012 o clientes cuyo documento empieza con 3012
+      "Pér"  → clientes cuyo apellido empieza con Pér ("Pérez, Ju" filtra también por nombre)
+
+    Las búsquedas son por prefijo (no "contiene") para que usen
+    ix_clientes_apellidos / ix_clientes_nro_documento.
+    Corre en segundo plano: abre su propia sesión y devuelve tuplas.
+    """
+    with get_session() as session:
+        filas = session.execute(sentencia_busqueda_ventas(texto, limite)).all()
+    opciones = []
+    for vid, ap, no, tipo, nro in filas:
+        doc = f"{tipo or ''} {nro}".strip() if nro else ""
+        opciones.append((vid, f"Venta #{vid} – {(ap or '').strip()}, {(no or '').strip()}"
+                              + (f" ({doc})" if doc else "")))
+    return opciones
+
+
 # ---------------- Diálogo para nueva cuota por mora ----------------
 class DialogCuotaMora(QDialog):
     def __init__(self):
@@ -166,30 +193,9 @@ class FormCobro(QWidget):
         row_busqueda.setFixedHeight(HEIGHT_SEARCH + 8)
         root.addWidget(row_busqueda)
 
-        # Datos para autocompletar
-        self._display_map = {}
-        opciones = []
-        with get_session() as _s:
-            _ventas_ac = (
-                _s.query(Venta)
-                .options(joinedload(Venta.cliente))
-                .filter_by(anulada=False)
-                .all()
-            )
-        for v in _ventas_ac:
-            cli = v.cliente
-            ap = (cli.apellidos or "").strip()
-            no = (cli.nombres or "").strip()
-            doc = formato_documento(cli)
-            display = f"Venta #{v.id} – {ap}, {no}" + (f" ({doc})" if doc else "")
-            self._display_map[self._normalize(display)] = v.id
-            opciones.append(display)
-        self._completer = QCompleter(opciones, self)
-        self._completer.setCaseSensitivity(Qt.CaseInsensitive)
-        self._completer.setFilterMode(Qt.MatchContains)
-        self._completer.setCompletionMode(QCompleter.PopupCompletion)
-        self.buscador.setCompleter(self._completer)
-        self._completer.activated[str].connect(self._on_busqueda_activada)
+        # Autocompletar: consulta la base a medida que se tipea (nada se carga al abrir)
+        self._completer = CompletadorRemoto(self.buscador, buscar_ventas)
+        self._completer.seleccionado.connect(self._cargar_venta)
         self.btn_cargar_busqueda.clicked.connect(self._cargar_desde_texto)
         self.buscador.returnPressed.connect(self._cargar_desde_texto)
 
@@ -462,15 +468,11 @@ class FormCobro(QWidget):
         self.observaciones_input.setText(_obs)
 
     # ---------------- Buscar / seleccionar ----------------
-    def _on_busqueda_activada(self, texto):
-        vid = self._display_map.get(self._normalize(texto))
-        if vid:
-            self._cargar_venta(vid)
-
     def _cargar_desde_texto(self):
+        vid = self._completer.id_para(self.buscador.text())
+        if vid is not None:
+            self._cargar_venta(vid); return
         txt = self._normalize((self.buscador.text() or "").strip())
-        if txt in self._display_map:
-            self._cargar_venta(self._display_map[txt]); return
         num = "".join(ch for ch in txt if ch.isdigit())
         if num.isdigit():
             with get_session() as _s:
@@ -508,22 +510,18 @@ class FormCobro(QWidget):
             return
 
         with get_session() as _s:
-            self.cuotas = (
-                _s.query(Cuota)
-                .filter_by(venta_id=self.venta.id)
-                .order_by(Cuota.numero)
-                .all()
-            )
-            _ultimos = {}
-            for _c in self.cuotas:
-                _u = (
+            self.cuotas = _s.scalars(sentencia_cuotas(self.venta.id)).all()
+            # Último cobro (y quién lo registró) de cada cuota, en una sola consulta
+            _ids_ultimos = sentencia_ultimos_cobros(self.venta.id)
+            _ultimos = {
+                _u.cuota_id: _u
+                for _u in (
                     _s.query(Cobro)
-                    .filter_by(venta_id=self.venta.id, cuota_id=_c.id)
                     .options(joinedload(Cobro.registrado_por))
-                    .order_by(Cobro.id.desc())
-                    .first()
+                    .filter(Cobro.id.in_(_ids_ultimos))
+                    .all()
                 )
-                _ultimos[_c.id] = _u
+            }
 
         self.tabla_cuotas.setRowCount(len(self.cuotas))
         for i, c in enumerate(self.cuotas):
@@ -531,8 +529,12 @@ class FormCobro(QWidget):
                 pagada_con_mora = c.fecha_pago and c.fecha_pago > c.fecha_vencimiento
                 estado = "Con Mora" if pagada_con_mora else "Pagada"
                 color = Qt.yellow if pagada_con_mora else Qt.green
-            elif c.fecha_vencimiento < date.today():
+            elif c.vencida or c.fecha_vencimiento < date.today():
+                # 'vencida' / 'interes_mora' los mantiene el proceso nocturno (services/mora.py);
+                # la comparación de fechas cubre lo que venció desde la última corrida
                 estado, color = "Vencida", Qt.red
+                if c.interes_mora:
+                    estado += f" (mora $ {c.interes_mora:.2f})"
             else:
                 estado, color = "Pendiente", Qt.white
 
@@ -619,44 +621,20 @@ class FormCobro(QWidget):
             return
         # =====================================
 
-        with get_session() as session:
-            cuotas = (
-                session.query(Cuota)
-                .filter_by(venta_id=self.venta.id)
-                .order_by(Cuota.numero)
-                .all()
+        try:
+            resultado = cobros.registrar_cobro(
+                self.venta.id, monto, fecha_cobro,
+                tipo=tipo, metodo=metodo, lugar=lugar, comprobante=comp,
+                observaciones=obs, registrado_por_id=user_id,
             )
-            restante = monto
-            for cuota in cuotas:
-                if cuota.pagada:
-                    continue
-                saldo = max(float(cuota.monto_original) - float(cuota.monto_pagado), 0.0)
-                if saldo <= 0:
-                    continue
-                pago = min(saldo, restante)
-                if pago <= 0:
-                    break
-                cobro = Cobro(
-                    venta_id=self.venta.id,
-                    cuota_id=cuota.id,
-                    fecha=fecha_cobro,
-                    monto=pago,
-                    tipo=tipo,
-                    observaciones=obs,
-                    registrado_por_id=user_id,
-                    metodo=None if metodo == "Sin especificar" else metodo,
-                    lugar=None if lugar == "Sin especificar" else lugar,
-                    comprobante=comp
-                )
-                session.add(cobro)
-                cuota.monto_pagado = float(cuota.monto_pagado) + pago
-                if float(cuota.monto_pagado) >= float(cuota.monto_original) - 1e-6:
-                    cuota.pagada = True
-                    cuota.fecha_pago = fecha_cobro
-                restante -= pago
-                if restante <= 0:
-                    break
-            session.commit()
+        except cobros.VentaNoCobrable:
+            QMessageBox.warning(self, "Venta no cobrable",
+                                "La venta fue anulada o finalizada mientras cargabas el cobro.")
+            self._cargar_venta(self.venta.id)
+            return
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"No se pudo registrar el cobro:\n{e}")
+            return
 
         self.cobro_registrado.emit(self.venta.id)
         self.cargar_cuotas()
@@ -664,6 +642,13 @@ class FormCobro(QWidget):
         # ======== Mensajes finales ========
         # Siempre mostramos éxito
         QMessageBox.information(self, "Éxito", "Cobro registrado correctamente.")
+        if resultado.sobrante > 0:
+            QMessageBox.information(
+                self,
+                "Monto excedente",
+                f"El monto supera el saldo de la venta: se imputaron $ {resultado.aplicado:,.2f} "
+                f"y quedaron $ {resultado.sobrante:,.2f} sin imputar."
+            )
 
         # Si todas las cuotas quedaron pagadas y la venta NO está finalizada → sugerimos finalizar
         if not self.venta.finalizada and all(c.pagada for c in self.cuotas):
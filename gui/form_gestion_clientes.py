@@ -1,12 +1,9 @@
-from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
-    QPushButton, QHBoxLayout, QHeaderView, QLineEdit, QFrame
-)
+from PySide6.QtWidgets import QWidget, QMessageBox, QVBoxLayout, QLabel
 from PySide6.QtCore import Qt, QTimer
-from database import get_session
 from models import Cliente
 from gui.form_cliente import FormCliente
-from utils.formato import formato_documento
+from gui.grilla_paginada import GrillaPaginada
+from gui.modelo_personas import ModeloPersonas
 from utils.estilos import PALETA
 from utils.guards import require_perm_or_close
 
@@ -28,22 +25,19 @@ class FormGestionClientes(QWidget):
         titulo.setObjectName("titulo")
         layout.addWidget(titulo)
 
-        # Buscador
-        self.buscador = QLineEdit()
-        self.buscador.setPlaceholderText("Buscar por apellido, nombre o número de documento")
-        self.buscador.textChanged.connect(self.filtrar_clientes)
-        layout.addWidget(self.buscador)
-
-        # Tabla
-        self.tabla = QTableWidget()
-        self.tabla.setColumnCount(6)
-        self.tabla.setHorizontalHeaderLabels(["ID", "Apellidos", "Nombres", "Documento", "Calificación", "Acciones"])
-        self.tabla.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.tabla.setAlternatingRowColors(True)
-        layout.addWidget(self.tabla)
+        # Buscador + tabla paginada: la búsqueda y el orden se resuelven en SQL
+        self.modelo = ModeloPersonas(Cliente)
+        self.grilla = GrillaPaginada(
+            self.modelo,
+            placeholder="Buscar por apellido o nombre (\"Pérez Ju\", \"Juan\") o número de documento",
+            acciones={ModeloPersonas.COL_ACCIONES: lambda fila: self.editar_cliente(fila[ModeloPersonas.ID])},
+        )
+        self.grilla.fallo.connect(self._error_carga)
+        self.buscador = self.grilla.buscador
+        self.tabla = self.grilla.tabla
+        layout.addWidget(self.grilla)
 
-        # --- Carga diferida con overlay ---
-        self._show_loading("Cargando clientes…")
+        # --- Carga diferida: la primera página llega en segundo plano ---
         QTimer.singleShot(0, self._load_after_paint)
 
         # Estilo
@@ -53,7 +47,7 @@ class FormGestionClientes(QWidget):
                 font-weight: bold;
                 color: {PALETA['identidad']['primario_pressed']};
             }}
-            QTableWidget {{
+            QTableView {{
                 background-color: #ffffff;
                 border: 1px solid #dddddd;
                 border-radius: 6px;
@@ -63,105 +57,15 @@ class FormGestionClientes(QWidget):
 
     # ---------- Carga diferida ----------
     def _load_after_paint(self):
-        """Se ejecuta cuando la UI ya está pintada, así evitamos pantalla en blanco."""
-        self.setUpdatesEnabled(False)
-        try:
-            self.cargar_datos()
-        finally:
-            self.setUpdatesEnabled(True)
-            self._hide_loading()
-
-    def _show_loading(self, text="Cargando…"):
-        if getattr(self, "_loading_overlay", None):
-            self._loading_overlay.show()
-            self._loading_label.setText(text)
-            self._position_loading()
-            return
-
-        self._loading_overlay = QFrame(self)
-        self._loading_overlay.setStyleSheet(
-            "QFrame { background: rgba(255,255,255,220); "
-            "border: 1px solid #ddd; border-radius: 8px; }"
-        )
-        # Si prefiero bloquear clicks mientras carga, sacar la línea de abajo
-        self._loading_overlay.setAttribute(Qt.WA_TransparentForMouseEvents, True)
-
-        lay = QVBoxLayout(self._loading_overlay)
-        lay.setContentsMargins(20, 20, 20, 20)
-        lay.addStretch()
-        self._loading_label = QLabel(text, self._loading_overlay)
-        self._loading_label.setAlignment(Qt.AlignCenter)
-        self._loading_label.setStyleSheet("QLabel { font-size: 16px; color: #555; }")
-        lay.addWidget(self._loading_label)
-        lay.addStretch()
-
-        self._position_loading()
-        self._loading_overlay.show()
-
-    def _position_loading(self):
-        # Cubrí todo el widget
-        self._loading_overlay.setGeometry(self.rect())
-
-    def _hide_loading(self):
-        if getattr(self, "_loading_overlay", None):
-            self._loading_overlay.hide()
-
-    def resizeEvent(self, e):
-        super().resizeEvent(e)
-        if getattr(self, "_loading_overlay", None):
-            self._position_loading()
+        """Se ejecuta cuando la UI ya está pintada; la consulta corre en segundo plano."""
+        self.cargar_datos()
 
     # ---------- Datos ----------
-    def cargar_datos(self):
-        with get_session() as session:
-            self.todos_los_clientes = session.query(Cliente).all()
-        self.mostrar_clientes(self.todos_los_clientes)
+    def cargar_datos(self, texto_carga="Cargando clientes…"):
+        self.grilla.recargar(texto_carga)
 
-    def mostrar_clientes(self, lista):
-        # Pintado optimizado: sin parpadeos y más rápido
-        self.tabla.setUpdatesEnabled(False)
-        try:
-            if hasattr(self.tabla, "setSortingEnabled"):
-                self.tabla.setSortingEnabled(False)
-            self.tabla.clearContents()
-            self.tabla.setRowCount(len(lista))
-
-            for row_index, cliente in enumerate(lista):
-                self.tabla.setItem(row_index, 0, QTableWidgetItem(str(cliente.id)))
-                self.tabla.setItem(row_index, 1, QTableWidgetItem(cliente.apellidos or ""))
-                self.tabla.setItem(row_index, 2, QTableWidgetItem(cliente.nombres or ""))
-                self.tabla.setItem(row_index, 3, QTableWidgetItem(formato_documento(cliente)))
-                self.tabla.setItem(row_index, 4, QTableWidgetItem(cliente.calificacion or ""))
-
-                # Botón de acción
-                btn_editar = QPushButton("Editar")
-                i = PALETA["identidad"]
-                btn_editar.setStyleSheet(f"""
-                    QPushButton {{
-                        background-color: {i['primario']};
-                        color: white;
-                        padding: 4px 12px;
-                        border: none;
-                        border-radius: 4px;
-                    }}
-                    QPushButton:hover {{
-                        background-color: {i['primario_hover']};
-                    }}
-                """)
-                btn_editar.clicked.connect(self.generar_callback_editar(cliente.id))
-
-                acciones_layout = QHBoxLayout()
-                acciones_layout.setContentsMargins(0, 0, 0, 0)
-                acciones_layout.setSpacing(5)
-                acciones_layout.addWidget(btn_editar)
-
-                acciones_widget = QWidget()
-                acciones_widget.setLayout(acciones_layout)
-                self.tabla.setCellWidget(row_index, 5, acciones_widget)
-        finally:
-            if hasattr(self.tabla, "setSortingEnabled"):
-                self.tabla.setSortingEnabled(True)
-            self.tabla.setUpdatesEnabled(True)
+    def _error_carga(self, mensaje):
+        QMessageBox.critical(self, "Error", f"No se pudo cargar el listado de clientes:\n{mensaje}")
 
     # ---------- Acciones ----------
     def editar_cliente(self, cliente_id):
@@ -172,29 +76,7 @@ class FormGestionClientes(QWidget):
         # Al cerrar, refrescar listado
         self.form.closeEvent = self._refrescar_al_cerrar
 
-    def generar_callback_editar(self, cliente_id):
-        return lambda checked=False: self.editar_cliente(cliente_id)
-
-    # ---------- Filtro ----------
-    def filtrar_clientes(self):
-        # Si aún no cargó, no filtres
-        if not hasattr(self, "todos_los_clientes"):
-            return
-        texto = (self.buscador.text() or "").lower().strip()
-        if not texto:
-            self.mostrar_clientes(self.todos_los_clientes)
-            return
-
-        filtrados = [
-            c for c in self.todos_los_clientes
-            if (c.apellidos and texto in c.apellidos.lower()) or
-               (c.nombres and texto in c.nombres.lower()) or
-               (c.nro_documento and texto in c.nro_documento.lower())
-        ]
-        self.mostrar_clientes(filtrados)
-
     # ---------- Refresh ----------
     def _refrescar_al_cerrar(self, event):
-        self._show_loading("Actualizando…")
-        QTimer.singleShot(0, self._load_after_paint)
+        self.cargar_datos("Actualizando…")
         event.accept()
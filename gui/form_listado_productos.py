@@ -12,6 +12,24 @@ from utils.permisos import tiene_permiso_match
 from sqlalchemy.exc import IntegrityError
 from utils.dialogos import confirmar
 from utils.estilos import PALETA
+from utils.carga_async import CargadorDatos
+from sqlalchemy import select
+
+
+def _consultar_listado():
+    """
+    Categorías y productos como tuplas (id, nombre), corre fuera de la GUI.
+    Dos consultas de columnas (categorías y todos los productos), sin
+    importar cuántas categorías haya.
+    """
+    with get_session() as session:
+        categorias = [tuple(r) for r in session.execute(
+            select(Categoria.id, Categoria.nombre).order_by(Categoria.id)).all()]
+        productos_por_cat = {}
+        for prod_id, nombre, cat_id in session.execute(
+                select(Producto.id, Producto.nombre, Producto.categoria_id).order_by(Producto.id)).all():
+            productos_por_cat.setdefault(cat_id, []).append((prod_id, nombre))
+    return categorias, productos_por_cat
 
 
 class FormListadoProductos(QWidget):
@@ -120,6 +138,7 @@ class FormListadoProductos(QWidget):
         main_layout.addWidget(scroll)
         
         # Cargar datos iniciales
+        self._cargador = CargadorDatos(self)
         self.cargar_listado()
 
     def clear_layout(self, layout):
@@ -132,7 +151,15 @@ class FormListadoProductos(QWidget):
                 self.clear_layout(child.layout())
 
     def cargar_listado(self):
-        """Carga el listado de categorías y productos"""
+        """Carga el listado de categorías y productos (la consulta corre en segundo plano)"""
+        self._cargador.ejecutar(
+            _consultar_listado,
+            al_terminar=lambda datos: self._mostrar_listado(*datos),
+            al_fallar=lambda e: QMessageBox.critical(self, "Error", f"No se pudo cargar el listado:\n{e}"),
+        )
+
+    def _mostrar_listado(self, categorias, productos_por_cat):
+        """Arma los frames a partir de las tuplas (id, nombre) de categorías y productos"""
         pal_i = PALETA["identidad"]
         pal_a = PALETA["acciones"]
         # Limpiar layout existente (excepto título y botón superior)
@@ -142,17 +169,6 @@ class FormListadoProductos(QWidget):
                 child.widget().deleteLater()
             elif child.layout():
                 self.clear_layout(child.layout())
-        
-        try:
-            with get_session() as session:
-                categorias = session.query(Categoria).all()
-                productos_por_cat = {
-                    cat.id: session.query(Producto).filter_by(categoria_id=cat.id).all()
-                    for cat in categorias
-                }
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"No se pudo cargar el listado:\n{e}")
-            return
 
         if not categorias:
             # Mostrar mensaje cuando no hay categorías
@@ -176,7 +192,7 @@ class FormListadoProductos(QWidget):
             return
         
         # Agregar cada categoría como un frame separado
-        for i, cat in enumerate(categorias):
+        for i, (cat_id, cat_nombre) in enumerate(categorias):
             # Frame principal de la categoría con color distintivo
             frame = QFrame()
             frame.setObjectName("categoria_frame")
@@ -203,7 +219,7 @@ class FormListadoProductos(QWidget):
             """)
             numero_cat.setAlignment(Qt.AlignCenter)
             
-            label_cat = QLabel(f"📁 {cat.nombre}")
+            label_cat = QLabel(f"📁 {cat_nombre}")
             label_cat.setStyleSheet(f"""
                 QLabel {{
                     font-size: 20px;
@@ -233,7 +249,7 @@ class FormListadoProductos(QWidget):
             frame_layout.addWidget(linea)
             
             # Productos de la categoría
-            productos = productos_por_cat.get(cat.id, [])
+            productos = productos_por_cat.get(cat_id, [])
             
             if productos:
                 # Título de sección de productos
@@ -254,7 +270,7 @@ class FormListadoProductos(QWidget):
                 productos_layout = QVBoxLayout(productos_frame)
                 productos_layout.setSpacing(8)
                 
-                for j, prod in enumerate(productos):
+                for j, (prod_id, prod_nombre) in enumerate(productos):
                     # Frame individual para cada producto
                     producto_frame = QFrame()
                     producto_frame.setObjectName("producto_item")
@@ -275,7 +291,7 @@ class FormListadoProductos(QWidget):
                     fila_prod.addWidget(num_prod)
                     
                     # Información del producto
-                    lbl_prod = QLabel(f"📦 {prod.nombre}")
+                    lbl_prod = QLabel(f"📦 {prod_nombre}")
                     lbl_prod.setStyleSheet("""
                         QLabel {
                             font-size: 14px;
@@ -285,18 +301,6 @@ class FormListadoProductos(QWidget):
                     """)
                     fila_prod.addWidget(lbl_prod)
                     
-                    # Información adicional del producto si existe
-                    if hasattr(prod, 'precio') and prod.precio:
-                        lbl_precio = QLabel(f"- Precio: ${prod.precio}")
-                        lbl_precio.setStyleSheet("""
-                            QLabel {
-                                font-size: 12px;
-                                color: #666;
-                                font-weight: normal;
-                            }
-                        """)
-                        fila_prod.addWidget(lbl_precio)
-                    
                     fila_prod.addStretch()
                     
                     # Botones de acción para producto
@@ -318,7 +322,7 @@ class FormListadoProductos(QWidget):
                             background-color: {pal_i['primario_hover']};
                         }}
                     """)
-                    btn_editar_prod.clicked.connect(lambda checked=False, p_id=prod.id: self.abrir_editar_producto(p_id))
+                    btn_editar_prod.clicked.connect(lambda checked=False, p_id=prod_id: self.abrir_editar_producto(p_id))
 
                     btn_eliminar_prod = QPushButton("✕")
                     btn_eliminar_prod.setObjectName("btn_eliminar_prod")
@@ -338,7 +342,7 @@ class FormListadoProductos(QWidget):
                             background-color: {pal_a['eliminar_hover']};
                         }}
                     """)
-                    btn_eliminar_prod.clicked.connect(lambda checked=False, p_id=prod.id: self.eliminar_producto(p_id))
+                    btn_eliminar_prod.clicked.connect(lambda checked=False, p_id=prod_id: self.eliminar_producto(p_id))
                     
                     fila_prod.addWidget(btn_editar_prod)
                     fila_prod.addWidget(btn_eliminar_prod)
@@ -401,7 +405,7 @@ class FormListadoProductos(QWidget):
                     background-color: {pal_i['primario_hover']};
                 }}
             """)
-            btn_nuevo_prod.clicked.connect(lambda checked=False, c_id=cat.id: self.abrir_nuevo_producto(c_id))
+            btn_nuevo_prod.clicked.connect(lambda checked=False, c_id=cat_id: self.abrir_nuevo_producto(c_id))
 
             btn_editar_cat = QPushButton("Editar Categoría")
             btn_editar_cat.setObjectName("btn_editar_cat")
@@ -418,7 +422,7 @@ class FormListadoProductos(QWidget):
                     background-color: {pal_i['primario_hover']};
                 }}
             """)
-            btn_editar_cat.clicked.connect(lambda checked=False, c_id=cat.id: self.abrir_editar_categoria(c_id))
+            btn_editar_cat.clicked.connect(lambda checked=False, c_id=cat_id: self.abrir_editar_categoria(c_id))
 
             btn_eliminar_cat = QPushButton("Eliminar Categoría")
             btn_eliminar_cat.setObjectName("btn_eliminar_cat")
@@ -435,7 +439,7 @@ class FormListadoProductos(QWidget):
                     background-color: {pal_a['eliminar_hover']};
                 }}
             """)
-            btn_eliminar_cat.clicked.connect(lambda checked=False, c_id=cat.id: self.eliminar_categoria(c_id))
+            btn_eliminar_cat.clicked.connect(lambda checked=False, c_id=cat_id: self.eliminar_categoria(c_id))
             
             botones_layout.addWidget(btn_nuevo_prod)
             botones_layout.addStretch()
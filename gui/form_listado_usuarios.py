@@ -4,7 +4,8 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt
 from database import get_session
-from models import Usuario, Personal, Rol
+from models import Usuario
+from sqlalchemy.orm import joinedload
 from gui.form_usuario import FormUsuario
 from utils.dialogos import confirmar
 from utils.estilos import PALETA
@@ -115,7 +116,13 @@ class FormListadoUsuarios(QWidget):
     def cargar_datos(self):
         self.tabla.setRowCount(0)
         with get_session() as session:
-            usuarios = session.query(Usuario).all()
+            # Rol y personal en la misma consulta (nada de consultas por fila)
+            usuarios = (
+                session.query(Usuario)
+                .options(joinedload(Usuario.rol), joinedload(Usuario.personal))
+                .order_by(Usuario.id)
+                .all()
+            )
 
             for i, u in enumerate(usuarios):
                 self.tabla.insertRow(i)
@@ -124,14 +131,11 @@ class FormListadoUsuarios(QWidget):
                 self.tabla.setItem(i, 2, QTableWidgetItem(u.email or ""))
 
                 # Rol
-                rol_nombre = ""
-                if getattr(u, "rol_id", None):
-                    r = session.query(Rol).get(u.rol_id)
-                    rol_nombre = r.nombre if r else ""
+                rol_nombre = u.rol.nombre if u.rol else ""
                 self.tabla.setItem(i, 3, QTableWidgetItem(rol_nombre))
 
                 # Personal
-                personal = session.query(Personal).get(u.personal_id)
+                personal = u.personal
                 nombre_personal = f"{personal.apellidos}, {personal.nombres}" if personal else ""
                 self.tabla.setItem(i, 4, QTableWidgetItem(nombre_personal))
 
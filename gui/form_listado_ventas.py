@@ -1,25 +1,152 @@
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
-    QPushButton, QHBoxLayout, QHeaderView, QLineEdit, QMessageBox,
+    QWidget, QVBoxLayout, QLabel,
+    QPushButton, QHBoxLayout, QMessageBox,
     QDialog, QDialogButtonBox
 )
 from PySide6.QtCore import Qt, QTimer
 
 from database import get_session
-from models import Venta, Cobro, Cliente
+from models import Venta, Cobro, Cliente, Cuota, Personal, Producto
 from utils.formato import formato_documento
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, aliased
 from gui.form_venta import FormVenta
+from gui.grilla_paginada import GrillaPaginada
+from gui.modelo_paginado import ModeloPaginadoSQL
+from services.busquedas import escapar_like, ESCAPE_LIKE
 from utils.pdf_utils import generar_docs_word, generar_docs_pdf
 from utils.permisos import tiene_permiso_match
 from utils.guards import require_perm_or_close
 from utils.estilos import PALETA
 from utils.archivos import abrir_archivo
 import unicodedata
-from sqlalchemy import desc
+from sqlalchemy import desc, select, exists, and_, or_
 from utils.dialogos import confirmar
 
 
+def normalizar(texto):
+    if not texto:
+        return ""
+    return unicodedata.normalize('NFKD', texto.lower()).encode('ASCII', 'ignore').decode('utf-8')
+
+
+_Coordinador = aliased(Personal)
+_Vendedor = aliased(Personal)
+_Cobrador = aliased(Personal)
+
+# Mora = alguna cuota pagada después de su vencimiento (usa ix_cuotas_venta_numero)
+_CON_MORA = exists().where(
+    Cuota.venta_id == Venta.id,
+    Cuota.pagada.is_(True),
+    Cuota.fecha_pago > Cuota.fecha_vencimiento,
+)
+_ANULADA = Venta.anulada.is_(True)
+_FINALIZADA = and_(Venta.finalizada.is_(True), or_(Venta.anulada.is_(False), Venta.anulada.is_(None)))
+_ACTIVA = and_(or_(Venta.anulada.is_(False), Venta.anulada.is_(None)),
+               or_(Venta.finalizada.is_(False), Venta.finalizada.is_(None)))
+_ESTADOS = {"anulada": _ANULADA, "finalizada": _FINALIZADA, "activa": _ACTIVA}
+
+
+class ModeloVentas(ModeloPaginadoSQL):
+    """Listado de ventas paginado; sólo trae las columnas que muestra la tabla."""
+
+    COLUMNAS = ["ID", "Fecha", "Cliente", "Monto", "Estado", "Personal",
+                "Detalle", "Acciones", "Documentos", "Cobros"]
+    # Columnas de la consulta (índices dentro de cada tupla)
+    ID, FECHA, APELLIDOS, NOMBRES, TIPO_DOC, NRO_DOC, MONTO, ANULADA, FINALIZADA, \
+        MORA, COORDINADOR, VENDEDOR, COBRADOR = range(13)
+    COLUMNA_ORDEN = 0
+
+    def __init__(self, acciones: dict, parent=None):
+        """acciones: {columna: texto} de los botones habilitados para el usuario."""
+        super().__init__(parent)
+        self._acciones = acciones
+
+    def _consulta(self, texto):
+        stmt = (
+            select(
+                Venta.id, Venta.fecha,
+                Cliente.apellidos, Cliente.nombres, Cliente.tipo_documento, Cliente.nro_documento,
+                Venta.monto, Venta.anulada, Venta.finalizada, _CON_MORA.label("con_mora"),
+                _Coordinador.nombres, _Vendedor.nombres, _Cobrador.nombres,
+            )
+            .outerjoin(Cliente, Cliente.id == Venta.cliente_id)
+            .outerjoin(_Coordinador, _Coordinador.id == Venta.coordinador_id)
+            .outerjoin(_Vendedor, _Vendedor.id == Venta.vendedor_id)
+            .outerjoin(_Cobrador, _Cobrador.id == Venta.cobrador_id)
+        )
+        if texto:
+            patron = f"%{escapar_like(texto)}%"
+            condiciones = [
+                Cliente.apellidos.like(patron, escape=ESCAPE_LIKE),
+                Cliente.nombres.like(patron, escape=ESCAPE_LIKE),
+                Cliente.nro_documento.like(patron, escape=ESCAPE_LIKE),
+                Venta.producto_id.in_(select(Producto.id).where(Producto.nombre.like(patron, escape=ESCAPE_LIKE))),
+            ]
+            # Mismo criterio que antes: el texto contra "activa", "anulada mora", etc.
+            t = normalizar(texto)
+            for nombre, cond in _ESTADOS.items():
+                if t in nombre:
+                    condiciones.append(cond)
+                elif t in f"{nombre} mora":
+                    condiciones.append(and_(cond, _CON_MORA))
+            stmt = stmt.where(or_(*condiciones))
+        return stmt
+
+    def _orden(self, columna, orden):
+        cols = {
+            0: [Venta.id],
+            1: [Venta.fecha],
+            2: [Cliente.apellidos, Cliente.nombres],
+            3: [Venta.monto],
+            4: [Venta.anulada, Venta.finalizada],
+        }.get(columna)
+        if cols is None:
+            return None
+        asc = orden == Qt.AscendingOrder
+        return [c.asc() if asc else c.desc() for c in cols] + ([] if columna == 0 else [Venta.id])
+
+    def _celda(self, f, col):
+        if col == 0:
+            return str(f[self.ID])
+        if col == 1:
+            return f[self.FECHA].strftime("%d/%m/%Y") if f[self.FECHA] else ""
+        if col == 2:
+            if f[self.APELLIDOS] is None and f[self.NOMBRES] is None:
+                return ""
+            nro = f[self.NRO_DOC] or ""
+            doc = f"{f[self.TIPO_DOC] or ''} {nro}".strip() if nro else ""
+            return f"{f[self.APELLIDOS]}, {f[self.NOMBRES]}" + (f" ({doc})" if doc else "")
+        if col == 3:
+            return f"${f[self.MONTO]:,.2f}" if f[self.MONTO] else ""
+        if col == 4:
+            return self.estado(f)
+        if col == 5:
+            personal = []
+            if f[self.COORDINADOR]:
+                personal.append(f"C: {f[self.COORDINADOR]}")
+            if f[self.VENDEDOR]:
+                personal.append(f"V: {f[self.VENDEDOR]}")
+            if f[self.COBRADOR]:
+                personal.append(f"Cob: {f[self.COBRADOR]}")
+            return " / ".join(personal)
+        return self._acciones.get(col, "")
+
+    def _fondo(self, f, col):
+        if col != 4:
+            return None
+        if f[self.MORA]:
+            return Qt.yellow
+        if f[self.ANULADA]:
+            return Qt.lightGray
+        if f[self.FINALIZADA]:
+            return Qt.green
+        return None
+
+    def estado(self, f):
+        estado = "Anulada" if f[self.ANULADA] else ("Finalizada" if f[self.FINALIZADA] else "Activa")
+        return estado + (" ⚠ Mora" if f[self.MORA] else "")
+
+
 class FormVentas(QWidget):
     def __init__(self, usuario_actual=None):
         super().__init__()
@@ -38,23 +165,32 @@ class FormVentas(QWidget):
         titulo.setObjectName("titulo")
         layout.addWidget(titulo)
 
-        self.buscador = QLineEdit()
-        self.buscador.setPlaceholderText(
-            "Buscar por apellido, nombre, N° documento, producto o estado (activa, finalizada, anulada, mora)"
+        # Botones condicionados por permisos (se evalúan una sola vez, no por fila)
+        acciones = {}
+        for col, texto, tokens, slot in [
+            (6, "Detalle", ("0051", "detalle de venta"), self.ver_detalle_venta),
+            (7, "Editar", ("0052", "editar venta"), self.editar_venta),
+            (8, "Abrir Docs", ("0053", "abrir documentos"), self.abrir_documentos_venta),
+            (9, "Cobros", ("0054", "registrar cobros"), self.abrir_cobros),
+        ]:
+            if tiene_permiso_match(self.usuario_actual, *tokens):
+                acciones[col] = (texto, slot)
+
+        # Buscador + tabla paginada: el filtro y el orden se resuelven en SQL
+        self.modelo = ModeloVentas({c: t for c, (t, _) in acciones.items()})
+        self.grilla = GrillaPaginada(
+            self.modelo,
+            placeholder="Buscar por apellido, nombre, N° documento, producto o estado (activa, finalizada, anulada, mora)",
+            acciones={
+                col: (lambda fila, slot=slot: slot(fila[ModeloVentas.ID]))
+                for col, (_, slot) in acciones.items()
+            },
         )
-        self.buscador.textChanged.connect(self.filtrar_ventas)
-        layout.addWidget(self.buscador)
-
-        self.tabla = QTableWidget()
-        self.tabla.setColumnCount(10)
-        self.tabla.setHorizontalHeaderLabels([
-            "ID", "Fecha", "Cliente", "Monto", "Estado", "Personal", "Detalle", "Acciones", "Documentos", "Cobros"
-        ])
-        self.tabla.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.tabla.setAlternatingRowColors(True)
-        layout.addWidget(self.tabla)
-
-        self._show_loading("Cargando ventas…")
+        self.grilla.fallo.connect(self._error_carga)
+        self.buscador = self.grilla.buscador
+        self.tabla = self.grilla.tabla
+        layout.addWidget(self.grilla)
+
         QTimer.singleShot(0, self._load_after_paint)
 
         self.setStyleSheet(f"""
@@ -63,7 +199,7 @@ class FormVentas(QWidget):
                 font-weight: bold;
                 color: {PALETA['identidad']['primario_pressed']};
             }}
-            QTableWidget {{
+            QTableView {{
                 background-color: #ffffff;
                 border: 1px solid #dddddd;
                 border-radius: 6px;
@@ -88,106 +224,12 @@ class FormVentas(QWidget):
 
     # ---------- datos ----------
 
-    def cargar_datos(self):
-        with get_session() as session:
-            self.todas_las_ventas = (
-                session.query(Venta)
-                .options(
-                    joinedload(Venta.cliente),
-                    joinedload(Venta.producto),
-                    joinedload(Venta.cuotas),
-                    joinedload(Venta.coordinador),
-                    joinedload(Venta.vendedor),
-                    joinedload(Venta.cobrador),
-                )
-                .all()
-            )
-        self.mostrar_ventas(self.todas_las_ventas)
-
-    def mostrar_ventas(self, lista):
-        self.tabla.setUpdatesEnabled(False)
-        try:
-            self.tabla.clearContents()
-            self.tabla.setRowCount(len(lista))
-
-            for row_index, venta in enumerate(lista):
-                self.tabla.setItem(row_index, 0, QTableWidgetItem(str(venta.id)))
-                fecha_str = venta.fecha.strftime("%d/%m/%Y") if venta.fecha else ""
-                self.tabla.setItem(row_index, 1, QTableWidgetItem(fecha_str))
-                cliente = venta.cliente
-                if cliente:
-                    doc = formato_documento(cliente)
-                    cliente_str = f"{cliente.apellidos}, {cliente.nombres}" + (f" ({doc})" if doc else "")
-                else:
-                    cliente_str = ""
-                self.tabla.setItem(row_index, 2, QTableWidgetItem(cliente_str))
-                self.tabla.setItem(row_index, 3, QTableWidgetItem(f"${venta.monto:,.2f}" if venta.monto else ""))
-
-                # Estado
-                cuotas = venta.cuotas
-                if venta.anulada:
-                    estado = "Anulada"
-                elif venta.finalizada:
-                    estado = "Finalizada"
-                else:
-                    estado = "Activa"
-                con_mora = any(c.pagada and c.fecha_pago and c.fecha_pago > c.fecha_vencimiento for c in cuotas)
-                if con_mora:
-                    estado += " ⚠ Mora"
-                item_estado = QTableWidgetItem(estado)
-                if "Mora" in estado:
-                    item_estado.setBackground(Qt.yellow)
-                elif estado == "Anulada":
-                    item_estado.setBackground(Qt.lightGray)
-                elif estado == "Finalizada":
-                    item_estado.setBackground(Qt.green)
-                self.tabla.setItem(row_index, 4, item_estado)
-
-                # Personal
-                personal = []
-                if venta.coordinador:
-                    personal.append(f"C: {venta.coordinador.nombres}")
-                if venta.vendedor:
-                    personal.append(f"V: {venta.vendedor.nombres}")
-                if venta.cobrador:
-                    personal.append(f"Cob: {venta.cobrador.nombres}")
-                self.tabla.setItem(row_index, 5, QTableWidgetItem(" / ".join(personal)))
-
-                # Botones condicionados por permisos
-                # 0051: Detalle
-                if tiene_permiso_match(self.usuario_actual, "0051", "detalle de venta"):
-                    btn_ver = QPushButton("Detalle")
-                    btn_ver.clicked.connect(lambda checked=False, vid=venta.id: self.ver_detalle_venta(vid))
-                    self.tabla.setCellWidget(row_index, 6, btn_ver)
-                else:
-                    self.tabla.setCellWidget(row_index, 6, None)
-
-                # 0052: Editar
-                if tiene_permiso_match(self.usuario_actual, "0052", "editar venta"):
-                    btn_editar = QPushButton("Editar")
-                    btn_editar.clicked.connect(lambda checked=False, vid=venta.id: self.editar_venta(vid))
-                    self.tabla.setCellWidget(row_index, 7, btn_editar)
-                else:
-                    self.tabla.setCellWidget(row_index, 7, None)
-
-                # 0053: Abrir documentos
-                if tiene_permiso_match(self.usuario_actual, "0053", "abrir documentos"):
-                    btn_doc = QPushButton("Abrir Docs")
-                    btn_doc.clicked.connect(lambda checked=False, vid=venta.id: self.abrir_documentos_venta(vid))
-                    self.tabla.setCellWidget(row_index, 8, btn_doc)
-                else:
-                    self.tabla.setCellWidget(row_index, 8, None)
-
-                # 0054: Registrar cobros
-                if tiene_permiso_match(self.usuario_actual, "0054", "registrar cobros"):
-                    btn_cobros = QPushButton("Cobros")
-                    btn_cobros.clicked.connect(lambda checked=False, vid=venta.id: self.abrir_cobros(vid))
-                    self.tabla.setCellWidget(row_index, 9, btn_cobros)
-                else:
-                    self.tabla.setCellWidget(row_index, 9, None)
-
-        finally:
-            self.tabla.setUpdatesEnabled(True)
+    def cargar_datos(self, texto_carga="Cargando ventas…"):
+        """Vuelve a pedir la primera página con el filtro y orden actuales (en segundo plano)."""
+        self.grilla.recargar(texto_carga)
+
+    def _error_carga(self, mensaje):
+        QMessageBox.critical(self, "Error", f"No se pudo cargar el listado de ventas:\n{mensaje}")
 
     # ---------- acciones ----------
 
@@ -393,34 +435,10 @@ class FormVentas(QWidget):
     # ---------- filtro ----------
 
     def filtrar_ventas(self):
-        texto = self.normalizar(self.buscador.text())
-
-        def coincide(venta):
-            cli = venta.cliente
-            producto = venta.producto
-
-            estado = "anulada" if venta.anulada else "finalizada" if venta.finalizada else "activa"
-            con_mora = any(c.pagada and c.fecha_pago and c.fecha_pago > c.fecha_vencimiento for c in venta.cuotas)
-            if con_mora:
-                estado += " mora"
-
-            return (
-                (cli and (
-                    texto in self.normalizar(cli.apellidos) or
-                    texto in self.normalizar(cli.nombres) or
-                    texto in self.normalizar(cli.nro_documento)
-                )) or
-                (producto and texto in self.normalizar(producto.nombre)) or
-                (texto in self.normalizar(estado))
-            )
-
-        filtrados = [v for v in self.todas_las_ventas if coincide(v)]
-        self.mostrar_ventas(filtrados)
+        self.modelo.set_filtro(self.buscador.text())
 
     def normalizar(self, texto):
-        if not texto:
-            return ""
-        return unicodedata.normalize('NFKD', texto.lower()).encode('ASCII', 'ignore').decode('utf-8')
+        return normalizar(texto)
 
     # ---------- refresh ----------
 
@@ -429,50 +447,7 @@ class FormVentas(QWidget):
         event.accept()
 
     def _load_after_paint(self):
-        """Se ejecuta en el próximo ciclo del event loop: la UI ya está pintada."""
-        self.setUpdatesEnabled(False)
-        try:
-            self.cargar_datos()
-        finally:
-            self.setUpdatesEnabled(True)
-            self._hide_loading()
-
-    def _show_loading(self, text="Cargando…"):
-        from PySide6.QtWidgets import QFrame, QVBoxLayout, QLabel
-        # Reusar si ya existe
-        if getattr(self, "_loading_overlay", None):
-            self._loading_overlay.show()
-            self._loading_label.setText(text)
-            self._position_loading()
-            return
-
-        self._loading_overlay = QFrame(self)
-        self._loading_overlay.setStyleSheet(
-            "QFrame { background: rgba(255,255,255,220); border: 1px solid #ddd; border-radius: 8px; }"
-        )
-        self._loading_overlay.setAttribute(Qt.WA_TransparentForMouseEvents, True)
-
-        lay = QVBoxLayout(self._loading_overlay)
-        lay.setContentsMargins(20, 20, 20, 20)
-        lay.addStretch()
-        self._loading_label = QLabel(text, self._loading_overlay)
-        self._loading_label.setAlignment(Qt.AlignCenter)
-        self._loading_label.setStyleSheet("QLabel { font-size: 16px; color: #555; }")
-        lay.addWidget(self._loading_label)
-        lay.addStretch()
-
-        self._position_loading()
-        self._loading_overlay.show()
-
-    def _position_loading(self):
-        self._loading_overlay.setGeometry(self.rect())
-
-    def _hide_loading(self):
-        if getattr(self, "_loading_overlay", None):
-            self._loading_overlay.hide()
-
-    def resizeEvent(self, e):
-        super().resizeEvent(e)
-        if getattr(self, "_loading_overlay", None):
-            self._position_loading()
+        """Se ejecuta en el próximo ciclo del event loop: la UI ya está pintada.
+        La consulta corre en segundo plano; la grilla oculta el overlay al llegar la página."""
+        self.cargar_datos()
 
@@ -8,7 +8,7 @@ from PySide6.QtCore import Qt, Signal
 from collections import defaultdict, OrderedDict
 from database import get_session
 from models import Usuario, Permiso, Rol
-from utils.permisos import es_admin, contar_admins_activos
+from utils.permisos import es_admin, contar_admins_activos, invalidar_permisos
 from utils.guards import require_perm_or_close
 from utils.estilos import PALETA
 
@@ -355,6 +355,8 @@ class FormPermisos(QWidget):
                 usuario.permisos.clear()
                 usuario.permisos.extend(permisos_seleccionados)
                 session.commit()
+            # En esta PC el cambio se ve en el próximo chequeo; en las demás, al vencer el TTL
+            invalidar_permisos(usuario_id)
         except Exception as e:
             QMessageBox.critical(self, "Error", str(e))
             return
@@ -10,6 +10,7 @@ from utils.guards import require_perm_or_close
 from utils.permisos import tiene_permiso_match
 from utils.dialogos import confirmar
 from utils.estilos import PALETA
+from utils import cotizador
 
 class FormProducto(QDialog):  # ...
     def __init__(self, producto_id=None, parent=None, usuario=None):
@@ -408,6 +409,8 @@ class FormProducto(QDialog):  # ...
                     session.add(producto)
                     mensaje_exito = "Producto guardado correctamente"
                 session.commit()
+                # La tasa pudo cambiar: descartar la matriz de cotizacion del producto
+                cotizador.invalidar(producto.id)
             QMessageBox.information(self, "Éxito", mensaje_exito)
             self.accept()
         except Exception as e:
@@ -428,6 +431,7 @@ class FormProducto(QDialog):  # ...
                     if producto:
                         session.delete(producto)
                         session.commit()
+                        cotizador.invalidar(self.producto_id)
                         print("DEBUG: Producto eliminado OK")
                     else:
                         QMessageBox.warning(self, "Error", "Producto no encontrado.")
@@ -182,7 +182,7 @@ class FormRecuperarAcceso(QWidget):
                     return
                 user.password = hash_password(nueva)
                 user.must_change_password = True
-                user.last_password_change = datetime.now()
+                user.last_password_change = datetime.utcnow()
                 user.failed_attempts = 0
                 user.lock_until = None
                 session.commit()
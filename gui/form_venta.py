@@ -1,18 +1,20 @@
 from PySide6.QtWidgets import (
     QWidget, QLabel, QLineEdit, QTextEdit, QPushButton, QVBoxLayout,
-    QFormLayout, QSpinBox, QDoubleSpinBox, QHBoxLayout, QCompleter, QMessageBox,
+    QFormLayout, QSpinBox, QDoubleSpinBox, QHBoxLayout, QMessageBox,
     QCheckBox, QScrollArea, QFrame, QDialog, QDialogButtonBox, QToolTip, QSizePolicy
 )
 from PySide6.QtGui import QCursor
 from PySide6.QtCore import Signal, QDate, QTimer, Qt, QEvent
 from database import get_session
-from models import Cliente, Garante, Producto, Personal, Venta, Cuota, Cobro
-from sqlalchemy.orm import joinedload
+from models import Cliente, Garante, Producto, Personal, Venta, Cobro
+from sqlalchemy.orm import joinedload, selectinload
+from functools import partial
+from gui.completador_remoto import CompletadorRemoto
+from services.busquedas import sentencia_buscar_personas
 from gui.form_cliente import FormCliente
 from gui.form_garante import FormGarante
 from datetime import date
-from dateutil.relativedelta import relativedelta
-from utils.finanzas import tasa_efectiva_por_plan, calcular_cuota_frances
+from utils.finanzas import tasa_desde_cuota, tem_desde_tasa_periodo, tea_desde_tem
 from utils.guards import require_perm_or_close
 import os
 from utils.widgets_custom import ComboBoxSinScroll, DateEditSinScroll
@@ -29,6 +31,17 @@ def _display_persona(obj) -> str:
     return f"{base} ({doc})" if doc else base
 
 
+def buscar_personas(entidad, texto: str, limite: int) -> list:
+    """
+    Clientes o garantes (según entidad) que coinciden con lo tipeado, como
+    (id, texto visible). Corre en segundo plano: abre su propia sesión y
+    devuelve tuplas.
+    """
+    with get_session() as session:
+        filas = session.execute(sentencia_buscar_personas(entidad, texto, limite)).all()
+    return [(f.id, _display_persona(f)) for f in filas]
+
+
 class ConfirmarVentaDialog(QDialog):
     def __init__(self, parent, items):
         super().__init__(parent)
@@ -150,7 +163,7 @@ class FormVenta(QWidget):
             QPushButton {{ background-color: {i['primario']}; color: white; }}
             QPushButton:hover {{ background-color: {i['primario_hover']}; }}
         """)
-        self.btn_refresh_cliente.setToolTip("Actualizar listado de clientes")
+        self.btn_refresh_cliente.setToolTip("Volver a buscar clientes")
 
         self.btn_nuevo_cliente.clicked.connect(self.abrir_form_cliente)
         self.btn_refresh_cliente.clicked.connect(self.cargar_clientes)
@@ -158,7 +171,7 @@ class FormVenta(QWidget):
         btns.addWidget(self.btn_nuevo_cliente)
         btns.addWidget(self.btn_refresh_cliente)
         self.form.addRow(lbl, btns)
-        self.form.addRow("", QLabel("Buscar por apellido o N° documento", styleSheet="font-size:11px;color:gray;"))
+        self.form.addRow("", QLabel("Buscar por apellido, nombre o N° documento", styleSheet="font-size:11px;color:gray;"))
 
         # --- Garante (opcional) ---
         lbl = QLabel("Garante:"); lbl.setStyleSheet(label_style)
@@ -177,7 +190,7 @@ class FormVenta(QWidget):
             QPushButton {{ background-color: {i['primario']}; color: white; }}
             QPushButton:hover {{ background-color: {i['primario_hover']}; }}
         """)
-        self.btn_refresh_garante.setToolTip("Actualizar listado de garantes")
+        self.btn_refresh_garante.setToolTip("Volver a buscar garantes")
 
         self.btn_nuevo_garante.clicked.connect(self.abrir_form_garante)
         self.btn_refresh_garante.clicked.connect(self.cargar_garantes)
@@ -185,7 +198,7 @@ class FormVenta(QWidget):
         btns2.addWidget(self.btn_nuevo_garante)
         btns2.addWidget(self.btn_refresh_garante)
         self.form.addRow(lbl, btns2)
-        self.form.addRow("", QLabel("Buscar por apellido o N° documento", styleSheet="font-size:11px;color:gray;"))
+        self.form.addRow("", QLabel("Buscar por apellido, nombre o N° documento", styleSheet="font-size:11px;color:gray;"))
 
         # --- Producto / Plan (requeridos) ---
         lbl = QLabel("Producto:"); lbl.setStyleSheet(label_style)
@@ -292,7 +305,8 @@ class FormVenta(QWidget):
         self.form.addRow("", self.btn_calcular)
 
         # --- Salidas ---
-        for text, attr in [("PTF:", 'ptf_output'), ("Interés (%):", 'interes_output')]:
+        for text, attr in [("PTF:", 'ptf_output'), ("Interés (%):", 'interes_output'),
+                           ("TEM implícita (%):", 'tem_implicita_output')]:
             lbl = QLabel(text); lbl.setStyleSheet(label_style)
             out = QLineEdit(readOnly=True); out.setStyleSheet("background:#f5f5f5;")
             out.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
@@ -354,9 +368,8 @@ class FormVenta(QWidget):
         self._lock_focus_to_tab_click()
         QTimer.singleShot(0, self._sync_button_sizes)
 
-        # Carga inicial
-        self.cargar_clientes()
-        self.cargar_garantes()
+        # Carga inicial (clientes y garantes se buscan en la base al tipear)
+        self._crear_buscadores_personas()
         self.cargar_productos()
         self.producto_combo.currentIndexChanged.connect(self._on_producto_changed)
         self._on_producto_changed(self.producto_combo.currentIndex())
@@ -389,6 +402,7 @@ class FormVenta(QWidget):
         self._ptf_calculado = False
         if hasattr(self, "ptf_output"): self.ptf_output.clear()
         if hasattr(self, "interes_output"): self.interes_output.clear()
+        if hasattr(self, "tem_implicita_output"): self.tem_implicita_output.clear()
 
     def _calcular_desvio_cuota(self):
         """Compara la cuota cargada contra la cuota teorica (sistema frances)
@@ -399,11 +413,11 @@ class FormVenta(QWidget):
         cuota_cargada = self.valor_cuota_input.value()
         if monto <= 0 or n_cuotas <= 0 or cuota_cargada <= 0:
             return None, None
+        from utils.cotizador import matriz_para_tem  # numpy: se carga al primer cálculo
         try:
             tem = self.tem_input.value() / 100
             plan = self.plan_pago_combo.currentText()
-            tasa_periodo = tasa_efectiva_por_plan(tem, plan)
-            cuota_teorica = calcular_cuota_frances(monto, tasa_periodo, n_cuotas)
+            cuota_teorica = matriz_para_tem(tem).cuota(plan, monto, n_cuotas)
         except (ValueError, ZeroDivisionError):
             return None, None
         if cuota_teorica == 0:
@@ -411,6 +425,17 @@ class FormVenta(QWidget):
         desvio_pct = abs(cuota_cargada - cuota_teorica) / cuota_teorica * 100
         return cuota_teorica, desvio_pct
 
+    def _tem_implicita(self):
+        """TEM (decimal) implicita en el Valor de Cuota cargado, segun monto,
+        cuotas y plan de pago. None si no hay una tasa posible."""
+        try:
+            tasa_periodo = tasa_desde_cuota(
+                self.monto_input.value(), self.valor_cuota_input.value(), self.cuotas_input.value()
+            )
+            return tem_desde_tasa_periodo(tasa_periodo, self.plan_pago_combo.currentText())
+        except (ValueError, ZeroDivisionError, OverflowError):
+            return None
+
     def _mostrar_confirmacion_guardado(self, texto_cliente, texto_garante):
         items = [
             ("Cliente", texto_cliente),
@@ -436,6 +461,8 @@ class FormVenta(QWidget):
                 "⚠ Desvío de tasa",
                 f"Cuota cargada difiere {desvio_pct:.2f}% de la teórica "
                 f"(${cuota_teorica:.2f} según TEM {self.tem_input.value():.3f}%)"
+                + (f"; TEM implícita {self.tem_implicita_output.text()}%"
+                   if self.tem_implicita_output.text() else "")
             ))
 
         dlg = ConfirmarVentaDialog(self, items)
@@ -525,12 +552,10 @@ class FormVenta(QWidget):
     def abrir_form_cliente(self):
         self.nuevo_cliente = FormCliente(usuario=self.usuario_actual)
         self.nuevo_cliente.showMaximized()
-        self.nuevo_cliente.destroyed.connect(lambda: QTimer.singleShot(100, self.cargar_clientes))
 
     def abrir_form_garante(self):
         self.nuevo_garante = FormGarante(usuario=self.usuario_actual)
         self.nuevo_garante.showMaximized()
-        self.nuevo_garante.destroyed.connect(lambda: QTimer.singleShot(100, self.cargar_garantes))
 
     # --- Carga de edición ---
     def cargar_venta_existente(self):
@@ -563,8 +588,10 @@ class FormVenta(QWidget):
 
         # --- Datos base ---
         self.cliente_input.setText(_display_persona(venta.cliente))
+        self.cliente_id = venta.cliente_id
         if venta.garante:
             self.garante_input.setText(_display_persona(venta.garante))
+            self.garante_id = venta.garante_id
 
         campos_bloqueados = [
             self.cliente_input, self.garante_input, self.producto_combo, self.plan_pago_combo,
@@ -685,23 +712,33 @@ class FormVenta(QWidget):
         self._lock_focus_to_tab_click()
 
     # --- Cargas ---
+    def _crear_buscadores_personas(self):
+        # Nada se carga al abrir: cada completador consulta la base con lo tipeado
+        # y el formulario guarda directamente el ID elegido.
+        self.cliente_id = None
+        self.garante_id = None
+        self.completador_cliente = CompletadorRemoto(self.cliente_input, partial(buscar_personas, Cliente))
+        self.completador_garante = CompletadorRemoto(self.garante_input, partial(buscar_personas, Garante))
+        for editor, comp, attr in (
+            (self.cliente_input, self.completador_cliente, "cliente_id"),
+            (self.garante_input, self.completador_garante, "garante_id"),
+        ):
+            comp.popup().installEventFilter(self)
+            comp.seleccionado.connect(partial(setattr, self, attr))
+            # Si el usuario cambia el texto a mano, la selección anterior deja de valer
+            editor.textEdited.connect(lambda _, attr=attr: setattr(self, attr, None))
+
+    def _id_elegido(self, editor, comp, id_actual):
+        """ID de la persona del campo: la elegida en el popup o una opción escrita tal cual."""
+        return id_actual if id_actual is not None else comp.id_para(editor.text())
+
     def cargar_clientes(self):
-        with get_session() as session:
-            self.clientes = session.query(Cliente).all()
-        lista = [_display_persona(c) for c in self.clientes]
-        comp = QCompleter(lista); comp.setCaseSensitivity(Qt.CaseInsensitive)
-        comp.setFilterMode(Qt.MatchContains)
-        self.cliente_input.setCompleter(comp)
-        comp.popup().installEventFilter(self)
+        """Repite la búsqueda del texto actual (p. ej. después de dar de alta un cliente)."""
+        self.completador_cliente.actualizar()
 
     def cargar_garantes(self):
-        with get_session() as session:
-            self.garantes = session.query(Garante).all()
-        lista = [_display_persona(g) for g in self.garantes]
-        comp = QCompleter(lista); comp.setCaseSensitivity(Qt.CaseInsensitive)
-        comp.setFilterMode(Qt.MatchContains)
-        self.garante_input.setCompleter(comp)
-        comp.popup().installEventFilter(self)
+        """Repite la búsqueda del texto actual (p. ej. después de dar de alta un garante)."""
+        self.completador_garante.actualizar()
 
     def cargar_productos(self):
         self.producto_combo.clear()
@@ -736,6 +773,15 @@ class FormVenta(QWidget):
         monto = self.monto_input.value()
         interes = ((ptf - monto) / monto * 100) if monto > 0 else 0
         self.interes_output.setText(f"{interes:.2f}")
+        tem_impl = self._tem_implicita()
+        if tem_impl is not None:
+            self.tem_implicita_output.setText(f"{tem_impl * 100:.3f}")
+            self.tem_implicita_output.setToolTip(
+                f"Tasa efectiva que resulta del Valor de Cuota cargado. "
+                f"TEA equivalente: {tea_desde_tem(tem_impl) * 100:.3f}%"
+            )
+        else:
+            self.tem_implicita_output.clear()
         self._ptf_calculado = True
 
     def calcular_cuota_sugerida(self):
@@ -748,11 +794,11 @@ class FormVenta(QWidget):
         if self.cuotas_input.value() <= 0:
             QMessageBox.warning(self, "Dato requerido", "La cantidad de cuotas debe ser mayor que 0."); return
 
+        from utils.cotizador import matriz_para_tem  # numpy: se carga al primer cálculo
         tem = self.tem_input.value() / 100
         plan = self.plan_pago_combo.currentText()
         try:
-            tasa_periodo = tasa_efectiva_por_plan(tem, plan)
-            cuota = calcular_cuota_frances(self.monto_input.value(), tasa_periodo, self.cuotas_input.value())
+            cuota = matriz_para_tem(tem).cuota(plan, self.monto_input.value(), self.cuotas_input.value())
         except ValueError as e:
             QMessageBox.warning(self, "Error de calculo", str(e)); return
 
@@ -822,9 +868,8 @@ class FormVenta(QWidget):
             # --- MODO CREACIÓN (nueva venta) ---
             # A partir de acá se aplican las validaciones completas y el requisito de PTF.
             texto = self.cliente_input.text()
-            cliente = next((c for c in self.clientes
-                            if _display_persona(c) == texto), None)
-            if not cliente:
+            cliente_id = self._id_elegido(self.cliente_input, self.completador_cliente, self.cliente_id)
+            if cliente_id is None:
                 QMessageBox.warning(self, "Dato requerido", "Seleccioná un cliente válido."); return
 
             if self.producto_combo.currentData() is None:
@@ -851,17 +896,20 @@ class FormVenta(QWidget):
 
             # Garante opcional
             texto2 = self.garante_input.text()
-            garante = next((g for g in self.garantes
-                            if _display_persona(g) == texto2), None)
+            garante_id = self._id_elegido(self.garante_input, self.completador_garante, self.garante_id)
+            if texto2.strip() and garante_id is None:
+                QMessageBox.warning(self, "Dato inválido",
+                                    "Seleccioná un garante de la lista o dejá el campo vacío."); return
 
             # Confirmación previa (ventana detalle)
             if not self._mostrar_confirmacion_guardado(texto, texto2):
                 return
 
-            # Crear nueva venta
-            venta = Venta(
-                cliente_id=cliente.id,
-                garante_id=(garante.id if garante else None),
+            # Crear nueva venta (con su cronograma de cuotas)
+            from services.ventas import crear_venta
+            venta_id = crear_venta(
+                cliente_id=cliente_id,
+                garante_id=garante_id,
                 producto_id=self.producto_combo.currentData(),
                 plan_pago=self.plan_pago_combo.currentText(),
                 coordinador_id=self.coordinador_combo.currentData(),
@@ -882,40 +930,6 @@ class FormVenta(QWidget):
                 descripcion=None,
                 creada_por_id=(self.usuario_actual.id if getattr(self, "usuario_actual", None) else None)
             )
-            with get_session() as session:
-                session.add(venta)
-                session.flush()  # obtiene venta.id sin cerrar la transacción
-
-                # Generar cuotas…
-                freq = venta.plan_pago
-                inicio = venta.fecha_inicio_pago or venta.fecha
-                for i in range(venta.num_cuotas):
-                    if freq == "mensual": fv = inicio + relativedelta(months=i)
-                    elif freq == "semanal": fv = inicio + relativedelta(weeks=i)
-                    else: fv = inicio + relativedelta(days=i)
-                    cuota = Cuota(
-                        venta_id=venta.id, numero=i + 1, fecha_vencimiento=fv,
-                        monto_original=venta.valor_cuota, monto_pagado=0.0, pagada=False
-                    )
-                    session.add(cuota)
-                session.commit()
-
-            # Re-cargar con todas las relaciones para los generadores de documentos
-            with get_session() as _rs:
-                venta = (
-                    _rs.query(Venta)
-                    .options(
-                        joinedload(Venta.cliente),
-                        joinedload(Venta.garante),
-                        joinedload(Venta.producto),
-                        joinedload(Venta.cuotas),
-                        joinedload(Venta.coordinador),
-                        joinedload(Venta.vendedor),
-                        joinedload(Venta.cobrador),
-                    )
-                    .filter_by(id=venta.id)
-                    .first()
-                )
 
             # Diálogo de docs (igual que antes)...
             msg = QMessageBox(self)
@@ -929,6 +943,7 @@ class FormVenta(QWidget):
             msg.exec()
 
             if msg.clickedButton() == btn_si:
+                venta = self._venta_para_documentos(venta_id)
                 dlg = QDialog(self)
                 dlg.setWindowTitle("Seleccionar formato")
                 dlg.setMinimumWidth(300)
@@ -969,6 +984,24 @@ class FormVenta(QWidget):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"No se pudo guardar la venta:\n{e}")
 
+    def _venta_para_documentos(self, venta_id):
+        """La venta con todas las relaciones que usan los generadores de documentos."""
+        with get_session() as _rs:
+            return (
+                _rs.query(Venta)
+                .options(
+                    joinedload(Venta.cliente),
+                    joinedload(Venta.garante),
+                    joinedload(Venta.producto),
+                    selectinload(Venta.cuotas),
+                    joinedload(Venta.coordinador),
+                    joinedload(Venta.vendedor),
+                    joinedload(Venta.cobrador),
+                )
+                .filter_by(id=venta_id)
+                .first()
+            )
+
     def _mover_boton_guardar_al_final(self):
         # Mueve el botón al final del QFormLayout sin que Qt lo destruya
         from PySide6.QtWidgets import QFormLayout
@@ -0,0 +1,120 @@
+"""
+gui/grilla_paginada.py
+
+Buscador + tabla paginada, para listados que crecen sin límite.
+
+GrillaPaginada arma el QLineEdit de búsqueda, el QTableView sobre un
+ModeloPaginadoSQL y el overlay de "Cargando…". El texto del buscador va
+al modelo (y de ahí a la base) recién cuando el usuario deja de tipear
+DEMORA_MS; no hay filtrado en Python ni se traen todos los registros.
+
+Las columnas de botones se dibujan con DelegadoBoton: acciones es
+{columna: slot}, y el slot recibe la tupla de la fila clickeada.
+
+El overlay de "Cargando…" vive sólo acá: los listados paginados
+(clientes, garantes, ventas) lo muestran a través de la grilla.
+"""
+
+from PySide6.QtCore import Qt, QTimer, Signal
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLineEdit, QTableView, QHeaderView, QFrame, QLabel
+
+from gui.modelo_paginado import DelegadoBoton
+
+
+class GrillaPaginada(QWidget):
+    DEMORA_MS = 300
+
+    # Falla de la consulta de una página (mensaje de error)
+    fallo = Signal(str)
+
+    def __init__(self, modelo, placeholder: str = "", acciones: dict | None = None, parent=None):
+        super().__init__(parent)
+        self.modelo = modelo
+        modelo.setParent(self)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(20)
+
+        self.buscador = QLineEdit()
+        self.buscador.setPlaceholderText(placeholder)
+        # El filtro va a la base: esperar a que el usuario deje de tipear
+        self._timer_filtro = QTimer(self)
+        self._timer_filtro.setSingleShot(True)
+        self._timer_filtro.setInterval(self.DEMORA_MS)
+        self._timer_filtro.timeout.connect(self._aplicar_filtro)
+        self.buscador.textChanged.connect(self._timer_filtro.start)
+        layout.addWidget(self.buscador)
+
+        self.tabla = QTableView()
+        self.tabla.setModel(modelo)
+        self.tabla.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        columna_orden = -1 if modelo.COLUMNA_ORDEN is None else modelo.COLUMNA_ORDEN
+        self.tabla.horizontalHeader().setSortIndicator(columna_orden, Qt.AscendingOrder)
+        self.tabla.setSortingEnabled(True)
+        self.tabla.verticalHeader().setVisible(False)
+        self.tabla.setAlternatingRowColors(True)
+        self.tabla.setMouseTracking(True)
+        self._delegados = []
+        for col, slot in (acciones or {}).items():
+            delegado = DelegadoBoton(self.tabla)
+            delegado.clicked.connect(lambda row, slot=slot: slot(self.modelo.fila(row)))
+            self.tabla.setItemDelegateForColumn(col, delegado)
+            self._delegados.append(delegado)
+        layout.addWidget(self.tabla)
+
+        modelo.recargado.connect(self._hide_loading)
+        modelo.fallo.connect(self._on_fallo)
+
+    # ---------- API ----------
+    def recargar(self, texto_carga: str = "Cargando…"):
+        """Vuelve a pedir la primera página (filtro y orden actuales) con el overlay visible."""
+        self._timer_filtro.stop()
+        self._show_loading(texto_carga)
+        self.modelo.recargar(self.buscador.text())
+
+    # ---------- Internos ----------
+    def _aplicar_filtro(self):
+        self.modelo.set_filtro(self.buscador.text())
+
+    def _on_fallo(self, mensaje):
+        self._hide_loading()
+        self.fallo.emit(mensaje)
+
+    def _show_loading(self, text="Cargando…"):
+        if getattr(self, "_loading_overlay", None):
+            self._loading_overlay.show()
+            self._loading_label.setText(text)
+            self._position_loading()
+            return
+
+        self._loading_overlay = QFrame(self)
+        self._loading_overlay.setStyleSheet(
+            "QFrame { background: rgba(255,255,255,220); "
+            "border: 1px solid #ddd; border-radius: 8px; }"
+        )
+        self._loading_overlay.setAttribute(Qt.WA_TransparentForMouseEvents, True)
+
+        lay = QVBoxLayout(self._loading_overlay)
+        lay.setContentsMargins(20, 20, 20, 20)
+        lay.addStretch()
+        self._loading_label = QLabel(text, self._loading_overlay)
+        self._loading_label.setAlignment(Qt.AlignCenter)
+        self._loading_label.setStyleSheet("QLabel { font-size: 16px; color: #555; }")
+        lay.addWidget(self._loading_label)
+        lay.addStretch()
+
+        self._position_loading()
+        self._loading_overlay.show()
+
+    def _position_loading(self):
+        self._loading_overlay.setGeometry(self.rect())
+
+    def _hide_loading(self):
+        if getattr(self, "_loading_overlay", None):
+            self._loading_overlay.hide()
+
+    def resizeEvent(self, e):
+        super().resizeEvent(e)
+        if getattr(self, "_loading_overlay", None):
+            self._position_loading()
@@ -2,9 +2,32 @@ from PySide6.QtWidgets import QDialog, QVBoxLayout, QLabel, QLineEdit, QHBoxLayo
 from PySide6.QtCore import Qt
 from database import get_session
 from models import Usuario
-from utils.security import hash_password, verify_password
+from utils.carga_async import CargadorDatos
+from utils.security import hash_executor, verify_and_rehash
 from utils.estilos import PALETA
 
+def verificar_desbloqueo(usuario_id: int, plain: str):
+    """
+    Corre en un hilo de trabajo. Devuelve True/False según la contraseña, o
+    None si el usuario ya no existe o está inactivo. Como en el login, la
+    sesión no queda abierta durante el hash y el hash viejo se migra.
+    """
+    with get_session() as session:
+        user = session.get(Usuario, usuario_id)
+        if not user or not user.activo:
+            return None
+        guardado = user.password
+
+    ok, hash_nuevo = hash_executor().submit(verify_and_rehash, plain, guardado).result()
+    if ok and hash_nuevo:
+        with get_session() as session:
+            user = session.get(Usuario, usuario_id)
+            if user and user.password == guardado:
+                user.password = hash_nuevo
+                session.commit()
+    return ok
+
+
 class LockScreenDialog(QDialog):
     """
     Diálogo modal de bloqueo: pide la contraseña del usuario actual para desbloquear.
@@ -59,24 +82,38 @@ class LockScreenDialog(QDialog):
 
         # Evitá cerrar con ESC o con la X (opcional):
         self.setWindowFlag(Qt.WindowCloseButtonHint, False)
+        self._cargador = CargadorDatos(self)
 
     def _try_unlock(self):
         plain = (self.input.text() or "").strip()
         if not plain:
             QMessageBox.warning(self, "Campos vacíos", "Ingresá tu contraseña."); return
+        if self._cargador.ocupado("desbloqueo"):
+            return
 
-        with get_session() as session:
-            user = session.get(Usuario, self.usuario.id)
-            if not user or not user.activo:
-                QMessageBox.critical(self, "Sesión inválida", "Tu usuario no está disponible. Cerrando sesión.")
-                self._quit_app()
-                return
-            ok, is_legacy = verify_password(plain, user.password)
-            if ok and is_legacy:
-                user.password = hash_password(plain)
-                session.commit()
+        # Argon2 fuera del hilo de la GUI: la ventana sigue respondiendo
+        self._set_verificando(True)
+        self._cargador.ejecutar(
+            verificar_desbloqueo, self.usuario.id, plain,
+            al_terminar=self._desbloqueo_resuelto, al_fallar=self._desbloqueo_fallido, clave="desbloqueo",
+        )
+
+    def _set_verificando(self, activo: bool):
+        self.input.setEnabled(not activo)
+        self.btn_unlock.setEnabled(not activo)
+        self.btn_unlock.setText("Verificando…" if activo else "Desbloquear")
+
+    def _desbloqueo_fallido(self, error):
+        self._set_verificando(False)
+        print(f"[ERROR desbloqueo] {error}")
+        QMessageBox.critical(self, "Error", "No se pudo verificar la contraseña. Intentá nuevamente.")
 
-        if ok:
+    def _desbloqueo_resuelto(self, ok):
+        self._set_verificando(False)
+        if ok is None:
+            QMessageBox.critical(self, "Sesión inválida", "Tu usuario no está disponible. Cerrando sesión.")
+            self._quit_app()
+        elif ok:
             self.accept()
         else:
             QMessageBox.critical(self, "Contraseña incorrecta", "La contraseña no es válida.")
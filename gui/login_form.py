@@ -8,18 +8,14 @@ from database import get_session
 from models import Usuario
 from sqlalchemy.orm import joinedload
 import os
-from datetime import datetime, timedelta
+from datetime import datetime
 import pyotp
-from gui.two_factor_setup import TwoFactorSetupDialog
 from models import get_setting
-from utils.security import hash_password, verify_password
+from services import auth
+from utils.security import hash_password
+from utils.carga_async import CargadorDatos
 from utils.estilos import PALETA
 
-PASSWORD_MAX_AGE_DAYS = 60
-LOCK_THRESHOLD = 5
-LOCK_MINUTES = 15
-
-
 class ChangePasswordDialog(QDialog):
     def __init__(self, parent, usuario: Usuario):
         super().__init__(parent)
@@ -141,6 +137,25 @@ class TokenDialog(QDialog):
         return (self.code.text() or "").strip()
 
 
+def autenticar(nombre_usuario: str, password: str):
+    """
+    Corre en un hilo de trabajo: los mismos pasos que el login de la API
+    (services.auth.login: bloqueo, Argon2 en su ejecutor, migración de hash,
+    vencimiento, marcas de acceso, política 2FA). Devuelve (LoginResult,
+    Usuario con permisos, rol y personal cargados, o None).
+    """
+    resultado = auth.login(nombre_usuario, password)
+    if resultado.usuario_id is None:
+        return resultado, None
+    with get_session() as session:
+        usuario = session.get(Usuario, resultado.usuario_id, options=[
+            joinedload(Usuario.permisos),
+            joinedload(Usuario.rol),
+            joinedload(Usuario.personal),
+        ])
+    return resultado, usuario
+
+
 class LoginForm(QWidget):
     def __init__(self, on_login_success):
         super().__init__()
@@ -164,6 +179,7 @@ class LoginForm(QWidget):
         self.btn_login = QPushButton("Ingresar")
         self.btn_login.setFixedHeight(40)
         self.btn_login.clicked.connect(self.verificar_credenciales)
+        self._cargador = CargadorDatos(self)
 
         form_layout = QVBoxLayout(); form_layout.setSpacing(12)
         form_layout.addWidget(QLabel("Usuario:")); form_layout.addWidget(self.user_input)
@@ -189,89 +205,57 @@ class LoginForm(QWidget):
     def verificar_credenciales(self):
         nombre_usuario = (self.user_input.text() or "").strip()
         password = (self.password_input.text() or "").strip()
+        if self._cargador.ocupado("login"):
+            return
 
-        # 1. Cargar usuario con relaciones eager
-        with get_session() as session:
-            usuario = (
-                session.query(Usuario)
-                .options(
-                    joinedload(Usuario.permisos),
-                    joinedload(Usuario.rol),
-                    joinedload(Usuario.personal),
-                )
-                .filter_by(nombre=nombre_usuario)
-                .first()
-            )
+        # Búsqueda, Argon2 y registro del intento corren fuera del hilo de la GUI
+        self._set_verificando(True)
+        self._cargador.ejecutar(
+            autenticar, nombre_usuario, password,
+            al_terminar=self._login_resuelto, al_fallar=self._login_fallido, clave="login",
+        )
 
-        if (not usuario) or (not usuario.activo):
-            QMessageBox.critical(self, "Error", "Usuario o contraseña incorrectos.")
-            return
+    def _set_verificando(self, activo: bool):
+        self.user_input.setEnabled(not activo)
+        self.password_input.setEnabled(not activo)
+        self.btn_login.setEnabled(not activo)
+        self.btn_login.setText("Verificando…" if activo else "Ingresar")
 
-        now = datetime.utcnow()
-        if usuario.lock_until and usuario.lock_until > now:
-            minutos = int((usuario.lock_until - now).total_seconds() // 60) + 1
-            QMessageBox.warning(self, "Cuenta bloqueada", f"Intentá nuevamente en {minutos} min.")
-            return
+    def _login_fallido(self, error):
+        self._set_verificando(False)
+        print(f"[ERROR login] {error}")
+        QMessageBox.critical(self, "Error", "No se pudo verificar el usuario. Intentá nuevamente.")
 
-        ok, legacy = verify_password(password, usuario.password)
-        if not ok:
-            # 2. Registrar intento fallido
-            with get_session() as session:
-                u = session.get(Usuario, usuario.id)
-                u.failed_attempts = (u.failed_attempts or 0) + 1
-                if u.failed_attempts >= LOCK_THRESHOLD:
-                    u.failed_attempts = 0
-                    u.lock_until = now + timedelta(minutes=LOCK_MINUTES)
-                    session.commit()
-                    QMessageBox.warning(self, "Cuenta bloqueada", f"Demasiados intentos. Bloqueada por {LOCK_MINUTES} min.")
-                else:
-                    session.commit()
-                    QMessageBox.critical(self, "Error", "Usuario o contraseña incorrectos.")
+    def _login_resuelto(self, datos):
+        resultado, usuario = datos
+        self._set_verificando(False)
+
+        if resultado.status == auth.STATUS_INVALID:
+            QMessageBox.critical(self, "Error", "Usuario o contraseña incorrectos.")
             return
 
-        # 3. Resetear contadores y migrar hash legacy si aplica
-        with get_session() as session:
-            u = session.get(Usuario, usuario.id)
-            u.failed_attempts = 0
-            u.lock_until = None
-            if legacy:
-                u.password = hash_password(password)
-                usuario.password = u.password
-                if not u.last_password_change:
-                    u.last_password_change = now
-                    usuario.last_password_change = now
-            session.commit()
+        if resultado.status == auth.STATUS_LOCKED:
+            QMessageBox.warning(self, "Cuenta bloqueada", f"Intentá nuevamente en {resultado.minutos_restantes} min.")
+            return
 
-        # 4. Cambio de contraseña forzado si corresponde
-        expired = (not usuario.last_password_change) or ((now - usuario.last_password_change).days >= PASSWORD_MAX_AGE_DAYS)
-        if usuario.must_change_password or expired:
+        # Cambio de contraseña forzado: con la clave nueva se vuelve a ingresar solo
+        if resultado.status == auth.STATUS_PASSWORD_CHANGE:
             dlg = ChangePasswordDialog(self, usuario)
             if dlg.exec() != QDialog.Accepted:
                 QMessageBox.information(self, "Acción requerida", "Debés cambiar tu contraseña para continuar.")
                 return
+            self.password_input.setText(dlg.new1.text().strip())
+            self.verificar_credenciales()
+            return
 
-        # 5. Registrar acceso
-        with get_session() as session:
-            u = session.get(Usuario, usuario.id)
-            u.previous_login_at = usuario.last_login_at
-            u.last_login_at = now
-            session.commit()
-        usuario.previous_login_at = usuario.last_login_at
-        usuario.last_login_at = now
-
-        # 6. Política 2FA
-        with get_session() as session:
-            require_global = (get_setting(session, "require_2fa_global", "0") == "1")
-        require_user = bool(getattr(usuario, "require_2fa", False))
-        is_enabled   = bool(getattr(usuario, "totp_enabled", False) and getattr(usuario, "totp_secret", None))
-        need_token   = require_global or require_user or is_enabled
-
-        if need_token:
-            if not getattr(usuario, "totp_enabled", False) or not getattr(usuario, "totp_secret", None):
+        # Política 2FA (el servicio ya registró el acceso)
+        if resultado.status in (auth.STATUS_2FA_SETUP, auth.STATUS_2FA_REQUIRED):
+            if resultado.status == auth.STATUS_2FA_SETUP:
                 QMessageBox.information(
                     self, "Token requerido",
                     "Tu cuenta requiere un token de 6 dígitos (2FA). Vamos a configurarlo ahora."
                 )
+                from gui.two_factor_setup import TwoFactorSetupDialog  # qrcode/PIL: sólo si hace falta
                 dlg_setup = TwoFactorSetupDialog(self, usuario)
                 if dlg_setup.exec() != QDialog.Accepted:
                     QMessageBox.warning(self, "Acceso cancelado", "No se completó la configuración del token.")
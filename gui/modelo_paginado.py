@@ -0,0 +1,211 @@
+"""
+gui/modelo_paginado.py
+
+Modelo de tabla (QAbstractTableModel) respaldado por consultas SQL paginadas.
+
+En lugar de cargar todos los registros y crear un QTableWidgetItem por celda,
+el modelo trae páginas de TAMANIO_PAGINA filas a medida que el usuario hace
+scroll (canFetchMore / fetchMore). Cada página es una consulta que selecciona
+sólo las columnas necesarias y guarda las filas como tuplas planas.
+
+El filtro y el orden se resuelven en SQL: cambiar cualquiera de los dos
+descarta las filas cargadas y vuelve a pedir la primera página.
+
+Las páginas se consultan en segundo plano (utils.carga_async): la sentencia
+se arma en el hilo de la GUI y sólo la ejecución corre en el pool. Una
+recarga cancela la página que estuviera en vuelo.
+
+Las subclases definen:
+  - COLUMNAS:            encabezados de la tabla
+  - _consulta(texto):    select() de columnas con el filtro aplicado
+  - _orden(col, orden):  lista de expresiones ORDER BY (o None si no ordena)
+  - _celda(fila, col):   texto a mostrar
+  - _fondo(fila, col):   color de fondo opcional
+
+Lo que tipea el usuario va a los LIKE escapado con
+services.busquedas.escapar_like(): un "%" o un "_" se buscan como texto,
+no como comodines.
+"""
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QRectF, Signal
+from PySide6.QtGui import QColor, QPainter
+from PySide6.QtWidgets import QStyle, QStyledItemDelegate
+
+from utils.carga_async import CargadorDatos, consultar_filas
+from utils.estilos import PALETA
+
+
+class ModeloPaginadoSQL(QAbstractTableModel):
+    TAMANIO_PAGINA = 200
+    COLUMNAS: list = []
+    # Columna por la que se ordena al abrir (None: el orden de _consulta)
+    COLUMNA_ORDEN = None
+
+    # Emitida cuando llega la primera página de cada recarga (filtro / orden / refresco)
+    recargado = Signal()
+    # Emitida si falla la consulta de una página (mensaje de error)
+    fallo = Signal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._filas: list = []
+        self._hay_mas = False
+        self._texto = ""
+        self._orden_col = self.COLUMNA_ORDEN
+        self._orden_dir = Qt.AscendingOrder
+        self._iniciado = False   # hasta la primera recarga no se consulta la base
+        self._cargando = False
+        self._cargador = CargadorDatos(self)
+
+    # ---------- API para los formularios ----------
+    def set_filtro(self, texto: str):
+        texto = (texto or "").strip()
+        if texto == self._texto:
+            return
+        self._texto = texto
+        if self._iniciado:
+            self.recargar()
+
+    def recargar(self, texto: str | None = None):
+        """
+        Descarta lo cargado y trae la primera página con el orden actual y el
+        filtro actual (o 'texto', si se indica).
+        """
+        if texto is not None:
+            self._texto = texto.strip()
+        self._iniciado = True
+        self.beginResetModel()
+        self._filas = []
+        self._hay_mas = True
+        self.endResetModel()
+        self._pedir_pagina()
+
+    def fila(self, row: int) -> tuple:
+        """Tupla cruda de la fila (tal cual la devolvió la consulta)."""
+        return self._filas[row]
+
+    # ---------- Hooks de subclases ----------
+    def _consulta(self, texto: str):
+        raise NotImplementedError
+
+    def _orden(self, columna: int, orden) -> list | None:
+        return None
+
+    def _celda(self, fila: tuple, columna: int) -> str:
+        return "" if fila[columna] is None else str(fila[columna])
+
+    def _fondo(self, fila: tuple, columna: int):
+        return None
+
+    # ---------- Paginación ----------
+    def _sentencia_pagina(self, desde: int):
+        stmt = self._consulta(self._texto)
+        orden = None
+        if self._orden_col is not None:
+            orden = self._orden(self._orden_col, self._orden_dir)
+        if orden:
+            stmt = stmt.order_by(None).order_by(*orden)
+        return stmt.offset(desde).limit(self.TAMANIO_PAGINA)
+
+    def _pedir_pagina(self):
+        desde = len(self._filas)
+        self._cargando = True
+        self._cargador.ejecutar(
+            consultar_filas, self._sentencia_pagina(desde),
+            al_terminar=lambda filas: self._pagina_recibida(desde, filas),
+            al_fallar=self._pagina_fallida,
+        )
+
+    def _pagina_recibida(self, desde: int, filas: list):
+        self._cargando = False
+        self._agregar_pagina(filas)
+        if desde == 0:
+            self.recargado.emit()
+
+    def _pagina_fallida(self, error):
+        self._cargando = False
+        self._hay_mas = False
+        self.fallo.emit(str(error))
+
+    def _agregar_pagina(self, filas: list):
+        self._hay_mas = len(filas) >= self.TAMANIO_PAGINA
+        if not filas:
+            return
+        inicio = len(self._filas)
+        self.beginInsertRows(QModelIndex(), inicio, inicio + len(filas) - 1)
+        self._filas.extend(filas)
+        self.endInsertRows()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._hay_mas and not self._cargando
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self._pedir_pagina()
+
+    # ---------- QAbstractTableModel ----------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._filas)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNAS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNAS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        fila = self._filas[index.row()]
+        if role == Qt.DisplayRole:
+            return self._celda(fila, index.column())
+        if role == Qt.BackgroundRole:
+            color = self._fondo(fila, index.column())
+            return QColor(color) if color is not None else None
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if self._orden(column, order) is None:
+            return  # columna no ordenable: se mantiene el orden actual
+        self._orden_col, self._orden_dir = column, order
+        if self._iniciado:
+            self.recargar()
+
+
+class DelegadoBoton(QStyledItemDelegate):
+    """
+    Dibuja el texto de la celda como un botón con los colores del tema y
+    emite 'clicked(fila)' al hacer click. Las celdas vacías no se dibujan
+    (por ejemplo, una acción sin permiso).
+
+    Reemplaza los setCellWidget(QPushButton) por fila: no crea widgets.
+    """
+    clicked = Signal(int)
+
+    def paint(self, painter, option, index):
+        texto = index.data(Qt.DisplayRole)
+        if not texto:
+            super().paint(painter, option, index)
+            return
+        i = PALETA["identidad"]
+        rect = QRectF(option.rect).adjusted(4, 3, -4, -3)
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        hover = bool(option.state & QStyle.State_MouseOver)
+        painter.setBrush(QColor(i["primario_hover"] if hover else i["primario"]))
+        painter.setPen(Qt.NoPen)
+        painter.drawRoundedRect(rect, 4, 4)
+        painter.setPen(QColor(PALETA["neutros"]["texto_blanco"]))
+        painter.drawText(rect, Qt.AlignCenter, texto)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == event.Type.MouseButtonRelease
+                and event.button() == Qt.LeftButton
+                and index.data(Qt.DisplayRole)):
+            self.clicked.emit(index.row())
+            return True
+        return super().editorEvent(event, model, option, index)
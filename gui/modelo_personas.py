@@ -0,0 +1,59 @@
+"""
+gui/modelo_personas.py
+
+Modelo paginado para los listados de clientes y garantes (mismas columnas).
+
+La consulta de cada página es services.busquedas.sentencia_personas();
+migrate_indices la usa para verificar con EXPLAIN que la búsqueda va por
+los índices de apellidos y documento.
+"""
+
+from PySide6.QtCore import Qt
+from gui.modelo_paginado import ModeloPaginadoSQL
+from services.busquedas import sentencia_personas
+
+
+class ModeloPersonas(ModeloPaginadoSQL):
+    """Listado paginado de Cliente o Garante, con búsqueda en SQL."""
+
+    COLUMNAS = ["ID", "Apellidos", "Nombres", "Documento", "Calificación", "Acciones"]
+    # Columnas de la consulta (índices dentro de cada tupla)
+    ID, APELLIDOS, NOMBRES, TIPO_DOC, NRO_DOC, CALIFICACION = range(6)
+    COL_ACCIONES = 5
+    # Por apellido y nombre: el orden de sentencia_personas
+    COLUMNA_ORDEN = 1
+
+    def __init__(self, entidad, texto_accion: str = "Editar", parent=None):
+        """entidad: la clase mapeada (Cliente o Garante)."""
+        super().__init__(parent)
+        self._entidad = entidad
+        self._texto_accion = texto_accion
+
+    def _consulta(self, texto):
+        return sentencia_personas(self._entidad, texto)
+
+    def _orden(self, columna, orden):
+        e = self._entidad
+        cols = {
+            0: [e.id],
+            1: [e.apellidos, e.nombres],
+            2: [e.nombres, e.apellidos],
+            3: [e.nro_documento],
+            4: [e.calificacion],
+        }.get(columna)
+        if cols is None:
+            return None
+        asc = orden == Qt.AscendingOrder
+        return [c.asc() if asc else c.desc() for c in cols] + ([] if columna == 0 else [e.id])
+
+    def _celda(self, f, col):
+        if col == self.ID:
+            return str(f[self.ID])
+        if col == 3:
+            nro = f[self.NRO_DOC] or ""
+            return f"{f[self.TIPO_DOC] or ''} {nro}".strip() if nro else ""
+        if col == 4:
+            return f[self.CALIFICACION] or ""
+        if col == self.COL_ACCIONES:
+            return self._texto_accion
+        return f[col] or ""
@@ -8,27 +8,9 @@ from PySide6.QtCore import Qt, QSize
 from PySide6.QtCore import QTimer, QEvent
 from PySide6.QtWidgets import QApplication
 
-from gui.form_cliente import FormCliente
-from gui.form_venta import FormVenta
-from gui.form_categoria import FormCategoria
-from gui.form_producto import FormProducto
-from gui.form_personal import FormPersonal
-from gui.form_garante import FormGarante
-from gui.form_usuario import FormUsuario
-from gui.form_permisos import FormPermisos
+# Los formularios se importan dentro de cada abrir_*(): la ventana principal
+# abre sin cargar openpyxl, reportlab, numpy, docx, etc. hasta que hacen falta.
 from utils.permisos import tiene_permiso, tiene_permiso_match
-from gui.form_consultas import FormConsultas
-from gui.form_gestion_clientes import FormGestionClientes
-from gui.form_gestion_garantes import FormGestionGarantes
-from gui.form_listado_ventas import FormVentas
-from gui.form_cobro import FormCobro
-from gui.form_listado_productos import FormListadoProductos
-from gui.form_listado_personal import FormListadoPersonal
-from gui.form_listado_usuarios import FormListadoUsuarios
-from gui.form_mi_perfil import FormMiPerfil
-from gui.change_password_dialog import ChangePasswordDialog
-from gui.form_recuperar_acceso import FormRecuperarAcceso
-from gui.lock_screen import LockScreenDialog
 from models import Personal
 from zoneinfo import ZoneInfo
 from utils.dialogos import confirmar
@@ -755,23 +737,28 @@ class VentanaPrincipal(QMainWindow):
 
     # ---------- Abrir formularios ----------
     def abrir_form_cliente(self):
+        from gui.form_cliente import FormCliente
         formulario = FormCliente(usuario=self.usuario)
         formulario.cliente_guardado.connect(self.abrir_gestion_clientes)
         formulario.cliente_cancelado.connect(self.abrir_gestion_clientes)
         self.mostrar_formulario(formulario, "Gestión de Clientes")
 
     def abrir_form_garante(self):
+        from gui.form_garante import FormGarante
         formulario = FormGarante(usuario=self.usuario)
         formulario.garante_guardado.connect(self.abrir_gestion_garantes)
         formulario.garante_cancelado.connect(self.abrir_gestion_garantes)
         self.mostrar_formulario(formulario, "Gestión de Garantes")
 
     def abrir_form_venta(self):
+        from gui.form_venta import FormVenta
         formulario = FormVenta(usuario_actual=self.usuario)
         formulario.sale_saved.connect(self.abrir_listado_ventas)
         self.mostrar_formulario(formulario, "Gestión de Ventas")
 
     def abrir_form_categoria(self):
+        from gui.form_categoria import FormCategoria
+        from gui.form_producto import FormProducto
         # pasar explicitamente el usuario actual al diálogo para que la guard funcione
         dlg = FormCategoria(parent=self, usuario=self.usuario)
         print("DEBUG: Abriendo FormCategoria (menú Productos > Categorías)")
@@ -796,6 +783,7 @@ class VentanaPrincipal(QMainWindow):
         self.abrir_listado_productos()
 
     def abrir_form_producto(self):
+        from gui.form_producto import FormProducto
         # También como QDialog modal para ser consistente
         print("DEBUG: Abriendo FormProducto (menú Productos > Productos)")
         dlg = FormProducto(parent=self, usuario=self.usuario)
@@ -804,25 +792,30 @@ class VentanaPrincipal(QMainWindow):
         self.abrir_listado_productos()
 
     def abrir_form_personal(self):
+        from gui.form_personal import FormPersonal
         formulario = FormPersonal(usuario=self.usuario)
         formulario.personal_guardado.connect(self.abrir_gestion_personal)
         formulario.personal_cancelado.connect(self.abrir_gestion_personal)
         self.mostrar_formulario(formulario, "Gestión de Personal")
 
     def abrir_form_usuario(self):
+        from gui.form_usuario import FormUsuario
         formulario = FormUsuario(usuario=self.usuario)
         formulario.usuario_guardado.connect(self.abrir_listado_usuarios)
         self.mostrar_formulario(formulario, "Gestión de Usuarios")
 
     def abrir_form_permisos(self):
+        from gui.form_permisos import FormPermisos
         formulario = FormPermisos(usuario=self.usuario)
         formulario.permisos_guardados.connect(self.abrir_gestion_personal)
         self.mostrar_formulario(formulario, "Gestión de Permisos")
 
     def abrir_form_consultas(self):
+        from gui.form_consultas import FormConsultas
         self.mostrar_formulario(FormConsultas(usuario_actual=self.usuario), "Consultas Generales")
 
     def abrir_gestion_clientes(self):
+        from gui.form_gestion_clientes import FormGestionClientes
         from PySide6.QtWidgets import QApplication
         QApplication.setOverrideCursor(Qt.WaitCursor)
         try:
@@ -831,9 +824,11 @@ class VentanaPrincipal(QMainWindow):
             QApplication.restoreOverrideCursor()
 
     def abrir_gestion_garantes(self):
+        from gui.form_gestion_garantes import FormGestionGarantes
         self.mostrar_formulario(FormGestionGarantes(usuario=self.usuario), "Gestión de Garantes")
 
     def abrir_listado_ventas(self):
+        from gui.form_listado_ventas import FormVentas
         from PySide6.QtWidgets import QApplication
         QApplication.setOverrideCursor(Qt.WaitCursor)
         try:
@@ -842,12 +837,14 @@ class VentanaPrincipal(QMainWindow):
             QApplication.restoreOverrideCursor()
 
     def abrir_form_cobros(self):
+        from gui.form_cobro import FormCobro
         self.form_cobros = FormCobro(usuario_actual=self.usuario) 
         self.form_cobros.setWindowModality(Qt.ApplicationModal)
         self.form_cobros.setAttribute(Qt.WA_DeleteOnClose)
         self.form_cobros.showMaximized()
 
     def abrir_mi_perfil(self):
+        from gui.form_mi_perfil import FormMiPerfil
         self.mostrar_formulario(FormMiPerfil(self.usuario), "Mi perfil")
 
 
@@ -873,11 +870,13 @@ class VentanaPrincipal(QMainWindow):
             QMessageBox.warning(self, "Archivo no encontrado", f"No se encontro la guia en:\n{ruta}")
 
     def abrir_cambiar_contrasena(self):
+        from gui.change_password_dialog import ChangePasswordDialog
         dlg = ChangePasswordDialog(self, self.usuario)
         dlg.exec()
 
     # ---------- Listados y otros ----------
     def abrir_listado_productos(self):
+        from gui.form_listado_productos import FormListadoProductos
         from PySide6.QtWidgets import QApplication  
         QApplication.setOverrideCursor(Qt.WaitCursor)
         try:
@@ -886,13 +885,16 @@ class VentanaPrincipal(QMainWindow):
             QApplication.restoreOverrideCursor()
 
     def abrir_gestion_personal(self):
+        from gui.form_listado_personal import FormListadoPersonal
         self.mostrar_formulario(FormListadoPersonal(usuario=self.usuario), "Listado de Personal")
 
     def abrir_listado_usuarios(self):
+        from gui.form_listado_usuarios import FormListadoUsuarios
         formulario = FormListadoUsuarios(usuario=self.usuario)
         self.mostrar_formulario(formulario, "Listado de Usuarios")
 
     def abrir_recuperar_acceso(self):
+        from gui.form_recuperar_acceso import FormRecuperarAcceso
         self.mostrar_formulario(FormRecuperarAcceso(usuario=self.usuario), "Recuperar Acceso")
 
     # ---------- Inicio ----------
@@ -940,6 +942,7 @@ class VentanaPrincipal(QMainWindow):
             self._idle_prompt_open = False
 
     def bloquear_pantalla(self):
+        from gui.lock_screen import LockScreenDialog
         # Pausar temporizador de inactividad mientras está bloqueado
         try:
             if hasattr(self, "_idle_timer"):
@@ -13,8 +13,9 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-from database import engine, get_session
-from models import Base, Permiso, Rol, Usuario
+from database import get_session
+from migraciones import asegurar_esquema
+from models import Permiso, Rol, Usuario
 from utils.security import hash_password
 
 # ── Datos canónicos ────────────────────────────────────────────────────────────
@@ -71,8 +72,10 @@ PERMISOS = [
 
 def paso_crear_tablas() -> None:
     print("── [1/5] Creando tablas...")
-    Base.metadata.create_all(engine)
+    aplicadas = asegurar_esquema()
     print("   ✓ Tablas verificadas/creadas.")
+    if aplicadas:
+        print(f"   ✓ Migraciones aplicadas: {', '.join(map(str, aplicadas))}")
 
 
 def paso_seed_roles(session) -> None:
@@ -1,13 +1,15 @@
 # main.py
+from utils import arranque  # primero: desde acá se mide el arranque
 from PySide6.QtWidgets import QApplication, QMessageBox
-from sqlalchemy.exc import OperationalError
-from gui.dialog_crear_admin import DialogCrearAdmin
+from PySide6.QtCore import QTimer
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
 from gui.login_form import LoginForm
-from gui.ventana_principal import VentanaPrincipal
 from database import get_session
-from models import Usuario, Base, engine, get_setting
+from models import Usuario, get_setting
+from migraciones import asegurar_esquema, ErrorMigracion
 from utils.estilos import PALETA, generar_qss, aplicar_tema
 import sys
+import time
 
 app = QApplication(sys.argv)
 
@@ -26,16 +28,22 @@ def lanzar_ventana_principal(usuario):
         except Exception:
             pass
 
+    # La ventana principal (y sus formularios) se importa recién después del login
+    t = time.perf_counter()
+    from gui.ventana_principal import VentanaPrincipal
     ventana_principal = VentanaPrincipal(usuario)
     ventana_principal.show()
+    QTimer.singleShot(0, lambda: (arranque.marcar("ventana principal visible", desde=t), arranque.guardar()))
 
 
 if __name__ == "__main__":
-    # ❶ Crear todas las tablas si no existen aún
+    arranque.marcar("imports")
+
+    # ❶ Esquema al día: una consulta a schema_version; migra sólo si hay pendientes
     try:
-        Base.metadata.create_all(engine)
-    except OperationalError as e:
-        QMessageBox.critical(None, "Error de Base de Datos", f"No se pudieron crear las tablas:\n{e}")
+        asegurar_esquema()
+    except (SQLAlchemyError, ErrorMigracion) as e:
+        QMessageBox.critical(None, "Error de Base de Datos", f"No se pudo preparar la base de datos:\n{e}")
         sys.exit(1)
 
     # ❶.5 Aplicar el tema de color guardado (por defecto: violeta)
@@ -56,11 +64,14 @@ if __name__ == "__main__":
         sys.exit(1)
 
     if not existe:
+        from gui.dialog_crear_admin import DialogCrearAdmin
         dialog = DialogCrearAdmin()
         if dialog.exec() != DialogCrearAdmin.Accepted:
             QMessageBox.information(None, "Atención", "No se creó el super-usuario. Saliendo.")
             sys.exit(0)
 
+    arranque.marcar("base de datos")
+
     # ❸ Abrir el formulario de login
     login_window = LoginForm(on_login_success=lanzar_ventana_principal)
 
@@ -68,6 +79,8 @@ if __name__ == "__main__":
     login_window.destroyed.connect(lambda: app.quit() if ventana_principal is None else None)
 
     login_window.show()
+    # Se ejecuta cuando el event loop ya pintó el login
+    QTimer.singleShot(0, lambda: (arranque.marcar("login visible"), arranque.guardar()))
 
 
     # ❹ Iniciar el loop de la aplicación
@@ -0,0 +1,295 @@
+"""
+migraciones.py — Versión del esquema y migraciones pendientes al arrancar.
+
+La tabla schema_version guarda en una sola fila el número de la última
+migración aplicada. Al arrancar, main.py llama a asegurar_esquema(), que:
+
+  - Lee esa fila (una consulta). Si la versión es la última, no hace nada
+    más: no hay create_all ni consultas de metadatos por tabla.
+  - Si la base está vacía, crea las tablas con create_all (ya con columnas
+    e índices al día) y la marca con la última versión, sin migrar.
+  - Si la base existe pero es anterior a schema_version, deduce de las
+    columnas hasta dónde llegó: sin columna dni en clientes, garantes y
+    personal ya pasó las migraciones 1 y 2 (VERSION_SIN_DNI) y se marca
+    así; con dni, está en la 0. Crea las tablas que falten y sigue desde ahí.
+  - Aplica sólo las migraciones con número mayor al guardado, en orden, y
+    actualiza la fila después de cada una.
+
+Las migraciones destructivas (destructiva=True, p. ej. DROP COLUMN dni)
+no corren al abrir el sistema: si alguna está pendiente, asegurar_esquema
+sin 'confirmar' falla con ErrorMigracion antes de tocar la base. Se
+aplican a mano con `python migraciones.py`, que pide un backup y escribir
+CONFIRMAR.
+
+Las migraciones reutilizan los pasos de migrate_documento.py,
+migrate_drop_dni.py, migrate_totp_set_by_admin.py y migrate_indices.py
+(consultan information_schema: son para MySQL). Con varias PCs de caja
+arrancando a la vez, un GET_LOCK de MySQL hace que migre una sola; si no
+se obtiene en ESPERA_LOCK_S segundos, se aborta con ErrorMigracion.
+
+Una base que no es MySQL sólo se prepara si está vacía (create_all). Si
+tiene tablas sin versionar o migraciones pendientes, asegurar_esquema
+falla con ErrorMigracion antes de tocarla, en lugar de romper a mitad de
+una migración.
+
+Para agregar una migración: escribir una función f(conn) idempotente y
+sumarla al final de MIGRACIONES con el número siguiente (destructiva=True
+si borra datos).
+
+Uso:
+    python migraciones.py             # aplica las pendientes (pide CONFIRMAR si borran datos)
+    python migraciones.py --estado    # sólo muestra la versión actual
+"""
+
+import sys
+from datetime import datetime
+from typing import Callable, NamedTuple
+
+import sqlalchemy as sa
+from sqlalchemy.exc import DBAPIError
+
+from database import engine
+from models import Base, SchemaVersion
+
+NOMBRE_LOCK = "credanza_schema_version"
+ESPERA_LOCK_S = 120
+
+# Motores en los que corren las migraciones de MIGRACIONES
+DIALECTOS_MIGRACIONES = ("mysql",)
+
+
+class ErrorMigracion(RuntimeError):
+    """No se puede dejar el esquema al día (lock, motor no soportado o migración destructiva)."""
+
+
+class Migracion(NamedTuple):
+    numero: int
+    descripcion: str
+    migrar: Callable
+    # Borra datos: no corre al arrancar, sólo a mano con confirmación
+    destructiva: bool = False
+
+
+# ── Migraciones ───────────────────────────────────────────────────────────────
+
+def _documento(conn):
+    import migrate_documento as m
+    for tabla, nombre_uq in m.TABLAS:
+        # Si 'dni' ya no existe, la tabla se migró (y se limpió) antes de versionar
+        if m.columna_existe(conn, tabla, "dni"):
+            m.migrar_tabla(conn, tabla, nombre_uq)
+
+
+def _drop_dni(conn):
+    import migrate_drop_dni as m
+    for tabla in m.TABLAS:
+        m.drop_dni_si_existe(conn, tabla)
+
+
+def _totp_set_by_admin(conn):
+    import migrate_totp_set_by_admin as m
+    m.migrar_usuarios(conn)
+
+
+def _indices(conn):
+    import migrate_indices as m
+    m.crear_indices(conn)
+
+
+def _indices_nombres(conn):
+    import migrate_indices as m
+    m.crear_indices(conn, [i for i in m.INDICES if i[1] in ("ix_clientes_nombres", "ix_garantes_nombres")])
+
+
+# Las versiones son consecutivas desde 1
+MIGRACIONES = [
+    Migracion(1, "tipo/nro de documento en clientes, garantes y personal", _documento),
+    Migracion(2, "eliminar columna dni", _drop_dni, destructiva=True),
+    Migracion(3, "usuarios.totp_set_by_admin", _totp_set_by_admin),
+    Migracion(4, "índices compuestos de consultas frecuentes", _indices),
+    Migracion(5, "índices por nombre de clientes y garantes", _indices_nombres),
+]
+
+# Una base sin versionar que ya no tiene la columna dni pasó la 1 y la 2
+VERSION_SIN_DNI = 2
+
+
+# ── Versión ───────────────────────────────────────────────────────────────────
+
+def version_actual(conn) -> int | None:
+    """Versión guardada; 0 si la tabla está vacía, None si todavía no existe."""
+    try:
+        return conn.execute(sa.select(SchemaVersion.version).where(SchemaVersion.id == 1)).scalar() or 0
+    except DBAPIError:
+        conn.rollback()
+        if sa.inspect(conn).has_table(SchemaVersion.__tablename__):
+            raise
+        return None
+
+
+def _guardar_version(conn, version: int):
+    ahora = datetime.utcnow()
+    r = conn.execute(sa.update(SchemaVersion).where(SchemaVersion.id == 1)
+                     .values(version=version, actualizada_en=ahora))
+    if r.rowcount == 0:
+        conn.execute(sa.insert(SchemaVersion).values(id=1, version=version, actualizada_en=ahora))
+    conn.commit()
+
+
+def _bloquear(conn):
+    """GET_LOCK devuelve 1 si obtuvo el lock, 0 si se agotó la espera y NULL si falló."""
+    if conn.dialect.name != "mysql":
+        return
+    obtenido = conn.execute(sa.text("SELECT GET_LOCK(:n, :t)"),
+                            {"n": NOMBRE_LOCK, "t": ESPERA_LOCK_S}).scalar()
+    if obtenido == 1:
+        return
+    if obtenido == 0:
+        raise ErrorMigracion(
+            f"Otra PC sigue actualizando la base de datos (más de {ESPERA_LOCK_S} s). "
+            "Esperá a que termine y volvé a abrir el sistema."
+        )
+    raise ErrorMigracion(f"MySQL no pudo tomar el lock '{NOMBRE_LOCK}' para actualizar la base de datos.")
+
+
+def _verificar_dialecto(conn, dialectos, version, ultima):
+    if conn.dialect.name in dialectos:
+        return
+    estado = "sin versionar" if version is None else f"en la versión {version}"
+    raise ErrorMigracion(
+        f"La base de datos está {estado} y las migraciones hasta la {ultima} sólo corren en "
+        f"{', '.join(dialectos)} (la base es {conn.dialect.name}). Migrala desde MySQL "
+        "o partí de una base vacía."
+    )
+
+
+def _version_sin_registro(conn) -> int:
+    """Versión de una base anterior a schema_version, según sus columnas."""
+    import migrate_drop_dni as m
+    inspector = sa.inspect(conn)
+    tablas = set(inspector.get_table_names())
+    for tabla in m.TABLAS:
+        if tabla in tablas and any(c["name"] == "dni" for c in inspector.get_columns(tabla)):
+            return 0
+    return VERSION_SIN_DNI
+
+
+def _verificar_destructivas(pendientes, confirmar):
+    destructivas = [m for m in pendientes if m.destructiva]
+    if not destructivas:
+        return
+    detalle = ", ".join(f"{m.numero} ({m.descripcion})" for m in destructivas)
+    if confirmar is None:
+        raise ErrorMigracion(
+            f"La base de datos necesita migraciones que borran datos: {detalle}. "
+            "No se aplican al abrir el sistema: hacé un backup y ejecutá "
+            "`python migraciones.py` a mano."
+        )
+    if not confirmar(destructivas):
+        raise ErrorMigracion("Operación cancelada. No se aplicó ningún cambio.")
+
+
+def _liberar(conn):
+    if conn.dialect.name == "mysql":
+        conn.execute(sa.text("SELECT RELEASE_LOCK(:n)"), {"n": NOMBRE_LOCK})
+
+
+# ── Runner ────────────────────────────────────────────────────────────────────
+
+def asegurar_esquema(motor=engine, migraciones=MIGRACIONES, dialectos=DIALECTOS_MIGRACIONES,
+                     confirmar=None) -> list:
+    """
+    Deja la base en la última versión. Devuelve los números de las
+    migraciones aplicadas (lista vacía si ya estaba al día). Lanza
+    ErrorMigracion si no obtiene el lock, si hay que migrar una base
+    cuyo motor no está en 'dialectos' o si hay una migración destructiva
+    pendiente y confirmar(destructivas) no la autoriza (sin confirmar,
+    como al arrancar main.py, nunca la autoriza).
+    """
+    migraciones = [Migracion(*m) for m in migraciones]
+    ultima = migraciones[-1].numero if migraciones else 0
+    with motor.connect() as conn:
+        version = version_actual(conn)
+        if version is not None and version >= ultima:
+            return []
+
+        _bloquear(conn)
+        try:
+            # Otra PC pudo haber migrado mientras esperábamos el lock
+            version = version_actual(conn)
+            if version is not None and version >= ultima:
+                return []
+            if version is None and not sa.inspect(conn).get_table_names():
+                # Base vacía: create_all ya la deja en la última versión
+                Base.metadata.create_all(conn)
+                conn.commit()
+                _guardar_version(conn, ultima)
+                return []
+
+            _verificar_dialecto(conn, dialectos, version, ultima)
+            sin_registro = version is None
+            if sin_registro:
+                version = _version_sin_registro(conn)
+            # Antes de create_all: si se rechaza, la base queda como estaba
+            _verificar_destructivas([m for m in migraciones if m.numero > version], confirmar)
+            if sin_registro:
+                Base.metadata.create_all(conn)
+                conn.commit()
+                if version:
+                    _guardar_version(conn, version)
+
+            aplicadas = []
+            for m in migraciones:
+                if m.numero <= version:
+                    continue
+                print(f"── Migración {m.numero}: {m.descripcion}")
+                m.migrar(conn)
+                conn.commit()
+                _guardar_version(conn, m.numero)
+                aplicadas.append(m.numero)
+            return aplicadas
+        finally:
+            _liberar(conn)
+
+
+def confirmar_destructivas(destructivas) -> bool:
+    """Pide un backup y CONFIRMAR antes de migraciones que borran datos."""
+    print()
+    print("=" * 60)
+    print("  ⚠️  ATENCIÓN: MIGRACIONES QUE BORRAN DATOS")
+    print("=" * 60)
+    print(f"  Base apuntada: {engine.url.database}")
+    print()
+    print("  Se van a aplicar:")
+    for m in destructivas:
+        print(f"    • {m.numero}: {m.descripcion}")
+    print()
+    print("  Es IRREVERSIBLE. Asegurate de tener un backup completo.")
+    print("  Ejemplo:  mysqldump -u root -p credanzadb > backup_pre_migraciones.sql")
+    print()
+    respuesta = input("  Para confirmar, escribí exactamente CONFIRMAR: ").strip()
+    print()
+    return respuesta == "CONFIRMAR"
+
+
+def main():
+    if "--estado" in sys.argv[1:]:
+        with engine.connect() as conn:
+            version = version_actual(conn)
+        ultima = MIGRACIONES[-1].numero
+        print(f"Versión del esquema: {'sin versionar' if version is None else version} (última: {ultima})")
+        return
+
+    try:
+        aplicadas = asegurar_esquema(confirmar=confirmar_destructivas)
+    except ErrorMigracion as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+    if aplicadas:
+        print(f"✅ Migraciones aplicadas: {', '.join(map(str, aplicadas))}")
+    else:
+        print("· El esquema ya estaba al día.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+migrate_indices.py — Crea los índices compuestos de las consultas más frecuentes.
+
+Índices:
+  cuotas  (venta_id, numero)          → cuotas de una venta en orden (FormCobro, API)
+  cobros  (venta_id, cuota_id, id)    → último cobro por cuota (FormCobro)
+  cobros  (fecha)                     → Cobros por fecha (FormConsultas)
+  ventas  (fecha)                     → Ventas por fecha (FormConsultas)
+  ventas  (coordinador_id, fecha)     → Ventas por personal (FormConsultas)
+  ventas  (vendedor_id, fecha)
+  ventas  (cobrador_id, fecha)
+  clientes (apellidos)                → autocompletar de ventas por apellido (FormCobro)
+  clientes (nro_documento)            → autocompletar de ventas por documento (FormCobro;
+                                        el número de venta va por la PK, en otra rama)
+                                        (ambos sirven también al listado de clientes
+                                        y al autocompletar de cliente de FormVenta)
+  clientes (nombres)                  → listado de clientes y autocompletar de
+                                        FormVenta: la primera palabra va al apellido
+                                        o al nombre (index_merge de los dos índices)
+  garantes (apellidos)                → búsqueda del listado de garantes (la primera
+  garantes (nombres)                    palabra va al apellido o al nombre, o al
+  garantes (nro_documento)              documento) y autocompletar de cliente/garante
+                                        (FormVenta)
+
+Los mismos índices están declarados en models.py, así que una base creada
+desde cero con create_all ya los tiene.
+
+Idempotente: cada índice se busca en information_schema antes de crearlo.
+Se crean en línea (ALGORITHM=INPLACE, LOCK=NONE): no bloquean la operación.
+
+Al terminar corre EXPLAIN sobre las consultas reales (las sentencias que
+arma la app: FormCobro, FormConsultas, FormVenta, los listados de clientes
+y garantes y el servicio de cobros de la API, compiladas con sus valores)
+y muestra qué índice eligió MySQL para cada una.
+
+Uso:
+    python migrate_indices.py                  # crea índices + verificación
+    python migrate_indices.py --verificar      # sólo la verificación EXPLAIN
+"""
+
+import os
+import sys
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import sqlalchemy as sa
+from database import engine
+
+DB_NAME = os.getenv("DB_NAME", "")
+DB_TEST = "credanzadb_test"
+# Filas por página de los listados de clientes y garantes
+# (ModeloPaginadoSQL.TAMANIO_PAGINA; no se importa para no cargar Qt)
+TAMANIO_PAGINA_LISTADO = 200
+
+INDICES = [
+    ("cuotas", "ix_cuotas_venta_numero",      ("venta_id", "numero")),
+    ("cobros", "ix_cobros_venta_cuota_id",    ("venta_id", "cuota_id", "id")),
+    ("cobros", "ix_cobros_fecha",             ("fecha",)),
+    ("ventas", "ix_ventas_fecha",             ("fecha",)),
+    ("ventas", "ix_ventas_coordinador_fecha", ("coordinador_id", "fecha")),
+    ("ventas", "ix_ventas_vendedor_fecha",    ("vendedor_id", "fecha")),
+    ("ventas", "ix_ventas_cobrador_fecha",    ("cobrador_id", "fecha")),
+    ("clientes", "ix_clientes_apellidos",     ("apellidos",)),
+    ("clientes", "ix_clientes_nro_documento", ("nro_documento",)),
+    ("clientes", "ix_clientes_nombres",       ("nombres",)),
+    ("garantes", "ix_garantes_apellidos",     ("apellidos",)),
+    ("garantes", "ix_garantes_nombres",       ("nombres",)),
+    ("garantes", "ix_garantes_nro_documento", ("nro_documento",)),
+]
+
+def consultas() -> list:
+    """
+    (descripción, tabla, índice esperado, sentencia) de las consultas reales:
+    las mismas funciones que arman la sentencia en la app. Si una consulta
+    cambia, el EXPLAIN cambia con ella. Las sentencias viven en services/
+    (sin Qt): verificar no carga la GUI. Los imports son locales para no
+    cargar nada al migrar desde migraciones.py.
+    """
+    from datetime import date
+
+    from models import Cliente, Garante
+    from services.busquedas import sentencia_busqueda_ventas, sentencia_buscar_personas, sentencia_personas
+    from services.cobros import sentencia_cuotas, sentencia_ultimos_cobros, sentencia_cuotas_abiertas
+    from utils.reportes_consultas import CriterioConsulta, TIPO_COBROS, sentencia
+
+    def pagina_personas(entidad, texto):
+        return sentencia_personas(entidad, texto).limit(TAMANIO_PAGINA_LISTADO)
+
+    def consulta(tipo, **filtros):
+        return sentencia(CriterioConsulta(tipo=tipo, inicio=date(2025, 1, 1), fin=date(2025, 1, 31), **filtros))
+
+    lista = [
+        ("FormCobro.cargar_cuotas: cuotas de la venta",
+         "cuotas", "ix_cuotas_venta_numero", sentencia_cuotas(1)),
+        ("FormCobro.cargar_cuotas: último cobro por cuota",
+         "cobros", "ix_cobros_venta_cuota_id", sentencia_ultimos_cobros(1)),
+        ("registrar_cobro (FormCobro y POST /ventas/{id}/cobros): cuotas abiertas",
+         "cuotas", "ix_cuotas_venta_numero", sentencia_cuotas_abiertas(1)),
+        ("FormConsultas.ejecutar_consulta: Cobros por fecha",
+         "cobros", "ix_cobros_fecha", consulta(TIPO_COBROS)),
+        ("FormConsultas.ejecutar_consulta: Ventas por fecha",
+         "ventas", "ix_ventas_fecha", consulta("Ventas por fecha")),
+    ]
+    for rol, indice in (("Coordinador", "ix_ventas_coordinador_fecha"),
+                        ("Vendedor", "ix_ventas_vendedor_fecha"),
+                        ("Cobrador", "ix_ventas_cobrador_fecha")):
+        lista.append((f"FormConsultas.ejecutar_consulta: Ventas por personal ({rol.lower()})",
+                      "ventas", indice, consulta("Ventas por personal", rol=rol, personal_id=1)))
+    lista += [
+        ("FormCobro.buscar_ventas: por apellido",
+         "clientes", "ix_clientes_apellidos", sentencia_busqueda_ventas("Pér", 20)),
+        ("FormCobro.buscar_ventas: número → venta",
+         "ventas", "PRIMARY", sentencia_busqueda_ventas("3012", 20)),
+        ("FormCobro.buscar_ventas: número → documento del cliente",
+         "clientes", "ix_clientes_nro_documento", sentencia_busqueda_ventas("3012", 20)),
+    ]
+    for entidad, tabla in ((Cliente, "clientes"), (Garante, "garantes")):
+        listado = f"FormGestion{entidad.__name__}s"
+        lista += [
+            (f"{listado}: búsqueda por apellido y nombre",
+             tabla, f"ix_{tabla}_apellidos", pagina_personas(entidad, "Pér Ju")),
+            (f"{listado}: búsqueda sólo por nombre",
+             tabla, f"ix_{tabla}_nombres", pagina_personas(entidad, "Juan")),
+            (f"{listado}: búsqueda por documento",
+             tabla, f"ix_{tabla}_nro_documento", pagina_personas(entidad, "3012")),
+            (f"FormVenta: autocompletar de {entidad.__name__.lower()} por apellido y nombre",
+             tabla, f"ix_{tabla}_apellidos", sentencia_buscar_personas(entidad, "Pérez, Ju", 20)),
+            (f"FormVenta: autocompletar de {entidad.__name__.lower()} sólo por nombre",
+             tabla, f"ix_{tabla}_nombres", sentencia_buscar_personas(entidad, "Juan", 20)),
+            (f"FormVenta: autocompletar de {entidad.__name__.lower()} por documento",
+             tabla, f"ix_{tabla}_nro_documento", sentencia_buscar_personas(entidad, "3012", 20)),
+        ]
+    return lista
+
+
+def sql_de(stmt, dialect) -> str:
+    """La sentencia como la manda la app, con los valores en línea (para EXPLAIN)."""
+    return str(stmt.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+
+
+# ── Helpers ────────────────────────────────────────────────────────────────────
+
+def indice_existe(conn, tabla, nombre):
+    r = conn.execute(sa.text("""
+        SELECT COUNT(*)
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE()
+          AND TABLE_NAME   = :t
+          AND INDEX_NAME   = :i
+    """), {"t": tabla, "i": nombre})
+    return r.scalar() > 0
+
+
+# ── Confirmación para producción ───────────────────────────────────────────────
+
+def confirmar_si_produccion():
+    if DB_NAME == DB_TEST:
+        print(f"ℹ  Base de datos de test detectada ({DB_TEST}). Continuando sin confirmación.\n")
+        return
+
+    print()
+    print("=" * 60)
+    print("  ⚠️  ATENCIÓN: BASE DE DATOS DE PRODUCCIÓN")
+    print("=" * 60)
+    print(f"  Base apuntada: {DB_NAME}")
+    print()
+    print("  Esta operación va a:")
+    print("    • Crear índices en las tablas cuotas, cobros, ventas, clientes y garantes")
+    print("      (en línea; ningún dato se modifica)")
+    print()
+    print("  ASEGURATE de tener un dump completo de la base antes de continuar.")
+    print("  Ejemplo:  mysqldump -u root -p credanzadb > backup_pre_indices.sql")
+    print()
+    respuesta = input("  Para confirmar, escribí exactamente CONFIRMAR: ").strip()
+    if respuesta != "CONFIRMAR":
+        print("\n  Operación cancelada. No se aplicó ningún cambio.")
+        sys.exit(0)
+    print()
+
+
+# ── Migración ─────────────────────────────────────────────────────────────────
+
+def crear_indices(conn, indices=INDICES):
+    for tabla, nombre, columnas in indices:
+        if indice_existe(conn, tabla, nombre):
+            print(f"   · {tabla}.{nombre} ya existe")
+            continue
+        cols = ", ".join(f"`{c}`" for c in columnas)
+        conn.execute(sa.text(
+            f"ALTER TABLE `{tabla}` ADD INDEX `{nombre}` ({cols}), ALGORITHM=INPLACE, LOCK=NONE"
+        ))
+        print(f"   + {tabla}.{nombre} ({', '.join(columnas)}) creado")
+
+
+# ── Verificación con EXPLAIN ──────────────────────────────────────────────────
+
+def verificar_planes(conn, lista=None):
+    """
+    Corre EXPLAIN sobre cada consulta de consultas() y compara el índice
+    elegido con el esperado. Devuelve la cantidad de consultas que no
+    pueden usarlo.
+
+    Con tablas casi vacías MySQL puede preferir un recorrido completo aunque
+    el índice exista; eso se informa como "disponible" y no cuenta como falla.
+    """
+    faltantes = 0
+    for descripcion, tabla, esperado, stmt in (consultas() if lista is None else lista):
+        # exec_driver_sql: el SQL compilado ya trae los % escapados para el driver
+        filas = conn.exec_driver_sql("EXPLAIN " + sql_de(stmt, conn.dialect)).mappings().all()
+        # Con UNION la tabla aparece una vez por rama: vale si alguna usa el índice
+        planes = [f for f in filas if f["table"] == tabla]
+        # Un OR entre dos columnas indexadas es index_merge: key = "ix_a,ix_b"
+        plan = next((f for f in planes if esperado in (f["key"] or "").split(",")),
+                    planes[0] if planes else None)
+        usado = plan["key"] if plan else None
+        posibles = (plan["possible_keys"] or "") if plan else ""
+        if esperado in (usado or "").split(","):
+            print(f"   ✓ {descripcion}\n       usa {esperado}")
+        elif esperado in posibles.split(","):
+            print(f"   · {descripcion}\n       {esperado} disponible; el optimizador eligió "
+                  f"{usado or 'recorrido completo'} (normal con pocas filas)")
+        else:
+            faltantes += 1
+            print(f"   ✗ {descripcion}\n       {esperado} no es utilizable (key={usado})")
+    return faltantes
+
+
+# ── Main ───────────────────────────────────────────────────────────────────────
+
+def main():
+    solo_verificar = "--verificar" in sys.argv[1:]
+
+    print()
+    print("═══════════════════════════════════════════════════")
+    print("  MIGRACIÓN: índices cuotas/cobros/ventas/clientes")
+    print("═══════════════════════════════════════════════════")
+    print()
+
+    with engine.connect() as conn:
+        if not solo_verificar:
+            confirmar_si_produccion()
+            crear_indices(conn)
+            conn.commit()
+            print()
+
+        print("── Verificación (EXPLAIN)")
+        faltantes = verificar_planes(conn)
+
+    print()
+    if faltantes:
+        print(f"⚠️  {faltantes} consulta(s) no pueden usar su índice. Revisá la salida de arriba.")
+        sys.exit(1)
+    print("✅ Índices verificados." if solo_verificar else "✅ Migración completada.")
+    print()
+    print("Podés verificar con:")
+    print("  SHOW INDEX FROM cuotas;")
+    print("  SHOW INDEX FROM cobros;")
+    print("  SHOW INDEX FROM ventas;")
+    print("  SHOW INDEX FROM clientes;")
+    print("  SHOW INDEX FROM garantes;")
+    print()
+
+
+if __name__ == "__main__":
+    main()
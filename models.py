@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime, Text, ForeignKey, Enum, Boolean, Float, Numeric, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Date, DateTime, Text, ForeignKey, Enum, Boolean, Float, Numeric, UniqueConstraint, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
+import threading
+import time
 
 from database import engine, Session, get_session
 
@@ -57,6 +59,10 @@ class Cliente(Base):
     __tablename__ = 'clientes'
     __table_args__ = (
         UniqueConstraint('tipo_documento', 'nro_documento', name='uq_clientes_tipo_nro'),
+        # Búsqueda por prefijo del autocompletar de ventas (FormCobro) y del listado
+        Index('ix_clientes_apellidos', 'apellidos'),
+        Index('ix_clientes_nombres', 'nombres'),
+        Index('ix_clientes_nro_documento', 'nro_documento'),
     )
     id = Column(Integer, primary_key=True)
     apellidos = Column(String(100))
@@ -82,6 +88,10 @@ class Garante(Base):
     __tablename__ = 'garantes'
     __table_args__ = (
         UniqueConstraint('tipo_documento', 'nro_documento', name='uq_garantes_tipo_nro'),
+        # Búsqueda por prefijo del listado de garantes
+        Index('ix_garantes_apellidos', 'apellidos'),
+        Index('ix_garantes_nombres', 'nombres'),
+        Index('ix_garantes_nro_documento', 'nro_documento'),
     )
     id = Column(Integer, primary_key=True)
     apellidos = Column(String(100))
@@ -141,6 +151,13 @@ class Personal(Base):
 
 class Venta(Base):
     __tablename__ = 'ventas'
+    # Índices de las consultas por fecha y por personal (ver migrate_indices.py)
+    __table_args__ = (
+        Index('ix_ventas_fecha', 'fecha'),
+        Index('ix_ventas_coordinador_fecha', 'coordinador_id', 'fecha'),
+        Index('ix_ventas_vendedor_fecha', 'vendedor_id', 'fecha'),
+        Index('ix_ventas_cobrador_fecha', 'cobrador_id', 'fecha'),
+    )
     id = Column(Integer, primary_key=True)
     cliente_id = Column(Integer, ForeignKey('clientes.id'))
     garante_id = Column(Integer, ForeignKey('garantes.id'))
@@ -182,6 +199,9 @@ class Venta(Base):
 
 class Cuota(Base):
     __tablename__ = 'cuotas'
+    __table_args__ = (
+        Index('ix_cuotas_venta_numero', 'venta_id', 'numero'),
+    )
     id = Column(Integer, primary_key=True)
     venta_id = Column(Integer, ForeignKey('ventas.id'))
     numero = Column(Integer)
@@ -201,6 +221,10 @@ class Cuota(Base):
 
 class Cobro(Base):
     __tablename__ = 'cobros'
+    __table_args__ = (
+        Index('ix_cobros_venta_cuota_id', 'venta_id', 'cuota_id', 'id'),
+        Index('ix_cobros_fecha', 'fecha'),
+    )
     id = Column(Integer, primary_key=True)
     venta_id = Column(Integer, ForeignKey('ventas.id'))
     fecha = Column(Date)
@@ -231,14 +255,54 @@ class SystemSetting(Base):
     key = Column(String(100), unique=True, nullable=False)
     value = Column(String(255), nullable=True)
 
+# --- Versión del esquema (una sola fila; la mantiene migraciones.py) ---
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False)
+    actualizada_en = Column(DateTime, default=datetime.utcnow)
+
+# Caché de ajustes compartida por el proceso: la tabla es chica, así que se
+# lee entera en una consulta y se reutiliza SETTINGS_TTL_SEGUNDOS. set_setting
+# la invalida; en otros procesos (otra PC, otro worker de la API) el cambio se
+# ve al vencer el TTL.
+SETTINGS_TTL_SEGUNDOS = 30
+_settings_cache = {"valores": None, "vence": 0.0, "generacion": 0}
+_settings_lock = threading.Lock()
+
+def _settings(db_session) -> dict:
+    ahora = time.monotonic()
+    with _settings_lock:
+        valores = _settings_cache["valores"]
+        if valores is not None and _settings_cache["vence"] > ahora:
+            return valores
+        generacion = _settings_cache["generacion"]
+    valores = dict(db_session.query(SystemSetting.key, SystemSetting.value).all())
+    with _settings_lock:
+        # Si hubo un set_setting mientras leíamos, no guardar una lectura vieja
+        if _settings_cache["generacion"] == generacion:
+            _settings_cache.update(valores=valores, vence=ahora + SETTINGS_TTL_SEGUNDOS)
+    return valores
+
+def invalidar_settings() -> None:
+    with _settings_lock:
+        _settings_cache.update(valores=None, vence=0.0, generacion=_settings_cache["generacion"] + 1)
+
 # Helpers simples para leer/escribir ajustes (¡fuera de la clase!)
 def get_setting(db_session, key: str, default: str | None = None) -> str | None:
     try:
-        s = db_session.query(SystemSetting).filter_by(key=key).first()
-        return s.value if s else default
+        return _settings(db_session).get(key, default)
     except Exception:
         return default
 
+def get_settings(db_session, keys, default: str | None = None) -> dict:
+    """Varios ajustes a la vez ({clave: valor}), con una sola consulta como máximo."""
+    try:
+        valores = _settings(db_session)
+    except Exception:
+        valores = {}
+    return {k: valores.get(k, default) for k in keys}
+
 def set_setting(db_session, key: str, value: str | None) -> None:
     s = db_session.query(SystemSetting).filter_by(key=key).first()
     if not s:
@@ -247,6 +311,7 @@ def set_setting(db_session, key: str, value: str | None) -> None:
     else:
         s.value = value
     db_session.commit()
+    invalidar_settings()
 
 # --- Bootstrap de permisos base ---
 def ensure_core_permissions(db_session) -> None:
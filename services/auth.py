@@ -0,0 +1,192 @@
+"""
+services/auth.py
+
+Inicio de sesión. Lo usan el escritorio (gui/login_form.py, desde un hilo
+de trabajo) y la API (api/services/auth_service.py lo envuelve y le suma
+la caché de usuarios y la versión async). Pasos, en orden:
+  - error genérico único para usuario inexistente / inactivo / password mala,
+  - bloqueo por 5 intentos fallidos durante 15 minutos,
+  - migración transparente de hashes legacy SHA-256 → Argon2id,
+  - expiración de contraseña a los 60 días (o sin fecha) / must_change_password,
+  - política 2FA: global (SystemSetting) OR por usuario OR TOTP ya configurado.
+
+last_login_at / previous_login_at se actualizan ANTES de la verificación
+2FA (paso 8 antes del 9), como lo hacía la desktop app.
+
+Todas las marcas de tiempo (lock_until, last_login_at, last_password_change)
+son UTC sin zona, igual que ChangePasswordDialog y la pantalla de inicio,
+que las convierte a hora local para mostrarlas.
+
+El login va en tres fases: login_buscar (sesión), login_verificar (paso 4,
+Argon2, SIN sesión ni conexión tomada; corre en el ejecutor acotado de
+utils.security) y login_registrar (otra sesión). Así una ráfaga de logins
+no retiene conexiones del pool mientras se calculan los hashes.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from database import get_session
+from models import Usuario, get_setting
+from utils.security import hash_executor, verify_and_rehash
+
+PASSWORD_MAX_AGE_DAYS = 60
+LOCK_THRESHOLD = 5
+LOCK_MINUTES = 15
+
+# Estados posibles del intento de login
+STATUS_OK = "ok"
+STATUS_INVALID = "invalid"
+STATUS_LOCKED = "locked"
+STATUS_PASSWORD_CHANGE = "password_change_required"
+STATUS_2FA_SETUP = "2fa_setup_required"
+STATUS_2FA_REQUIRED = "2fa_required"
+
+
+@dataclass
+class LoginResult:
+    status: str
+    usuario_id: Optional[int] = None
+    minutos_restantes: Optional[int] = None
+
+
+@dataclass
+class DatosLogin:
+    """Lo que la fase 2 (hash) necesita de la fase 1, sin sesión abierta."""
+
+    usuario_id: int
+    hash_guardado: str
+
+
+def requiere_2fa_global(session) -> bool:
+    """Lee la política global de 2FA desde SystemSetting.
+
+    Normaliza valores tipo "1"/"true"/"True" a booleano.
+    """
+    valor = get_setting(session, "require_2fa_global", "0")
+    return str(valor).strip().lower() in ("1", "true", "si", "sí")
+
+
+def _minutos_bloqueo(usuario, ahora: datetime) -> int:
+    return int((usuario.lock_until - ahora).total_seconds() // 60) + 1
+
+
+def login_buscar(nombre_usuario: str, ahora: datetime,
+                 al_inactivo: Optional[Callable[[int], None]] = None):
+    """
+    Fase 1 (pasos 1-3): devuelve DatosLogin, o el LoginResult si ya se
+    decide acá. al_inactivo(usuario_id) se llama si el usuario existe pero
+    está dado de baja (la API descarta su caché).
+    """
+    with get_session() as session:
+        # Paso 1: buscar por NOMBRE (no email)
+        usuario = session.query(Usuario).filter(Usuario.nombre == nombre_usuario).first()
+
+        # Paso 2: inexistente o inactivo → error genérico (no revelar cuál falló)
+        if usuario is None or not usuario.activo:
+            if usuario is not None and al_inactivo is not None:
+                al_inactivo(usuario.id)
+            return LoginResult(status=STATUS_INVALID)
+
+        # Paso 3: cuenta bloqueada (sin gastar un hash)
+        if usuario.lock_until and usuario.lock_until > ahora:
+            return LoginResult(status=STATUS_LOCKED, minutos_restantes=_minutos_bloqueo(usuario, ahora))
+
+        return DatosLogin(usuario_id=usuario.id, hash_guardado=usuario.password)
+
+
+def login_verificar(datos: DatosLogin, password: str) -> tuple[bool, Optional[str]]:
+    """Fase 2 (paso 4): verifica la contraseña (Argon2id o legacy SHA-256). Para el ejecutor."""
+    return verify_and_rehash(password, datos.hash_guardado)
+
+
+def login_registrar(datos: DatosLogin, ok: bool, hash_nuevo: Optional[str], ahora: datetime) -> LoginResult:
+    """Fase 3 (pasos 5-12): guarda el resultado de la verificación."""
+    with get_session() as session:
+        # FOR UPDATE: los intentos concurrentes del mismo usuario se registran de
+        # a uno, así el contador no pierde incrementos y el bloqueo se ve enseguida
+        usuario = session.get(Usuario, datos.usuario_id, with_for_update=True)
+        if usuario is None or not usuario.activo:
+            return LoginResult(status=STATUS_INVALID)
+
+        # Paso 3 otra vez: otro intento pudo bloquear la cuenta mientras se
+        # verificaba el hash. Bloqueada gana aunque la contraseña sea correcta.
+        if usuario.lock_until and usuario.lock_until > ahora:
+            restantes = _minutos_bloqueo(usuario, ahora)
+            session.commit()
+            return LoginResult(status=STATUS_LOCKED, minutos_restantes=restantes)
+
+        # Paso 5: contraseña incorrecta → contar intentos y bloquear si corresponde
+        if not ok:
+            usuario.failed_attempts = (usuario.failed_attempts or 0) + 1
+            if usuario.failed_attempts >= LOCK_THRESHOLD:
+                usuario.failed_attempts = 0
+                usuario.lock_until = ahora + timedelta(minutes=LOCK_MINUTES)
+                session.commit()
+                return LoginResult(
+                    status=STATUS_LOCKED, minutos_restantes=LOCK_MINUTES
+                )
+            session.commit()
+            return LoginResult(status=STATUS_INVALID)
+
+        # Paso 6: contraseña correcta → resetear contadores y migrar hash
+        # (legacy SHA-256, o Argon2 con parámetros anteriores a la calibración)
+        usuario.failed_attempts = 0
+        usuario.lock_until = None
+        # (si otro login ya lo migró o la clave cambió mientras tanto, no pisarla)
+        if hash_nuevo and usuario.password == datos.hash_guardado:
+            legacy = not usuario.password.startswith("$argon2")
+            usuario.password = hash_nuevo
+            if legacy and usuario.last_password_change is None:
+                usuario.last_password_change = ahora
+
+        # Paso 7: cambio de contraseña obligatorio o vencida (>= 60 días).
+        # Sin fecha de cambio (usuario recién creado) cuenta como vencida.
+        vencida = (
+            usuario.last_password_change is None
+            or (ahora - usuario.last_password_change).days >= PASSWORD_MAX_AGE_DAYS
+        )
+        if usuario.must_change_password or vencida:
+            session.commit()  # persistir reset de intentos y migración de hash
+            return LoginResult(
+                status=STATUS_PASSWORD_CHANGE, usuario_id=usuario.id
+            )
+
+        # Paso 8: actualizar marcas de login (antes del 2FA, igual que la desktop app)
+        usuario.previous_login_at = usuario.last_login_at
+        usuario.last_login_at = ahora
+
+        # Paso 9: política de 2FA
+        need_token = (
+            requiere_2fa_global(session)
+            or bool(usuario.require_2fa)
+            or (bool(usuario.totp_enabled) and bool(usuario.totp_secret))
+        )
+
+        session.commit()
+
+        if need_token:
+            # Paso 10: exige 2FA pero no está configurado → setup pendiente
+            if not (usuario.totp_enabled and usuario.totp_secret):
+                return LoginResult(status=STATUS_2FA_SETUP, usuario_id=usuario.id)
+            # Paso 11: exigir código de 6 dígitos (lo pide quien llamó)
+            return LoginResult(status=STATUS_2FA_REQUIRED, usuario_id=usuario.id)
+
+        # Paso 12: login completo
+        return LoginResult(status=STATUS_OK, usuario_id=usuario.id)
+
+
+def login(nombre_usuario: str, password: str,
+          al_inactivo: Optional[Callable[[int], None]] = None) -> LoginResult:
+    """
+    Las tres fases seguidas; el hash corre en el ejecutor de utils.security.
+    Bloquea el hilo que llama hasta el final (el escritorio lo llama desde
+    un hilo de trabajo; la API async usa auth_service.login_async).
+    """
+    ahora = datetime.utcnow()
+    datos = login_buscar(nombre_usuario, ahora, al_inactivo)
+    if isinstance(datos, LoginResult):
+        return datos
+    ok, hash_nuevo = hash_executor().submit(login_verificar, datos, password).result()
+    return login_registrar(datos, ok, hash_nuevo, ahora)
@@ -0,0 +1,108 @@
+"""
+services/busquedas.py
+
+Sentencias de búsqueda por prefijo que arman los formularios: listados de
+clientes y garantes, autocompletar de cliente/garante (FormVenta) y de
+ventas (FormCobro). Están acá, sin Qt, para que migrate_indices.py les
+corra EXPLAIN sin cargar la GUI; los formularios sólo las ejecutan.
+
+Lo que tipea el usuario va a los LIKE escapado con escapar_like(): un "%"
+o un "_" se buscan como texto, no como comodines.
+"""
+
+import re
+
+from sqlalchemy import select, and_, or_, union_all
+
+from models import Venta, Cliente
+
+# Carácter de escape de los LIKE armados con escapar_like()
+ESCAPE_LIKE = "\\"
+
+
+def escapar_like(texto: str) -> str:
+    """Escapa los comodines de LIKE; usar con .like(patron, escape=ESCAPE_LIKE)."""
+    return texto.replace(ESCAPE_LIKE, ESCAPE_LIKE * 2).replace("%", ESCAPE_LIKE + "%").replace("_", ESCAPE_LIKE + "_")
+
+
+def filtro_por_palabras(texto: str, columnas_texto: list, columnas_numero: list):
+    """
+    Cada palabra tiene que ser el comienzo de alguna columna de su lista:
+    columnas_numero (documento) si es un número, columnas_texto (apellidos,
+    nombres) si no. "Miranda Ju", "Miranda, Ju" o "Juan" encuentran a
+    Miranda, Juan. Todas las columnas de las listas tienen que tener índice:
+    la primera palabra la resuelven esos índices (un OR entre apellidos y
+    nombres es un index_merge en MySQL) y las siguientes sólo filtran las
+    filas que ya trajeron. Devuelve None si no hay nada que filtrar.
+    """
+    condiciones = []
+    for palabra in re.split(r"[\s,]+", (texto or "").strip()):
+        if not palabra:
+            continue
+        columnas = columnas_numero if palabra.isdigit() else columnas_texto
+        patron = escapar_like(palabra) + "%"
+        condiciones.append(or_(*(col.like(patron, escape=ESCAPE_LIKE) for col in columnas)))
+    return and_(*condiciones) if condiciones else None
+
+
+# ---------------- Clientes y garantes ----------------
+def sentencia_personas(entidad, texto: str):
+    """
+    Columnas del listado de Cliente o Garante, filtradas por filtro_por_palabras
+    y ordenadas por apellido y nombre.
+    """
+    e = entidad
+    stmt = (
+        select(e.id, e.apellidos, e.nombres, e.tipo_documento, e.nro_documento, e.calificacion)
+        .order_by(e.apellidos, e.nombres, e.id)
+    )
+    filtro = filtro_por_palabras(texto, [e.apellidos, e.nombres], [e.nro_documento])
+    return stmt if filtro is None else stmt.where(filtro)
+
+
+def sentencia_buscar_personas(entidad, texto: str, limite: int):
+    """
+    Consulta del autocompletar de cliente/garante: la misma del listado
+    (sentencia_personas), así la primera palabra va por los índices de
+    apellidos y nombres o de documento. Acepta también el texto de una
+    opción ya elegida ("Pérez, Juan (DNI ...)").
+    """
+    return sentencia_personas(entidad, texto.split("(")[0]).limit(limite)
+
+
+# ---------------- Ventas (autocompletar de FormCobro) ----------------
+def _ventas_con_cliente(*condiciones):
+    return (
+        select(Venta.id, Cliente.apellidos, Cliente.nombres,
+               Cliente.tipo_documento, Cliente.nro_documento)
+        .join(Cliente, Cliente.id == Venta.cliente_id)
+        .where(or_(Venta.anulada.is_(False), Venta.anulada.is_(None)), *condiciones)
+    )
+
+
+def sentencia_busqueda_ventas(texto: str, limite: int):
+    """
+    Sentencia de FormCobro.buscar_ventas.
+
+    Un número puede ser el id de la venta o el comienzo del documento: son
+    dos búsquedas indexadas (PK de ventas; ix_clientes_nro_documento y de
+    ahí a las ventas del cliente) unidas con UNION ALL. Un OR entre las dos
+    tablas obligaría a recorrer ventas JOIN clientes entero.
+    """
+    texto = texto.strip()
+    numero = texto.lstrip("#")
+    if texto.startswith("#") and numero.isdigit():
+        stmt = _ventas_con_cliente(Venta.id == int(numero))
+    elif numero.isdigit():
+        por_documento = _ventas_con_cliente(
+            Cliente.nro_documento.like(f"{numero}%"), Venta.id != int(numero))
+        stmt = union_all(_ventas_con_cliente(Venta.id == int(numero)), por_documento)
+        u = stmt.subquery()
+        return select(u).order_by(u.c.apellidos, u.c.nombres, u.c.id.desc()).limit(limite)
+    else:
+        apellido, _, nombre = texto.partition(",")
+        stmt = _ventas_con_cliente(
+            Cliente.apellidos.like(f"{escapar_like(apellido.strip())}%", escape=ESCAPE_LIKE))
+        if nombre.strip():
+            stmt = stmt.where(Cliente.nombres.like(f"{escapar_like(nombre.strip())}%", escape=ESCAPE_LIKE))
+    return stmt.order_by(Cliente.apellidos, Cliente.nombres, Venta.id.desc()).limit(limite)
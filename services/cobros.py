@@ -0,0 +1,175 @@
+"""
+services/cobros.py
+
+Imputación de un cobro a las cuotas abiertas de una venta. La usan el
+escritorio (FormCobro) y la API (POST /ventas/{id}/cobros).
+
+  - Bloquea la venta y sus cuotas abiertas (SELECT ... FOR UPDATE) dentro
+    de la transacción: dos cajas cobrando la misma venta a la vez se
+    serializan y la segunda ve los saldos ya actualizados.
+  - Reparte el monto de la cuota más vieja a la más nueva en centavos
+    enteros (sin errores de redondeo de float).
+  - Inserta todos los Cobro y actualiza todas las cuotas en dos sentencias
+    (executemany), no una por cuota.
+
+Lo que exceda el saldo de la venta no se imputa y se devuelve como sobrante.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+
+from sqlalchemy import select, insert, update, func, or_
+
+from database import get_session
+from models import Venta, Cuota, Cobro
+
+SIN_ESPECIFICAR = "Sin especificar"
+
+
+class VentaNoEncontrada(Exception):
+    """No existe una venta con ese id."""
+
+
+class VentaNoCobrable(Exception):
+    """La venta está anulada o finalizada y no admite cobros."""
+
+
+class MontoInvalido(Exception):
+    """El monto a cobrar no es mayor a cero."""
+
+
+@dataclass
+class ResultadoCobro:
+    venta_id: int
+    aplicado: Decimal
+    sobrante: Decimal
+    # (cuota_id, numero, monto imputado, quedó pagada)
+    imputaciones: list = field(default_factory=list)
+    venta_saldada: bool = False
+
+
+def a_centavos(valor) -> int:
+    """Importe (float, str o Decimal) a centavos enteros, redondeando al centavo."""
+    return int((Decimal(str(valor or 0)) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def _a_pesos(centavos: int) -> Decimal:
+    return Decimal(centavos) / 100
+
+
+def repartir(monto_centavos: int, saldos: list) -> tuple:
+    """
+    Reparte monto_centavos sobre los saldos (en centavos, en orden de cuota).
+    Devuelve (lista de importes imputados por cuota, sobrante en centavos).
+    """
+    imputado = []
+    restante = monto_centavos
+    for saldo in saldos:
+        pago = min(max(saldo, 0), restante)
+        imputado.append(pago)
+        restante -= pago
+    return imputado, restante
+
+
+# Sentencias de FormCobro.cargar_cuotas; migrate_indices.py corre EXPLAIN sobre ellas
+def sentencia_cuotas(venta_id: int):
+    """Cuotas de la venta en orden (ix_cuotas_venta_numero)."""
+    return select(Cuota).where(Cuota.venta_id == venta_id).order_by(Cuota.numero)
+
+
+def sentencia_ultimos_cobros(venta_id: int):
+    """Id del último cobro de cada cuota: el MAX(id) por cuota sale de ix_cobros_venta_cuota_id."""
+    return (
+        select(func.max(Cobro.id))
+        .where(Cobro.venta_id == venta_id, Cobro.cuota_id.isnot(None))
+        .group_by(Cobro.cuota_id)
+    )
+
+
+def sentencia_cuotas_abiertas(venta_id: int):
+    """Cuotas impagas de la venta, en orden y bloqueadas (ix_cuotas_venta_numero)."""
+    return (
+        select(Cuota.id, Cuota.numero, Cuota.monto_original, Cuota.monto_pagado)
+        .where(Cuota.venta_id == venta_id,
+               or_(Cuota.pagada.is_(False), Cuota.pagada.is_(None)))
+        .order_by(Cuota.numero)
+        .with_for_update()
+    )
+
+
+def registrar_cobro(
+    venta_id: int,
+    monto,
+    fecha: date | None = None,
+    *,
+    tipo: str = "CUOTA",
+    metodo: str | None = None,
+    lugar: str | None = None,
+    comprobante: str | None = None,
+    observaciones: str | None = None,
+    registrado_por_id: int | None = None,
+) -> ResultadoCobro:
+    """Imputa el cobro en una sola transacción y devuelve el detalle."""
+    monto_centavos = a_centavos(monto)
+    if monto_centavos <= 0:
+        raise MontoInvalido()
+    fecha = fecha or date.today()
+
+    with get_session() as session:
+        # El lock sobre la venta serializa los cobros concurrentes de la misma venta
+        venta = session.execute(
+            select(Venta.id, Venta.anulada, Venta.finalizada)
+            .where(Venta.id == venta_id)
+            .with_for_update()
+        ).first()
+        if venta is None:
+            raise VentaNoEncontrada()
+        if venta.anulada or venta.finalizada:
+            raise VentaNoCobrable()
+
+        cuotas = session.execute(sentencia_cuotas_abiertas(venta_id)).all()
+
+        originales = [a_centavos(c.monto_original) for c in cuotas]
+        pagados = [a_centavos(c.monto_pagado) for c in cuotas]
+        saldos = [o - p for o, p in zip(originales, pagados)]
+        imputado, sobrante = repartir(monto_centavos, saldos)
+
+        cobros, cuotas_upd, imputaciones = [], [], []
+        for c, original, pagado, pago in zip(cuotas, originales, pagados, imputado):
+            if pago <= 0:
+                continue
+            pagada = pagado + pago >= original
+            cobros.append({
+                "venta_id": venta_id,
+                "cuota_id": c.id,
+                "fecha": fecha,
+                "monto": _a_pesos(pago),
+                "tipo": tipo,
+                "observaciones": observaciones,
+                "registrado_por_id": registrado_por_id,
+                "metodo": None if metodo == SIN_ESPECIFICAR else metodo,
+                "lugar": None if lugar == SIN_ESPECIFICAR else lugar,
+                "comprobante": comprobante,
+            })
+            cuotas_upd.append({"id": c.id, "monto_pagado": _a_pesos(pagado + pago), "pagada": pagada})
+            imputaciones.append((c.id, c.numero, _a_pesos(pago), pagada))
+
+        if cobros:
+            session.execute(insert(Cobro), cobros)
+            session.execute(update(Cuota), cuotas_upd)
+            saldadas = [u["id"] for u in cuotas_upd if u["pagada"]]
+            if saldadas:
+                session.execute(
+                    update(Cuota).where(Cuota.id.in_(saldadas)).values(fecha_pago=fecha)
+                    .execution_options(synchronize_session=False)
+                )
+        session.commit()
+
+    return ResultadoCobro(
+        venta_id=venta_id,
+        aplicado=_a_pesos(monto_centavos - sobrante),
+        sobrante=_a_pesos(sobrante),
+        imputaciones=imputaciones,
+        venta_saldada=bool(cuotas) and all(p >= s for p, s in zip(imputado, saldos)),
+    )
@@ -0,0 +1,133 @@
+"""
+services/mora.py
+
+Proceso nocturno que mantiene Cuota.vencida y Cuota.interes_mora.
+
+Trabaja con UPDATEs por conjuntos (sin cargar cuotas en Python), en tramos
+de ids para que cada transacción sea corta y no bloquee la operación diaria:
+
+  - Cuota impaga con vencimiento anterior a la fecha de proceso
+      → vencida = 1 e interes_mora = saldo * tasa_diaria * días de atraso
+        (interés simple, redondeado a centavos).
+  - Cuota impaga no vencida → vencida = 0 e interes_mora = 0.
+  - Cuota pagada → vencida = 0; interes_mora queda congelado con lo
+    devengado hasta el pago.
+
+Las cuotas de ventas anuladas no devengan mora.
+
+La tasa diaria (decimal, 0.001 = 0,1% diario) se toma del ajuste
+'tasa_mora_diaria' de system_settings o del parámetro --tasa. Con tasa 0
+sólo se actualiza la marca de vencida.
+
+Es idempotente: correrlo dos veces el mismo día deja el mismo resultado.
+
+Uso:
+    python -m services.mora                     # fecha de hoy, tasa del ajuste
+    python -m services.mora --tasa 0.0015       # tasa explícita
+    python -m services.mora --fecha 2026-03-31  # reproceso a una fecha
+"""
+
+import argparse
+from datetime import date
+
+from sqlalchemy import select, update, func, case, and_, or_, exists, literal
+
+from database import engine, get_session
+from models import Cuota, Venta, get_setting
+
+CLAVE_TASA = "tasa_mora_diaria"
+TAMANIO_TRAMO = 5000
+
+
+def tasa_configurada() -> float:
+    """Tasa diaria de mora guardada en system_settings (0 si no hay o es inválida)."""
+    with get_session() as session:
+        valor = get_setting(session, CLAVE_TASA, "0")
+    try:
+        return max(float(valor), 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _dias_de_atraso(dialecto: str, fecha_proceso: date):
+    """Expresión SQL con los días entre el vencimiento y la fecha de proceso."""
+    if dialecto == "mysql":
+        return func.datediff(literal(fecha_proceso), Cuota.fecha_vencimiento)
+    # SQLite (base de pruebas)
+    return func.julianday(literal(fecha_proceso)) - func.julianday(Cuota.fecha_vencimiento)
+
+
+def _sentencia(dialecto: str, fecha_proceso: date, tasa_diaria: float, desde: int, hasta: int):
+    impaga = or_(Cuota.pagada.is_(False), Cuota.pagada.is_(None))
+    venta_anulada = exists().where(Venta.id == Cuota.venta_id, Venta.anulada.is_(True))
+    en_mora = and_(impaga, Cuota.fecha_vencimiento < fecha_proceso, ~venta_anulada)
+    saldo = Cuota.monto_original - func.coalesce(Cuota.monto_pagado, 0)
+    mora = func.round(saldo * tasa_diaria * _dias_de_atraso(dialecto, fecha_proceso), 2)
+
+    return (
+        update(Cuota)
+        .where(Cuota.id >= desde, Cuota.id < hasta)
+        .values(
+            vencida=case((en_mora, True), else_=False),
+            interes_mora=case(
+                (en_mora, mora),
+                (impaga, 0),
+                else_=func.coalesce(Cuota.interes_mora, 0),
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def actualizar_mora(fecha_proceso: date | None = None, tasa_diaria: float | None = None,
+                    tamanio_tramo: int = TAMANIO_TRAMO) -> dict:
+    """
+    Recorre la tabla cuotas por tramos de id y actualiza vencida / interes_mora.
+    Devuelve un resumen: tramos procesados, cuotas vencidas y mora total.
+    """
+    fecha_proceso = fecha_proceso or date.today()
+    if tasa_diaria is None:
+        tasa_diaria = tasa_configurada()
+    if tasa_diaria < 0:
+        raise ValueError("La tasa de mora no puede ser negativa.")
+
+    tramos = 0
+    with engine.connect() as conn:
+        minimo, maximo = conn.execute(select(func.min(Cuota.id), func.max(Cuota.id))).one()
+        if minimo is not None:
+            dialecto = conn.dialect.name
+            for desde in range(minimo, maximo + 1, tamanio_tramo):
+                conn.execute(_sentencia(dialecto, fecha_proceso, tasa_diaria,
+                                        desde, desde + tamanio_tramo))
+                conn.commit()   # transacción corta por tramo
+                tramos += 1
+
+        vencidas, mora_total = conn.execute(
+            select(func.count(Cuota.id), func.coalesce(func.sum(Cuota.interes_mora), 0))
+            .where(Cuota.vencida.is_(True))
+        ).one()
+
+    return {
+        "fecha_proceso": fecha_proceso,
+        "tasa_diaria": tasa_diaria,
+        "tramos": tramos,
+        "cuotas_vencidas": vencidas,
+        "mora_total": float(mora_total),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Actualiza cuotas vencidas e interés por mora.")
+    parser.add_argument("--fecha", type=date.fromisoformat, help="fecha de proceso (AAAA-MM-DD)")
+    parser.add_argument("--tasa", type=float, help=f"tasa diaria decimal (por defecto, ajuste '{CLAVE_TASA}')")
+    parser.add_argument("--tramo", type=int, default=TAMANIO_TRAMO, help="cuotas por transacción")
+    args = parser.parse_args()
+
+    r = actualizar_mora(args.fecha, args.tasa, args.tramo)
+    print(f"Mora actualizada al {r['fecha_proceso']:%d/%m/%Y} "
+          f"(tasa diaria {r['tasa_diaria']:.4%}, {r['tramos']} tramos): "
+          f"{r['cuotas_vencidas']} cuotas vencidas, $ {r['mora_total']:,.2f} de interés por mora.")
+
+
+if __name__ == "__main__":
+    main()
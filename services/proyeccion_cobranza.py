@@ -0,0 +1,157 @@
+"""
+services/proyeccion_cobranza.py
+
+Proyección de cobranza de la cartera: cuánto se espera cobrar por día,
+semana o mes, abierto por cobrador y por producto.
+
+Carga todas las cuotas abiertas (saldo pendiente y vencimiento) en una sola
+consulta por columnas, sin instanciar objetos ORM, y hace el agrupamiento
+con pandas. Las cuotas ya vencidas se proyectan al día de hoy (cobro
+esperado inmediato) y se informan aparte en la columna 'vencido'.
+
+Uso por línea de comandos:
+    python -m services.proyeccion_cobranza --frecuencia semana
+    python -m services.proyeccion_cobranza --frecuencia mes --por cobrador --salida proy.xlsx
+"""
+
+import argparse
+from datetime import date
+
+import pandas as pd
+from sqlalchemy import select, func, or_
+
+from database import engine
+from models import Cuota, Venta, Personal, Producto
+
+# Cada período se rotula con su primer día (semanas de lunes a domingo)
+FRECUENCIAS = {
+    "dia": lambda f: f.dt.normalize(),
+    "semana": lambda f: f.dt.normalize() - pd.to_timedelta(f.dt.weekday, unit="D"),
+    "mes": lambda f: f.dt.to_period("M").dt.start_time,
+}
+DIMENSIONES = ("cobrador", "producto")
+SIN_ASIGNAR = "Sin asignar"
+
+
+def _consulta_cuotas_abiertas(hasta: date | None = None):
+    saldo = Cuota.monto_original - func.coalesce(Cuota.monto_pagado, 0)
+    stmt = (
+        select(
+            Cuota.id.label("cuota_id"),
+            Cuota.venta_id,
+            Cuota.fecha_vencimiento.label("fecha"),
+            saldo.label("saldo"),
+            Venta.cobrador_id,
+            Venta.producto_id,
+        )
+        .join(Venta, Venta.id == Cuota.venta_id)
+        .where(
+            or_(Cuota.pagada.is_(False), Cuota.pagada.is_(None)),
+            or_(Venta.anulada.is_(False), Venta.anulada.is_(None)),
+            or_(Venta.finalizada.is_(False), Venta.finalizada.is_(None)),
+            Cuota.fecha_vencimiento.is_not(None),
+            saldo > 0,
+        )
+    )
+    if hasta is not None:
+        stmt = stmt.where(Cuota.fecha_vencimiento <= hasta)
+    return stmt
+
+
+def cargar_cuotas_abiertas(conn, hasta: date | None = None) -> pd.DataFrame:
+    """
+    DataFrame con una fila por cuota abierta:
+    cuota_id, venta_id, fecha, saldo, cobrador_id, producto_id.
+    """
+    df = pd.read_sql(_consulta_cuotas_abiertas(hasta), conn)
+    df["fecha"] = pd.to_datetime(df["fecha"])
+    df["saldo"] = df["saldo"].astype(float)
+    return df
+
+
+def cargar_nombres(conn) -> dict:
+    """Diccionarios id → nombre para cobradores y productos (tablas chicas)."""
+    return {
+        "cobrador": dict(conn.execute(select(Personal.id, Personal.nombres)).all()),
+        "producto": dict(conn.execute(select(Producto.id, Producto.nombre)).all()),
+    }
+
+
+def proyectar(
+    cuotas: pd.DataFrame,
+    frecuencia: str = "semana",
+    por: tuple = DIMENSIONES,
+    hoy: date | None = None,
+    nombres: dict | None = None,
+) -> pd.DataFrame:
+    """
+    Agrupa el saldo de las cuotas abiertas por período y por las dimensiones
+    pedidas ('cobrador', 'producto', ambas o ninguna).
+
+    Devuelve columnas: periodo, <dimensiones>, cuotas, saldo, vencido.
+    """
+    if frecuencia not in FRECUENCIAS:
+        raise ValueError(f"Frecuencia desconocida: {frecuencia!r}")
+    desconocidas = [d for d in por if d not in DIMENSIONES]
+    if desconocidas:
+        raise ValueError(f"Dimensión desconocida: {desconocidas[0]!r}")
+
+    hoy = pd.Timestamp(hoy or date.today())
+    df = cuotas.copy()
+    vencidas = (df["fecha"] < hoy).to_numpy()
+    df["vencido"] = df["saldo"].where(vencidas, 0.0)
+    df["fecha"] = df["fecha"].where(~vencidas, hoy)
+
+    for dim in por:
+        ids = df[f"{dim}_id"]
+        if nombres is not None:
+            df[dim] = ids.map(nombres.get(dim, {})).fillna(SIN_ASIGNAR)
+        else:
+            df[dim] = ids.astype("Int64").astype(str).replace("<NA>", SIN_ASIGNAR)
+
+    df["periodo"] = FRECUENCIAS[frecuencia](df["fecha"])
+    resultado = (
+        df.groupby(["periodo", *por], sort=True)
+        .agg(cuotas=("cuota_id", "size"), saldo=("saldo", "sum"), vencido=("vencido", "sum"))
+        .reset_index()
+    )
+    resultado[["saldo", "vencido"]] = resultado[["saldo", "vencido"]].round(2)
+    return resultado
+
+
+def proyeccion_cobranza(
+    frecuencia: str = "semana",
+    por: tuple = DIMENSIONES,
+    hasta: date | None = None,
+    hoy: date | None = None,
+) -> pd.DataFrame:
+    """Atajo: carga la cartera abierta y devuelve la proyección con nombres."""
+    with engine.connect() as conn:
+        cuotas = cargar_cuotas_abiertas(conn, hasta)
+        nombres = cargar_nombres(conn)
+    return proyectar(cuotas, frecuencia, por, hoy=hoy, nombres=nombres)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Proyección de cobranza de la cartera.")
+    parser.add_argument("--frecuencia", choices=list(FRECUENCIAS), default="semana")
+    parser.add_argument("--por", nargs="*", choices=list(DIMENSIONES), default=list(DIMENSIONES),
+                        help="dimensiones de apertura (ninguna = total por período)")
+    parser.add_argument("--hasta", type=date.fromisoformat, help="último vencimiento a incluir (AAAA-MM-DD)")
+    parser.add_argument("--salida", help="archivo .xlsx o .csv; sin este parámetro se imprime")
+    args = parser.parse_args()
+
+    df = proyeccion_cobranza(args.frecuencia, tuple(args.por), args.hasta)
+    if not args.salida:
+        with pd.option_context("display.max_rows", 200, "display.width", 160):
+            print(df)
+    elif args.salida.lower().endswith(".xlsx"):
+        df.to_excel(args.salida, index=False, sheet_name="Proyección")
+        print(f"Proyección escrita en {args.salida}")
+    else:
+        df.to_csv(args.salida, index=False, sep=";")
+        print(f"Proyección escrita en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+services/ventas.py
+
+Alta de una venta con su cronograma de cuotas. La usan el escritorio
+(FormVenta) y una futura API (POST /ventas).
+
+  - Las fechas de vencimiento se calculan todas juntas con NumPy
+    (datetime64): el plan diario y el semanal son una suma de días; el
+    mensual suma meses a la fecha de inicio y, como relativedelta, ajusta
+    al último día si el mes es más corto (31/01 → 28/02 → 31/03).
+  - Las cuotas se insertan en una sola sentencia (executemany), no un
+    objeto Cuota por cuota.
+"""
+
+from datetime import date
+
+import numpy as np
+from sqlalchemy import insert
+
+from database import get_session
+from models import Venta, Cuota
+
+PLANES = ("diaria", "semanal", "mensual")
+DIAS_POR_PASO = {"diaria": 1, "semanal": 7}
+
+
+class VentaInvalida(Exception):
+    """Los datos de la venta no permiten armar el cronograma."""
+
+
+def fechas_vencimiento(inicio: date, plan: str, n_cuotas: int) -> list:
+    """
+    Vencimientos de las cuotas 1..n_cuotas: la primera vence en 'inicio' y
+    las siguientes cada un día, una semana o un mes según el plan.
+    """
+    if plan not in PLANES:
+        raise VentaInvalida(f"Plan de pago desconocido: {plan!r}")
+    if n_cuotas <= 0:
+        return []
+    pasos = np.arange(n_cuotas)
+    if plan in DIAS_POR_PASO:
+        fechas = np.datetime64(inicio, "D") + pasos * DIAS_POR_PASO[plan]
+    else:
+        meses = np.datetime64(inicio, "M") + pasos
+        dias_mes = (meses + 1).astype("datetime64[D]") - meses.astype("datetime64[D]")
+        dia = np.minimum(inicio.day, dias_mes.astype(int))
+        fechas = meses.astype("datetime64[D]") + (dia - 1)
+    return fechas.astype(object).tolist()
+
+
+def filas_cuotas(venta_id: int, inicio: date, plan: str, n_cuotas: int, valor_cuota) -> list:
+    """Filas (dicts) de las cuotas de una venta, listas para insert(Cuota)."""
+    return [
+        {
+            "venta_id": venta_id,
+            "numero": i,
+            "fecha_vencimiento": fv,
+            "monto_original": valor_cuota,
+            "monto_pagado": 0,
+            "pagada": False,
+        }
+        for i, fv in enumerate(fechas_vencimiento(inicio, plan, n_cuotas), start=1)
+    ]
+
+
+def crear_venta(**campos) -> int:
+    """
+    Inserta la venta (campos = columnas de Venta) y sus cuotas en una sola
+    transacción. Devuelve el id de la venta.
+    """
+    plan = campos.get("plan_pago") or "mensual"
+    n_cuotas = int(campos.get("num_cuotas") or 0)
+    if n_cuotas <= 0:
+        raise VentaInvalida("La cantidad de cuotas debe ser mayor que 0.")
+    inicio = campos.get("fecha_inicio_pago") or campos.get("fecha") or date.today()
+    # Valida el plan antes de tocar la base
+    filas = filas_cuotas(0, inicio, plan, n_cuotas, campos.get("valor_cuota"))
+
+    with get_session() as session:
+        venta = Venta(**campos)
+        session.add(venta)
+        session.flush()  # obtiene venta.id sin cerrar la transacción
+        venta_id = venta.id
+        for f in filas:
+            f["venta_id"] = venta_id
+        session.execute(insert(Cuota), filas)
+        session.commit()
+    return venta_id
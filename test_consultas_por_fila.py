@@ -0,0 +1,134 @@
+"""Regresión de consultas por fila (N+1) en los listados de escritorio.
+
+Cuenta las sentencias SQL que emite cada listado con pocos y con muchos
+registros. Si la cantidad crece con los registros, algún listado volvió a
+consultar por fila (un .get() o una relación lazy dentro del loop).
+También verifica que los chequeos de permisos del menú no consulten la
+base en cada llamada.
+
+Igual que test_e2e.py, corre contra el models.py REAL y un database.py
+idéntico al real salvo la URL (SQLite en vez de MySQL).
+"""
+
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload
+
+from database import Session as SessionLocal, engine
+from models import Base, Usuario, Rol, Personal, Categoria, Producto
+
+FALLOS = []
+
+
+def check(nombre, condicion, detalle=""):
+    marca = "PASS" if condicion else "FAIL"
+    print(f"[{marca}] {nombre} {detalle}")
+    if not condicion:
+        FALLOS.append(nombre)
+
+
+SENTENCIAS = []
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _contar(conn, cursor, statement, parameters, context, executemany):
+    SENTENCIAS.append(statement)
+
+
+def contar(funcion) -> int:
+    SENTENCIAS.clear()
+    funcion()
+    return len(SENTENCIAS)
+
+
+def sembrar(n):
+    """n usuarios (con rol y personal) y n categorías con 3 productos cada una."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    s = SessionLocal()
+    s.add(Rol(id=1, nombre="Administrador"))
+    s.add(Rol(id=2, nombre="Vendedor"))
+    for i in range(1, n + 1):
+        s.add(Personal(id=i, apellidos=f"Ap{i}", nombres=f"Nom{i}", tipo="vendedor"))
+        s.add(Usuario(id=i, nombre=f"u{i}", email=f"u{i}@x", password="x", activo=True,
+                      rol_id=1 if i == 1 else 2, personal_id=i))
+        s.add(Categoria(id=i, nombre=f"Cat{i}"))
+        for j in range(3):
+            s.add(Producto(nombre=f"Prod{i}-{j}", categoria_id=i))
+    s.commit()
+    s.close()
+
+
+def admin():
+    s = SessionLocal()
+    u = s.get(Usuario, 1, options=[joinedload(Usuario.rol), joinedload(Usuario.permisos),
+                                   joinedload(Usuario.personal)])
+    s.close()
+    return u
+
+
+app = QApplication.instance() or QApplication([])
+from gui.form_listado_usuarios import FormListadoUsuarios
+from gui.form_listado_productos import _consultar_listado
+
+medidas = {}
+for n in (3, 30):
+    sembrar(n)
+    form = FormListadoUsuarios(usuario=admin())
+    medidas[n] = {
+        "usuarios": contar(form.cargar_datos),
+        "productos": contar(_consultar_listado),
+    }
+    check(f"listado de usuarios completo ({n})", form.tabla.rowCount() == n
+          and form.tabla.item(n - 1, 4).text() == f"Ap{n}, Nom{n}"
+          and form.tabla.item(n - 1, 3).text() == "Vendedor")
+    categorias, productos = _consultar_listado()
+    check(f"listado de productos completo ({n})",
+          len(categorias) == n and sum(len(p) for p in productos.values()) == 3 * n)
+    form.deleteLater()
+
+for listado in ("usuarios", "productos"):
+    pocos, muchos = medidas[3][listado], medidas[30][listado]
+    check(f"{listado}: consultas constantes", pocos == muchos, f"{pocos} con 3 filas, {muchos} con 30")
+check("usuarios: una sola consulta", medidas[30]["usuarios"] == 1, str(medidas[30]["usuarios"]))
+check("productos: categorías + productos", medidas[30]["productos"] == 2, str(medidas[30]["productos"]))
+
+# --- Chequeos de permisos del menú: foto en memoria, sin consultas por chequeo ---
+from models import Permiso, UsuarioPermiso
+from utils.permisos import tiene_permiso, tiene_permiso_match, invalidar_permisos
+
+s = SessionLocal()
+s.add_all([Permiso(id=1, nombre="0010 (crear) clientes"), Permiso(id=2, nombre="0500 Gestión de cobros")])
+s.add(UsuarioPermiso(usuario_id=2, permiso_id=1))
+s.commit()
+vendedor = s.get(Usuario, 2, options=[joinedload(Usuario.rol), joinedload(Usuario.permisos)])
+s.close()
+
+
+def menu():
+    for _ in range(20):
+        tiene_permiso_match(vendedor, "cargar_cliente", "0010")
+        tiene_permiso_match(vendedor, "cobros", "0500")
+        tiene_permiso(vendedor, "0010 (crear) clientes")
+
+
+invalidar_permisos()
+primera = contar(menu)
+check("permisos: la foto se arma una vez", 0 < primera <= 3, str(primera))
+check("permisos: menú sin consultas", contar(menu) == 0)
+check("permisos: resultado", tiene_permiso_match(vendedor, "0010") and not tiene_permiso_match(vendedor, "0500"))
+
+s = SessionLocal()
+s.add(UsuarioPermiso(usuario_id=2, permiso_id=2))
+s.commit()
+s.close()
+check("permisos: cacheados hasta invalidar", not tiene_permiso_match(vendedor, "0500"))
+invalidar_permisos(2)
+check("permisos: invalidar relee la base", tiene_permiso_match(vendedor, "0500"))
+
+print()
+print("RESULTADO FINAL:", "TODO OK" if not FALLOS else f"FALLARON: {FALLOS}")
+raise SystemExit(1 if FALLOS else 0)
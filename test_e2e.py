@@ -2,6 +2,8 @@
 
 Corre contra el models.py REAL y un database.py idéntico al real
 salvo la URL (SQLite en vez de MySQL).
+El último bloque prueba el login y el desbloqueo del escritorio, que usan
+el mismo servicio de autenticación.
 """
 
 import hashlib
@@ -14,7 +16,7 @@ import pyotp
 from fastapi.testclient import TestClient
 
 from database import Session as SessionLocal, engine
-from models import Base, Usuario, Cliente, Venta, set_setting
+from models import Base, Usuario, Cliente, Venta, Cuota, Cobro, Producto, set_setting
 from utils.security import hash_password
 from api.main import app
 
@@ -251,6 +253,236 @@ r = client.delete(f"/clientes/{CID}", headers=H)
 check("delete sin ventas → 204", r.status_code == 204)
 check("delete inexistente → 404", client.delete("/clientes/99999", headers=H).status_code == 404)
 
+# ============ BLOQUE 6: simulaciones ============
+s = SessionLocal()
+s.add_all([Producto(id=1, nombre="Heladera", tem_base=0.07), Producto(id=2, nombre="Sin tasa")])
+s.commit(); s.close()
+check("simulación sin token → 401 o 403",
+      client.get("/simulaciones/productos/1?monto=100000").status_code in (401, 403))
+r = client.get("/simulaciones/productos/1?monto=100000&max_cuotas=12", headers=H)
+ops = r.json().get("opciones", []) if r.status_code == 200 else []
+check("simulación mensual", r.status_code == 200 and len(ops) == 12
+      and abs(ops[11]["cuota"] - 12590.2) < 0.01, str(ops[11:] if ops else r.text))
+r = client.get("/simulaciones/productos/1?monto=100000&plan=semanal", headers=H)
+check("simulación semanal (60 cuotas)", r.status_code == 200 and len(r.json()["opciones"]) == 60)
+s = SessionLocal(); s.get(Producto, 1).tem_base = 0.05; s.commit(); s.close()
+r = client.get("/simulaciones/productos/1?monto=100000&max_cuotas=12", headers=H)
+check("cambio de tem_base recalcula", r.status_code == 200
+      and abs(r.json()["opciones"][11]["cuota"] - 11282.54) < 0.01)
+check("plan desconocido → 422", client.get(
+    "/simulaciones/productos/1?monto=1000&plan=quincenal", headers=H).status_code == 422)
+check("producto sin tasa → 409", client.get(
+    "/simulaciones/productos/2?monto=1000", headers=H).status_code == 409)
+check("producto inexistente → 404", client.get(
+    "/simulaciones/productos/999?monto=1000", headers=H).status_code == 404)
+
+# ============ BLOQUE 7: cobros ============
+s = SessionLocal()
+s.add_all([Venta(id=50, monto=300, num_cuotas=3), Venta(id=51, monto=100, num_cuotas=1, anulada=True)])
+s.add_all([Cuota(venta_id=50, numero=n, monto_original=100.10, monto_pagado=0, pagada=False)
+           for n in (1, 2, 3)])
+s.commit(); s.close()
+r = client.post("/ventas/50/cobros", json={"monto": 150.2, "metodo": "Efectivo"}, headers=H)
+j = r.json() if r.status_code == 201 else {}
+check("cobro imputa en orden", r.status_code == 201
+      and [(i["numero"], i["monto"], i["pagada"]) for i in j["imputaciones"]]
+      == [(1, 100.1, True), (2, 50.1, False)], r.text)
+r = client.post("/ventas/50/cobros", json={"monto": 0.1}, headers=H)
+check("centavos exactos (0.1 sobre 50.1 → 50.2)", r.status_code == 201
+      and r.json()["imputaciones"][0]["monto"] == 0.1, r.text)
+r = client.post("/ventas/50/cobros", json={"monto": 200}, headers=H)
+j = r.json() if r.status_code == 201 else {}
+check("sobrante no imputado", r.status_code == 201 and j["aplicado"] == 150.0
+      and j["sobrante"] == 50.0 and j["venta_saldada"], r.text)
+s = SessionLocal()
+cuotas = s.query(Cuota).filter_by(venta_id=50).order_by(Cuota.numero).all()
+n_cobros = s.query(Cobro).filter_by(venta_id=50).count()
+s.close()
+check("cuotas saldadas con fecha de pago", all(c.pagada and c.fecha_pago and
+      float(c.monto_pagado) == 100.10 for c in cuotas))
+check("un cobro por cuota imputada", n_cobros == 5, str(n_cobros))
+check("venta anulada → 409", client.post("/ventas/51/cobros", json={"monto": 10}, headers=H).status_code == 409)
+check("venta inexistente → 404", client.post("/ventas/999/cobros", json={"monto": 10}, headers=H).status_code == 404)
+check("monto 0 → 422", client.post("/ventas/50/cobros", json={"monto": 0}, headers=H).status_code == 422)
+
+# ============ BLOQUE 8: caché del usuario autenticado ============
+from sqlalchemy import event
+from api.services import auth_service
+
+SENTENCIAS = []
+event.listen(engine, "before_cursor_execute", lambda *a: SENTENCIAS.append(a[2]))
+
+TOKEN_NORMAL = login("normal", "OtraClaveValida22").json()["access_token"]
+client.get("/auth/me", headers=auth(TOKEN_NORMAL))
+SENTENCIAS.clear()
+r = client.get("/auth/me", headers=auth(TOKEN_NORMAL))
+check("/me cacheado sin consultas", r.status_code == 200 and not SENTENCIAS, str(len(SENTENCIAS)))
+
+s = SessionLocal(); s.get(Usuario, 1).activo = False; s.commit(); s.close()
+check("baja fuera de la API: vale hasta el TTL",
+      client.get("/auth/me", headers=auth(TOKEN_NORMAL)).status_code == 200)
+auth_service.invalidar_usuario(1)
+check("baja + invalidar → 401", client.get("/auth/me", headers=auth(TOKEN_NORMAL)).status_code == 401)
+s = SessionLocal(); s.get(Usuario, 1).activo = True; s.commit(); s.close()
+check("reactivado → sin esperar al TTL", client.get("/auth/me", headers=auth(TOKEN_NORMAL)).status_code == 200)
+
+r = client.post("/auth/change-password", json={"new_password": "TerceraClave333"}, headers=auth(TOKEN_NORMAL))
+check("cambio de clave invalida la caché", r.status_code == 200
+      and 1 not in auth_service._cache_usuarios)
+client.get("/auth/me", headers=auth(TOKEN_NORMAL))
+s = SessionLocal(); s.get(Usuario, 1).activo = False; s.commit(); s.close()
+check("login de un usuario dado de baja invalida la caché",
+      login("normal", "TerceraClave333").status_code == 401
+      and client.get("/auth/me", headers=auth(TOKEN_NORMAL)).status_code == 401)
+
+# ============ BLOQUE 9: Argon2 fuera de la sesión y con concurrencia acotada ============
+import threading
+import time
+from passlib.hash import argon2 as argon2_base
+from utils import security
+
+s = SessionLocal(); u = s.get(Usuario, 1); u.activo = True
+u.password = argon2_base.using(rounds=1, memory_cost=8192, parallelism=1).hash("TerceraClave333" + security.PEPPER)
+s.commit(); s.close()
+
+from services import auth as servicio_auth
+
+EN_CURSO, MAXIMO, CONEXIONES = [0], [0], []
+_verificar = servicio_auth.verify_and_rehash
+
+
+def verificar_contando(pwd, stored):
+    with _cuenta:
+        EN_CURSO[0] += 1
+        MAXIMO[0] = max(MAXIMO[0], EN_CURSO[0])
+    CONEXIONES.append(engine.pool.checkedout())
+    time.sleep(0.05)
+    try:
+        return _verificar(pwd, stored)
+    finally:
+        with _cuenta:
+            EN_CURSO[0] -= 1
+
+
+_cuenta = threading.Lock()
+servicio_auth.verify_and_rehash = verificar_contando
+RESPUESTAS = []
+hilos = [threading.Thread(target=lambda: RESPUESTAS.append(login("normal", "TerceraClave333").status_code))
+         for _ in range(2 * security.ARGON2_CONCURRENCIA + 1)]
+for h in hilos: h.start()
+for h in hilos: h.join()
+check("ráfaga de logins ok", RESPUESTAS == [200] * len(hilos), str(RESPUESTAS))
+check("hashes a la vez ≤ ARGON2_CONCURRENCIA", 0 < MAXIMO[0] <= security.ARGON2_CONCURRENCIA, str(MAXIMO[0]))
+CONEXIONES.clear()
+login("normal", "TerceraClave333")
+servicio_auth.verify_and_rehash = _verificar
+check("sin conexiones tomadas durante el hash", CONEXIONES == [0], str(CONEXIONES))
+s = SessionLocal(); u = s.get(Usuario, 1)
+check("hash con parámetros viejos → rehecho al loguear", not security.needs_rehash(u.password)
+      and security.verify_password("TerceraClave333", u.password)[0]); s.close()
+check("login síncrono (escritorio) igual resultado",
+      auth_service.login("normal", "TerceraClave333").status == auth_service.STATUS_OK)
+
+# Fuerza bruta concurrente: todos pasan la fase 1 antes del 5to fallo; el
+# bloqueo se vuelve a mirar al registrar, así la clave correcta no lo levanta
+import asyncio
+
+
+async def rafaga_de_intentos():
+    intentos = [auth_service.login_async("normal", f"mala{i}") for i in range(LOCK_INTENTOS + 1)]
+    intentos.append(auth_service.login_async("normal", "TerceraClave333"))
+    return await asyncio.gather(*intentos)
+
+
+LOCK_INTENTOS = auth_service.LOCK_THRESHOLD
+estados = [r.status for r in asyncio.run(rafaga_de_intentos())]
+check("fuerza bruta concurrente → la correcta queda bloqueada", estados[-1] == auth_service.STATUS_LOCKED
+      and estados.count(auth_service.STATUS_LOCKED) >= 2, str(estados))
+check("fuerza bruta concurrente → cuenta bloqueada",
+      auth_service.login("normal", "TerceraClave333").status == auth_service.STATUS_LOCKED)
+s = SessionLocal(); u = s.get(Usuario, 1); u.lock_until = None; u.failed_attempts = 0; s.commit(); s.close()
+
+# ============ BLOQUE 10: login y desbloqueo del escritorio en segundo plano ============
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PySide6.QtWidgets import QApplication, QMessageBox
+from utils.carga_async import CargadorDatos
+
+qapp = QApplication.instance() or QApplication([])
+from gui import login_form
+from gui.lock_screen import LockScreenDialog, verificar_desbloqueo
+
+MENSAJES = []
+for tipo in ("information", "warning", "critical"):
+    setattr(QMessageBox, tipo, staticmethod(lambda *a, tipo=tipo: MENSAJES.append((tipo, a[1]))))
+
+resultado, usuario = login_form.autenticar("normal", "TerceraClave333")
+check("escritorio: mismos pasos que la API", resultado.status == auth_service.STATUS_OK
+      and usuario.id == 1 and usuario.permisos == [] and usuario.rol is None)
+check("escritorio: credencial mala", login_form.autenticar("normal", "mala")[0].status == auth_service.STATUS_INVALID)
+
+# El escritorio no carga la API (starlette, api.config) para iniciar sesión
+import subprocess
+import sys
+cargados = subprocess.run(
+    [sys.executable, "-c", "import sys, gui.login_form as f; f.autenticar('nadie', 'x');"
+                           " print(sorted(m for m in ('starlette', 'fastapi', 'api') if m in sys.modules))"],
+    capture_output=True, text=True, env={**os.environ, "QT_QPA_PLATFORM": "offscreen"},
+)
+check("escritorio: login sin importar la API", cargados.stdout.strip() == "[]", cargados.stdout + cargados.stderr)
+
+# Marcas de tiempo en UTC aunque el equipo tenga otra zona horaria
+_tz = os.environ.get("TZ")
+os.environ["TZ"] = "America/Argentina/Cordoba"; time.tzset()
+login_form.autenticar("normal", "TerceraClave333")
+s = SessionLocal(); u = s.get(Usuario, 1)
+check("last_login_at en UTC", abs(u.last_login_at - datetime.utcnow()) < timedelta(minutes=1), str(u.last_login_at))
+s.close()
+if _tz is None:
+    del os.environ["TZ"]
+else:
+    os.environ["TZ"] = _tz
+time.tzset()
+
+INGRESOS = []
+form = login_form.LoginForm(on_login_success=INGRESOS.append)
+form.user_input.setText("normal"); form.password_input.setText("TerceraClave333")
+form.verificar_credenciales()
+check("login: la GUI no espera al hash", not form.btn_login.isEnabled()
+      and form.btn_login.text() == "Verificando…" and not INGRESOS)
+CargadorDatos.esperar()
+check("login: resultado por señal", [u.id for u in INGRESOS] == [1] and form.btn_login.isEnabled(), str(MENSAJES))
+
+# Clave vencida: después del cambio el login sigue solo, con la clave nueva
+s = SessionLocal(); s.get(Usuario, 4).must_change_password = True; s.commit(); s.close()
+_dialogo = login_form.ChangePasswordDialog
+
+
+class CambioAceptado(_dialogo):
+    def exec(self):
+        self.new1.setText("ClaveEscritorio44"); self.new2.setText("ClaveEscritorio44")
+        self._save()
+        return self.result()
+
+
+login_form.ChangePasswordDialog = CambioAceptado
+INGRESOS.clear()
+form = login_form.LoginForm(on_login_success=INGRESOS.append)
+form.user_input.setText("vencido"); form.password_input.setText("NuevaClaveSegura1")
+form.verificar_credenciales()
+CargadorDatos.esperar(); CargadorDatos.esperar()
+login_form.ChangePasswordDialog = _dialogo
+check("cambio de clave → reintenta solo", [u.id for u in INGRESOS] == [4], str(MENSAJES))
+
+check("desbloqueo: clave correcta", verificar_desbloqueo(1, "TerceraClave333") is True)
+check("desbloqueo: clave mala", verificar_desbloqueo(1, "mala") is False)
+check("desbloqueo: inactivo → None", verificar_desbloqueo(5, "clave12345X") is None)
+dlg = LockScreenDialog(None, usuario)
+dlg.input.setText("TerceraClave333")
+dlg._try_unlock()
+check("desbloqueo: la GUI no espera al hash", not dlg.btn_unlock.isEnabled() and dlg.result() == 0)
+CargadorDatos.esperar()
+check("desbloqueo: acepta al terminar", dlg.result() == 1)
+
 print()
 print("RESULTADO:", "TODO OK ({} checks)".format(
     len([1 for _ in range(1)]) if FALLOS else 0) if FALLOS else "TODO OK")
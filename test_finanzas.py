@@ -0,0 +1,113 @@
+"""Prueba del motor financiero: utils/finanzas.py y su version en lote.
+
+No toca la base de datos. Compara el camino vectorizado contra las
+funciones escalares venta por venta.
+"""
+
+import numpy as np
+
+from utils.finanzas import (
+    calcular_cuota_frances, tasa_efectiva_por_plan, tasa_desde_cuota, tem_desde_tasa_periodo,
+)
+from utils.finanzas_lote import (
+    calcular_cuotas_frances, cronograma_frances_lote, tasas_efectivas_por_plan,
+    tasas_desde_cuotas, tems_desde_tasas_periodo,
+)
+from utils import cotizador
+
+FALLOS = []
+
+
+def check(nombre, condicion, detalle=""):
+    marca = "PASS" if condicion else "FAIL"
+    print(f"[{marca}] {nombre} {detalle}")
+    if not condicion:
+        FALLOS.append(nombre)
+
+
+# --- Cuotas en lote == escalares ---
+rng = np.random.default_rng(7)
+montos = rng.uniform(10_000, 2_000_000, 5000).round(2)
+tems = rng.choice([0.0, 0.05, 0.08, 0.12], 5000)
+planes = rng.choice(["mensual", "semanal", "diaria"], 5000)
+n_cuotas = rng.integers(1, 61, 5000)
+
+tasas = tasas_efectivas_por_plan(tems, planes)
+esperadas_tasas = np.array([tasa_efectiva_por_plan(t, p) for t, p in zip(tems, planes)])
+check("tasas por plan en lote", np.allclose(tasas, esperadas_tasas, rtol=1e-12, atol=0))
+
+cuotas = calcular_cuotas_frances(montos, tasas, n_cuotas)
+esperadas = np.array([calcular_cuota_frances(m, t, int(n))
+                      for m, t, n in zip(montos, tasas, n_cuotas)])
+check("cuotas en lote", np.allclose(cuotas, esperadas, rtol=1e-10, atol=1e-8))
+
+# --- Cronograma completo ---
+cr = cronograma_frances_lote(montos, tems, n_cuotas, planes=planes)
+check("forma de matrices", cr.saldo.shape == (5000, int(n_cuotas.max())))
+check("amortizacion suma el monto",
+      np.allclose(cr.amortizacion.sum(axis=1), montos, rtol=1e-9))
+check("cuota = interes + amortizacion",
+      np.allclose((cr.interes + cr.amortizacion)[cr.mascara],
+                  np.broadcast_to(cr.cuota[:, None], cr.mascara.shape)[cr.mascara]))
+check("saldo final en 0",
+      np.all(cr.saldo[np.arange(5000), n_cuotas - 1] == 0))
+check("relleno fuera de n_cuotas en 0",
+      not cr.saldo[~cr.mascara].any() and not cr.interes[~cr.mascara].any())
+
+# Caso chico verificado a mano: 1000 a 2 cuotas, 10% por periodo
+cr = cronograma_frances_lote([1000], [0.10], [2])
+filas = cr.cronograma(0)
+check("cronograma de una venta", len(filas) == 2
+      and abs(filas[0]["cuota"] - 576.1905) < 1e-4
+      and abs(filas[0]["interes"] - 100) < 1e-9
+      and abs(filas[1]["interes"] - 52.381) < 1e-3, str(filas[0]))
+
+# Validaciones
+for nombre, args in [("monto 0", ([0], [0.1], [3])), ("n 0", ([100], [0.1], [0]))]:
+    try:
+        calcular_cuotas_frances(*args)
+        check(f"rechaza {nombre}", False)
+    except ValueError:
+        check(f"rechaza {nombre}", True)
+try:
+    tasas_efectivas_por_plan([0.1], ["quincenal"])
+    check("rechaza plan desconocido", False)
+except ValueError:
+    check("rechaza plan desconocido", True)
+
+# --- Tasa implicita (inversa) ---
+recuperadas = tasas_desde_cuotas(montos, cuotas, n_cuotas)
+check("tasas recuperadas en lote", np.allclose(recuperadas, tasas, rtol=1e-8, atol=1e-10),
+      f"max err {np.nanmax(np.abs(recuperadas - tasas)):.2e}")
+check("TEM recuperada por plan",
+      np.allclose(tems_desde_tasas_periodo(recuperadas, planes), tems, atol=1e-9))
+escalares = [tasa_desde_cuota(m, c, int(n)) for m, c, n in zip(montos[:200], cuotas[:200], n_cuotas[:200])]
+check("tasa escalar == lote", np.allclose(escalares, recuperadas[:200], rtol=1e-9, atol=1e-12))
+check("TEM desde tasa diaria",
+      abs(tem_desde_tasa_periodo(tasa_efectiva_por_plan(0.08, "diaria"), "diaria") - 0.08) < 1e-12)
+check("cuota redondeada a centavos",
+      abs(tasa_desde_cuota(100000, round(calcular_cuota_frances(100000, 0.07, 12), 2), 12) - 0.07) < 1e-6)
+sin_sol = tasas_desde_cuotas([1000, 1000, -5], [50, 100, 10], [12, 10, 3])
+check("lote sin solucion → NaN", np.isnan(sin_sol[0]) and sin_sol[1] == 0 and np.isnan(sin_sol[2]))
+try:
+    tasa_desde_cuota(1000, 50, 12)
+    check("rechaza cuota insuficiente", False)
+except ValueError:
+    check("rechaza cuota insuficiente", True)
+
+# --- Matriz de cotizacion ---
+m = cotizador.matriz_para_tem(0.08)
+check("cotizador == escalar", all(
+    abs(m.cuota(p, 123456.78, n) - calcular_cuota_frances(123456.78, tasa_efectiva_por_plan(0.08, p), n)) < 1e-6
+    for p in ("mensual", "semanal", "diaria") for n in (1, 7, 60, 90)))
+check("cotizador cachea por TEM", cotizador.matriz_para_tem(0.08) is m)
+check("tabla de montos", m.tabla("mensual").shape == (len(cotizador.MONTOS_REFERENCIA), cotizador.N_CUOTAS_MAX))
+mp = cotizador.obtener_matriz(1, 0.08)
+check("matriz por producto", cotizador.obtener_matriz(1, 0.08) is mp)
+check("cambio de tem_base reconstruye", cotizador.obtener_matriz(1, 0.09).tem == 0.09)
+cotizador.invalidar(1)
+check("invalidar producto", 1 not in cotizador._por_producto)
+
+print()
+print("RESULTADO FINAL:", "TODO OK" if not FALLOS else f"FALLARON: {FALLOS}")
+raise SystemExit(1 if FALLOS else 0)
@@ -0,0 +1,152 @@
+"""Filtro y paginación del listado de ventas (ModeloVentas sobre ModeloPaginadoSQL)
+y búsqueda de clientes y garantes (listado y autocompletar de FormVenta).
+
+Verifica que el texto del buscador se traduzca al mismo criterio de antes
+(apellido, nombre, documento, producto y las palabras de estado: activa,
+finalizada, anulada, mora), que "%" y "_" se busquen como texto y que las
+páginas lleguen de a TAMANIO_PAGINA filas.
+
+Igual que test_e2e.py, corre contra el models.py REAL y un database.py
+idéntico al real salvo la URL (SQLite en vez de MySQL).
+"""
+
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from datetime import date
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QApplication
+
+from database import Session as SessionLocal, engine
+from models import Base, Cliente, Garante, Producto, Venta, Cuota
+from utils.carga_async import CargadorDatos, consultar_filas
+
+FALLOS = []
+
+
+def check(nombre, condicion, detalle=""):
+    marca = "PASS" if condicion else "FAIL"
+    print(f"[{marca}] {nombre} {detalle}")
+    if not condicion:
+        FALLOS.append(nombre)
+
+
+# --- Seed ---
+Base.metadata.drop_all(engine)
+Base.metadata.create_all(engine)
+s = SessionLocal()
+s.add_all([
+    Cliente(id=1, apellidos="Pérez", nombres="Juan", tipo_documento="DNI", nro_documento="30111222"),
+    Cliente(id=2, apellidos="Gómez", nombres="Ana", tipo_documento="DNI", nro_documento="28999000"),
+    Cliente(id=3, apellidos="Cien%", nombres="Real_Uno", tipo_documento="DNI", nro_documento="20000001"),
+    Producto(id=1, nombre="Heladera"),
+    Producto(id=2, nombre="Moto"),
+])
+s.add_all([
+    Venta(id=1, cliente_id=1, producto_id=1, fecha=date(2026, 1, 1), monto=100),                   # activa
+    Venta(id=2, cliente_id=1, producto_id=2, fecha=date(2026, 1, 2), monto=100, finalizada=True),  # finalizada
+    Venta(id=3, cliente_id=2, producto_id=1, fecha=date(2026, 1, 3), monto=100, anulada=True),     # anulada
+    Venta(id=4, cliente_id=2, producto_id=2, fecha=date(2026, 1, 4), monto=100),                   # activa con mora
+    Venta(id=5, cliente_id=3, producto_id=1, fecha=date(2026, 1, 5), monto=100),
+    Venta(id=6, cliente_id=3, producto_id=1, fecha=date(2026, 1, 6), monto=100),
+    Venta(id=7, cliente_id=3, producto_id=1, fecha=date(2026, 1, 7), monto=100),
+])
+s.add(Cuota(venta_id=4, numero=1, fecha_vencimiento=date(2026, 2, 1), fecha_pago=date(2026, 2, 10),
+            monto_original=100, monto_pagado=100, pagada=True))
+s.commit()
+s.close()
+
+app = QApplication.instance() or QApplication([])
+from gui.form_listado_ventas import ModeloVentas
+
+modelo = ModeloVentas({})
+
+
+def ids(texto):
+    return sorted(f[ModeloVentas.ID] for f in consultar_filas(modelo._consulta(texto)))
+
+
+# --- Filtro ---
+check("sin texto: todas", ids("") == [1, 2, 3, 4, 5, 6, 7])
+check("apellido", ids("Pérez") == [1, 2])
+check("documento", ids("2899") == [3, 4])
+check("producto", ids("Moto") == [2, 4])
+check("estado activa", ids("activa") == [1, 4, 5, 6, 7])
+check("estado finalizada (parcial)", ids("final") == [2])
+check("estado anulada", ids("anulada") == [3])
+check("mora: cualquier estado con mora", ids("mora") == [4])
+check("activa mora", ids("activa mora") == [4])
+check("anulada mora: ninguna", ids("anulada mora") == [])
+check("'%' se busca como texto", ids("n%") == [5, 6, 7], str(ids("n%")))
+check("'_' se busca como texto", ids("l_u") == [5, 6, 7] and ids("e_a") == [], str(ids("e_a")))
+check("'%' solo no es comodín", ids("%") == [5, 6, 7])
+
+# --- Paginación ---
+modelo.TAMANIO_PAGINA = 3
+recargas = []
+modelo.recargado.connect(lambda: recargas.append(modelo.rowCount()))
+modelo.recargar("")
+CargadorDatos.esperar()
+check("primera página", modelo.rowCount() == 3 and modelo.canFetchMore() and recargas == [3])
+modelo.fetchMore()
+CargadorDatos.esperar()
+check("segunda página", modelo.rowCount() == 6 and modelo.canFetchMore())
+modelo.fetchMore()
+CargadorDatos.esperar()
+check("última página incompleta", modelo.rowCount() == 7 and not modelo.canFetchMore())
+check("orden por id", [modelo.fila(i)[ModeloVentas.ID] for i in range(7)] == [1, 2, 3, 4, 5, 6, 7])
+
+modelo.sort(0, Qt.DescendingOrder)
+CargadorDatos.esperar()
+check("ordenar recarga desde la primera página",
+      modelo.rowCount() == 3 and [modelo.fila(i)[ModeloVentas.ID] for i in range(3)] == [7, 6, 5])
+modelo.set_filtro("anulada")
+CargadorDatos.esperar()
+check("filtrar recarga", modelo.rowCount() == 1 and not modelo.canFetchMore() and recargas[-1] == 1)
+
+# --- Listado de clientes: cada palabra va al apellido o al nombre, o al documento ---
+from gui.modelo_personas import ModeloPersonas
+from services.busquedas import sentencia_personas
+
+
+def ids_clientes(texto):
+    return [f[ModeloPersonas.ID] for f in consultar_filas(sentencia_personas(Cliente, texto))]
+
+
+check("clientes sin texto: por apellido", ids_clientes("") == [3, 2, 1])
+check("clientes por apellido", ids_clientes("Pér") == [1])
+check("clientes apellido y nombre", ids_clientes("Pérez Ju") == [1] and ids_clientes("Pérez, Ju") == [1])
+check("clientes nombre de otro apellido: ninguno", ids_clientes("Pérez Ana") == [])
+check("clientes sólo por nombre", ids_clientes("Juan") == [1] and ids_clientes("an") == [2])
+check("clientes nombre y apellido", ids_clientes("Juan Pér") == [1])
+check("clientes por documento", ids_clientes("2899") == [2])
+check("clientes '%' como texto", ids_clientes("Cien%") == [3] and ids_clientes("%") == [])
+
+# FormVenta: el autocompletar usa la misma consulta y acepta la opción ya elegida
+from gui.form_venta import buscar_personas
+
+elegida = buscar_personas(Cliente, "Pérez Ju", 20)
+check("autocompletar de cliente", [i for i, _ in elegida] == [1], str(elegida))
+check("autocompletar con la opción elegida", [i for i, _ in buscar_personas(Cliente, elegida[0][1], 20)] == [1])
+check("autocompletar sólo por nombre", [i for i, _ in buscar_personas(Cliente, "Ana", 20)] == [2])
+check("autocompletar nombre y apellido", [i for i, _ in buscar_personas(Cliente, "Ana Góm", 20)] == [2])
+
+with SessionLocal() as s:
+    s.add_all([Garante(id=1, apellidos="Sosa", nombres="Marta", tipo_documento="DNI", nro_documento="25000111"),
+               Garante(id=2, apellidos="Marta", nombres="Luis", tipo_documento="DNI", nro_documento="26000222")])
+    s.commit()
+garantes = buscar_personas(Garante, "Mar", 20)
+check("autocompletar de garante por apellido o nombre", [i for i, _ in garantes] == [2, 1], str(garantes))
+check("autocompletar de garante sólo por nombre", [i for i, _ in buscar_personas(Garante, "Luis", 20)] == [2])
+check("autocompletar límite", len(buscar_personas(Cliente, "", 2)) == 2)
+
+# migrate_indices no importa la GUI: su tamaño de página tiene que coincidir
+import migrate_indices
+
+check("EXPLAIN del listado con el tamaño de página real",
+      migrate_indices.TAMANIO_PAGINA_LISTADO == ModeloPersonas.TAMANIO_PAGINA)
+
+print()
+print("RESULTADO FINAL:", "TODO OK" if not FALLOS else f"FALLARON: {FALLOS}")
+raise SystemExit(1 if FALLOS else 0)
@@ -0,0 +1,374 @@
+"""Prueba de los servicios de back-office (services/).
+
+Igual que test_e2e.py, corre contra el models.py REAL y un database.py
+idéntico al real salvo la URL (SQLite en vez de MySQL).
+"""
+
+from datetime import date, timedelta
+
+from database import Session as SessionLocal, engine
+from models import Base, Venta, Cuota, Personal, Producto
+
+FALLOS = []
+
+
+def check(nombre, condicion, detalle=""):
+    marca = "PASS" if condicion else "FAIL"
+    print(f"[{marca}] {nombre} {detalle}")
+    if not condicion:
+        FALLOS.append(nombre)
+
+
+# --- Seed ---
+HOY = date(2026, 3, 10)   # martes
+Base.metadata.drop_all(engine)
+Base.metadata.create_all(engine)
+s = SessionLocal()
+s.add_all([
+    Personal(id=1, nombres="Cobrador Uno", tipo="cobrador"),
+    Personal(id=2, nombres="Cobrador Dos", tipo="cobrador"),
+    Producto(id=1, nombre="Heladera"),
+    Producto(id=2, nombre="Moto"),
+    Venta(id=1, fecha=HOY, monto=1000, num_cuotas=3, cobrador_id=1, producto_id=1),
+    Venta(id=2, fecha=HOY, monto=1000, num_cuotas=2, cobrador_id=2, producto_id=2),
+    Venta(id=3, fecha=HOY, monto=1000, num_cuotas=1, cobrador_id=1, producto_id=1, anulada=True),
+    Venta(id=4, fecha=HOY, monto=1000, num_cuotas=1, producto_id=2),
+])
+s.add_all([
+    # venta 1: una vencida con pago parcial, una de esta semana, una pagada
+    Cuota(venta_id=1, numero=1, fecha_vencimiento=HOY - timedelta(days=20),
+          monto_original=400, monto_pagado=100, pagada=False),
+    Cuota(venta_id=1, numero=2, fecha_vencimiento=HOY + timedelta(days=2),
+          monto_original=400, monto_pagado=0, pagada=False),
+    Cuota(venta_id=1, numero=3, fecha_vencimiento=HOY + timedelta(days=3),
+          monto_original=400, monto_pagado=400, pagada=True),
+    # venta 2: dos cuotas del mes que viene
+    Cuota(venta_id=2, numero=1, fecha_vencimiento=date(2026, 4, 6),
+          monto_original=550, monto_pagado=0, pagada=False),
+    Cuota(venta_id=2, numero=2, fecha_vencimiento=date(2026, 4, 13),
+          monto_original=550, monto_pagado=0, pagada=False),
+    # venta anulada: no cuenta
+    Cuota(venta_id=3, numero=1, fecha_vencimiento=HOY, monto_original=999, monto_pagado=0, pagada=False),
+    # venta sin cobrador
+    Cuota(venta_id=4, numero=1, fecha_vencimiento=HOY, monto_original=70, monto_pagado=None, pagada=None),
+])
+s.commit()
+s.close()
+
+# ============ Proyección de cobranza ============
+from services.proyeccion_cobranza import proyeccion_cobranza, cargar_cuotas_abiertas
+
+with engine.connect() as conn:
+    cuotas = cargar_cuotas_abiertas(conn)
+check("sólo cuotas abiertas de ventas vigentes", sorted(cuotas["cuota_id"]) == [1, 2, 4, 5, 7],
+      str(sorted(cuotas["cuota_id"])))
+
+df = proyeccion_cobranza("semana", hoy=HOY)
+semana_hoy = df[df["periodo"] == "2026-03-09"]
+uno = semana_hoy[semana_hoy["cobrador"] == "Cobrador Uno"]
+check("vencidas proyectadas a hoy", len(uno) == 1 and uno["saldo"].iloc[0] == 700
+      and uno["vencido"].iloc[0] == 300, uno.to_dict("records").__str__())
+check("sin cobrador → 'Sin asignar'",
+      (semana_hoy["cobrador"] == "Sin asignar").any())
+check("total proyectado", round(df["saldo"].sum(), 2) == 300 + 400 + 1100 + 70)
+
+df = proyeccion_cobranza("mes", por=(), hoy=HOY)
+check("por mes sin apertura", list(df["saldo"]) == [770.0, 1100.0], str(df.to_dict("records")))
+df = proyeccion_cobranza("dia", por=("producto",), hoy=HOY)
+check("por día y producto", set(df["producto"]) == {"Heladera", "Moto"} and len(df) == 5,
+      str(len(df)))
+
+# ============ Proceso nocturno de mora ============
+from models import set_setting
+from services.mora import actualizar_mora
+
+s = SessionLocal()
+s.add(Cuota(venta_id=1, numero=4, fecha_vencimiento=HOY - timedelta(days=40),
+            monto_original=200, monto_pagado=200, pagada=True, interes_mora=12.5, vencida=True))
+s.commit(); s.close()
+
+r = actualizar_mora(HOY, 0.001, tamanio_tramo=2)
+s = SessionLocal()
+c = {x.id: x for x in s.query(Cuota).all()}
+s.close()
+check("procesa por tramos", r["tramos"] == 4, str(r))
+check("impaga vencida marcada", c[1].vencida is True and float(c[1].interes_mora) == 6.0,
+      f"{c[1].vencida} {c[1].interes_mora}")   # 300 * 0.001 * 20 días
+check("impaga no vencida en 0", c[2].vencida is False and float(c[2].interes_mora) == 0)
+check("pagada: mora congelada, sin marca", c[8].vencida is False and float(c[8].interes_mora) == 12.5)
+check("venta anulada no devenga", c[6].vencida is False and float(c[6].interes_mora or 0) == 0)
+check("resumen", r["cuotas_vencidas"] == 1 and r["mora_total"] == 6.0)
+r2 = actualizar_mora(HOY, 0.001)
+check("idempotente", r2["cuotas_vencidas"] == 1 and r2["mora_total"] == 6.0)
+
+s = SessionLocal(); set_setting(s, "tasa_mora_diaria", "0.002"); s.close()
+r = actualizar_mora(HOY + timedelta(days=10))
+# 300*0.002*30 + 400*0.002*8 + 70*0.002*10
+check("tasa desde system_settings", r["tasa_diaria"] == 0.002 and r["mora_total"] == 25.8,
+      str(r["mora_total"]))
+
+# ============ Caché de ajustes (system_settings) ============
+from sqlalchemy import event as sa_event
+from models import get_setting, get_settings
+
+lecturas = []
+_contar_ajustes = lambda *a: lecturas.append(a[2]) if "system_settings" in a[2] else None
+sa_event.listen(engine, "before_cursor_execute", _contar_ajustes)
+s = SessionLocal()
+set_setting(s, "tema_activo", "verde")
+lecturas.clear()
+check("ajustes: valor leído", get_setting(s, "tema_activo") == "verde")
+check("ajustes: varios a la vez", get_settings(s, ["tema_activo", "tasa_mora_diaria", "no_existe"], "x")
+      == {"tema_activo": "verde", "tasa_mora_diaria": "0.002", "no_existe": "x"})
+get_setting(s, "require_2fa_global", "0")
+check("ajustes: una sola consulta", len(lecturas) == 1, str(len(lecturas)))
+set_setting(s, "tema_activo", "azul")
+check("ajustes: set_setting invalida", get_setting(s, "tema_activo") == "azul")
+s.close()
+sa_event.remove(engine, "before_cursor_execute", _contar_ajustes)
+
+# ============ Reportes de consultas / exportación a Excel ============
+import os
+import tempfile
+from openpyxl import load_workbook
+from utils.reportes_consultas import CriterioConsulta, iterar_filas, cargar_filas, vista_previa
+from utils import exportar_excel as xl
+
+crit = CriterioConsulta(tipo="Ventas por fecha", inicio=HOY, fin=HOY)
+filas = cargar_filas(crit)
+check("ventas del período como tuplas", len(filas) == 4 and filas[0][2] == "Heladera", str(filas[:1]))
+check("estado calculado", [f[6] for f in filas].count("Anulada") == 1)
+check("streaming en lotes = carga completa", list(iterar_filas(crit, lote=1)) == filas)
+crit_prod = CriterioConsulta(tipo="Ventas por producto", inicio=HOY, fin=HOY, producto_id=2)
+check("filtro por producto", len(cargar_filas(crit_prod)) == 2)
+vista = vista_previa(crit, limite=2)
+check("pantalla: sólo las primeras filas, totales del reporte entero",
+      vista.filas == filas[:2] and vista.total_filas == 4 and vista.recortada
+      and vista.totales[3] == sum(f[3] for f in filas) and vista.totales[1] is None, str(vista.totales))
+check("pantalla: sin recorte", not vista_previa(crit).recortada)
+
+resumen = cargar_filas(CriterioConsulta(tipo="Ventas por fecha", inicio=HOY, fin=HOY, agrupar="Producto"))
+por_producto = {f[0]: f for f in resumen}
+check("resumen por producto (GROUP BY en la base)", sorted(por_producto) == ["Heladera", "Moto"], str(resumen))
+check("resumen: cantidad y monto", por_producto["Heladera"][1:3] == (2, 2000.0))
+check("resumen: cobrado vs pendiente (anulada sin pendiente)",
+      por_producto["Heladera"][4:] == (700.0, 700.0) and por_producto["Moto"][4:] == (0.0, 1170.0),
+      f"{por_producto['Heladera']} {por_producto['Moto']}")
+resumen = cargar_filas(CriterioConsulta(tipo="Ventas por fecha", inicio=HOY, fin=HOY, agrupar="Personal"))
+check("resumen por personal: ventas sin vendedor",
+      resumen == [("Sin asignar", 4, 4000.0, 0.0, 700.0, 1870.0)], str(resumen))
+
+xl.MUESTRA_ANCHOS = 2   # fuerza que parte de las filas se escriba después de la muestra
+columnas = [xl.ColumnaExcel(t, 6) for t in crit.columnas]
+columnas[3] = xl.ColumnaExcel("Monto", 6, xl.FORMATO_IMPORTE, sumar=True)
+path = os.path.join(tempfile.mkdtemp(), "ventas.xlsx")
+n = xl.exportar_excel(path, columnas, iterar_filas(crit), titulo="Reporte de Ventas",
+                      subtitulo=crit.subtitulo(), etiqueta_total="TOTALES:", columna_etiqueta=2)
+ws = load_workbook(path).active
+check("excel: filas exportadas", n == 4 and ws.max_row == 3 + 4 + 1, f"{n} {ws.max_row}")
+check("excel: total acumulado", ws.cell(row=ws.max_row, column=4).value == 4000)
+check("excel: encabezado congelado", ws.freeze_panes == "A4")
+check("excel: ancho según contenido", ws.column_dimensions["C"].width == len("Heladera") + 2)
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from utils.exportar_pdf import ColumnaPDF, MetricaFuente, importe, exportar_pdf
+
+m = MetricaFuente("Helvetica", 7)
+check("pdf: métrica por carácter = stringWidth",
+      abs(m.ancho("Pérez, Juan $ 1,234.50") - stringWidth("Pérez, Juan $ 1,234.50", "Helvetica", 7)) < 1e-6)
+recortado = m.recortar("Rodríguez Fernández, María Guadalupe", 60)
+check("pdf: texto recortado entra en la columna", recortado.endswith("…") and m.ancho(recortado) <= 60, recortado)
+columnas_pdf = [ColumnaPDF(t, 10) for t in crit.columnas]
+columnas_pdf[3] = ColumnaPDF("Monto", 10, "right", sumar=True, formato=importe)
+path = os.path.join(tempfile.mkdtemp(), "ventas.pdf")
+n = exportar_pdf(path, columnas_pdf, (filas[i % 4] for i in range(300)), titulo="Reporte de Ventas",
+                 subtitulo=crit.subtitulo(), etiqueta_total="TOTALES:", columna_etiqueta=2)
+with open(path, "rb") as fh:
+    contenido = fh.read()
+check("pdf: filas dibujadas en varias páginas", n == 300 and contenido.count(b"/Type /Page\n") > 1, str(n))
+
+# ============ Alta de venta con cronograma en lote ============
+from dateutil.relativedelta import relativedelta
+from services.ventas import fechas_vencimiento, crear_venta, VentaInvalida
+
+inicio = date(2026, 1, 31)
+for plan, paso in (("mensual", "months"), ("semanal", "weeks"), ("diaria", "days")):
+    esperado = [inicio + relativedelta(**{paso: i}) for i in range(400)]
+    check(f"vencimientos {plan} = relativedelta", fechas_vencimiento(inicio, plan, 400) == esperado)
+check("vencimientos: fin de mes", fechas_vencimiento(inicio, "mensual", 3)
+      == [date(2026, 1, 31), date(2026, 2, 28), date(2026, 3, 31)])
+try:
+    fechas_vencimiento(inicio, "quincenal", 3)
+    check("plan desconocido rechazado", False)
+except VentaInvalida:
+    check("plan desconocido rechazado", True)
+
+vid = crear_venta(fecha=HOY, fecha_inicio_pago=date(2026, 4, 1), monto=1000, num_cuotas=120,
+                  valor_cuota=15.5, plan_pago="diaria", producto_id=1, anulada=False)
+s = SessionLocal()
+cuotas = s.query(Cuota).filter_by(venta_id=vid).order_by(Cuota.numero).all()
+check("crear_venta: cuotas insertadas", len(cuotas) == 120 and cuotas[-1].numero == 120)
+check("crear_venta: vencimientos diarios",
+      cuotas[0].fecha_vencimiento == date(2026, 4, 1) and cuotas[-1].fecha_vencimiento == date(2026, 7, 29))
+check("crear_venta: cuotas impagas",
+      all(float(c.monto_original) == 15.5 and float(c.monto_pagado) == 0 and not c.pagada for c in cuotas))
+s.close()
+
+# ============ Versión del esquema y migraciones ============
+from sqlalchemy import create_engine, event, text, inspect as sa_inspect
+from migraciones import asegurar_esquema, version_actual, ErrorMigracion, _bloquear
+
+motor = create_engine("sqlite://")
+llamadas = []
+# La 2 borra datos, como el DROP COLUMN dni real
+fake = [(n, f"paso {n}", lambda conn, n=n: llamadas.append(n), n == 2) for n in (1, 2, 3)]
+
+check("base vacía: create_all y marca sin migrar", asegurar_esquema(motor, fake) == [] and not llamadas)
+with motor.connect() as conn:
+    check("base vacía: versión = última", version_actual(conn) == 3)
+
+sentencias = []
+event.listen(motor, "before_cursor_execute", lambda *a: sentencias.append(a[2]))
+check("al día: sin migraciones", asegurar_esquema(motor, fake) == [])
+check("al día: una sola consulta", len(sentencias) == 1, str(sentencias))
+
+with motor.begin() as conn:
+    conn.execute(text("UPDATE schema_version SET version = 1"))
+
+
+def falla_migracion(*args, **kwargs):
+    """Mensaje de ErrorMigracion, o None si asegurar_esquema no falló."""
+    try:
+        asegurar_esquema(*args, **kwargs)
+    except ErrorMigracion as e:
+        return str(e)
+    return None
+
+
+# Las migraciones reales son para MySQL: en otro motor no se empieza a migrar
+mensaje = falla_migracion(motor, fake)
+check("pendientes en otro motor: error claro", mensaje is not None and "sqlite" in mensaje
+      and "versión 1" in mensaje and not llamadas, str(mensaje))
+# Al arrancar (sin confirmar) una migración destructiva pendiente no corre
+mensaje = falla_migracion(motor, fake, dialectos=("sqlite",))
+with motor.connect() as conn:
+    check("destructiva pendiente al arrancar: error sin tocar la base", mensaje is not None
+          and "python migraciones.py" in mensaje and "paso 2" in mensaje and not llamadas
+          and version_actual(conn) == 1, str(mensaje))
+mensaje = falla_migracion(motor, fake, dialectos=("sqlite",), confirmar=lambda d: False)
+check("destructiva no confirmada: cancela", mensaje is not None and "cancelada" in mensaje
+      and not llamadas, str(mensaje))
+confirmadas = []
+check("pendientes: aplica sólo las nuevas",
+      asegurar_esquema(motor, fake, dialectos=("sqlite",),
+                       confirmar=lambda d: confirmadas.extend(m.numero for m in d) or True) == [2, 3]
+      and llamadas == [2, 3] and confirmadas == [2])
+with motor.connect() as conn:
+    check("pendientes: versión actualizada", version_actual(conn) == 3)
+
+llamadas.clear()
+with motor.begin() as conn:
+    conn.execute(text("DROP TABLE schema_version"))
+mensaje = falla_migracion(motor, fake)
+with motor.connect() as conn:
+    check("base sin versionar en otro motor: error claro sin tocarla", mensaje is not None
+          and "sin versionar" in mensaje and not llamadas and version_actual(conn) is None, str(mensaje))
+# Sin columna dni ya pasó la 1 y la 2: se marca así y sigue desde la 3
+check("base sin versionar y sin dni: sigue desde la versión deducida",
+      asegurar_esquema(motor, fake, dialectos=("sqlite",)) == [3] and llamadas == [3])
+with motor.connect() as conn:
+    check("base sin versionar y sin dni: versión al día", version_actual(conn) == 3)
+
+# Con la columna dni todavía ahí, el DROP queda pendiente: al arrancar se rechaza
+llamadas.clear()
+motor_dni = create_engine("sqlite://")
+with motor_dni.begin() as conn:
+    conn.execute(text("CREATE TABLE clientes (id INTEGER PRIMARY KEY, dni VARCHAR(20))"))
+mensaje = falla_migracion(motor_dni, fake, dialectos=("sqlite",))
+with motor_dni.connect() as conn:
+    check("base sin versionar con dni: error sin crear tablas ni migrar", mensaje is not None
+          and "python migraciones.py" in mensaje and not llamadas
+          and sa_inspect(conn).get_table_names() == ["clientes"], str(mensaje))
+
+
+class ConexionMySQL:
+    """Lo mínimo de una conexión MySQL para _bloquear: GET_LOCK devuelve 'resultado'."""
+
+    class dialect:
+        name = "mysql"
+
+    def __init__(self, resultado):
+        self.resultado = resultado
+
+    def execute(self, *args):
+        return self
+
+    def scalar(self):
+        return self.resultado
+
+
+def falla_lock(resultado):
+    try:
+        _bloquear(ConexionMySQL(resultado))
+    except ErrorMigracion as e:
+        return str(e)
+    return None
+
+
+check("GET_LOCK = 1: sigue", falla_lock(1) is None)
+check("GET_LOCK = 0 (espera agotada): aborta", "Otra PC" in (falla_lock(0) or ""))
+check("GET_LOCK = NULL (error): aborta", falla_lock(None) is not None)
+
+# ============ Arranque: librerías pesadas a demanda ============
+import subprocess
+import sys
+
+salida = subprocess.run(
+    [sys.executable, "-c",
+     "import os; os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen'); import sys; "
+     "import gui.login_form, gui.ventana_principal, gui.form_consultas, gui.form_venta; "
+     "print(' '.join(m for m in ('openpyxl', 'reportlab', 'docx', 'pandas', 'numpy', 'qrcode') "
+     "if m in sys.modules))"],
+    capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+)
+check("arranque sin librerías pesadas", salida.returncode == 0 and salida.stdout.strip() == "",
+      salida.stdout.strip() or salida.stderr.strip()[-200:])
+
+# ============ Índices: EXPLAIN de las sentencias reales ============
+from sqlalchemy.dialects import mysql
+import migrate_indices
+
+
+# MySQL (InnoDB) indexa solo cada clave foránea; SQLite no: se replica para el plan
+with engine.begin() as conn:
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS fk_ventas_cliente ON ventas (cliente_id)")
+
+
+def plan_sqlite(stmt) -> str:
+    """Plan de SQLite; con LIKE sensible a mayúsculas usa índices por prefijo, como MySQL."""
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA case_sensitive_like = ON")
+        sql = migrate_indices.sql_de(stmt, conn.dialect)
+        return " | ".join(r[3] for r in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql))
+
+
+salida = subprocess.run(
+    [sys.executable, "-c",
+     "import sys, migrate_indices; migrate_indices.consultas(); "
+     "print(' '.join(m for m in sys.modules if m == 'PySide6' or m.startswith('gui')))"],
+    capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+)
+check("migrate_indices arma las consultas sin cargar Qt ni la GUI",
+      salida.returncode == 0 and salida.stdout.strip() == "",
+      salida.stdout.strip() or salida.stderr.strip()[-200:])
+
+for descripcion, tabla, indice, stmt in migrate_indices.consultas():
+    sql_mysql = migrate_indices.sql_de(stmt, mysql.dialect())
+    plan = plan_sqlite(stmt)
+    usa = indice if indice != "PRIMARY" else "INTEGER PRIMARY KEY"   # así lo nombra SQLite
+    check(f"índice: {descripcion}", tabla in sql_mysql and f"SEARCH {tabla} USING" in plan and usa in plan
+          and f"SCAN {tabla}" not in plan, plan)
+
+print()
+print("RESULTADO FINAL:", "TODO OK" if not FALLOS else f"FALLARON: {FALLOS}")
+raise SystemExit(1 if FALLOS else 0)
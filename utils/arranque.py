@@ -0,0 +1,56 @@
+"""
+utils/arranque.py
+
+Medición del tiempo de arranque del escritorio.
+
+main.py importa este módulo antes que cualquier otro y marca cada etapa
+(imports, base de datos, login visible, ventana principal visible). Las
+marcas se imprimen y se agregan a logs/arranque.csv (o a ARRANQUE_LOG)
+con fecha y nombre del equipo, para seguir el arranque en frío de las PCs
+de caja a lo largo del tiempo.
+"""
+
+import csv
+import os
+import platform
+import time
+from datetime import datetime
+
+# Referencia de todas las marcas: el momento en que main.py importó este módulo
+_T0 = time.perf_counter()
+
+RUTA_LOG = os.getenv("ARRANQUE_LOG") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs", "arranque.csv"
+)
+
+_marcas = []
+
+
+def marcar(etapa: str, desde: float | None = None) -> int:
+    """
+    Registra cuántos milisegundos pasaron hasta ahora, contados desde el
+    arranque o desde 'desde' (un time.perf_counter() previo). Devuelve los ms.
+    """
+    ms = round((time.perf_counter() - (_T0 if desde is None else desde)) * 1000)
+    _marcas.append((etapa, ms))
+    print(f"[arranque] {etapa}: {ms} ms")
+    return ms
+
+
+def guardar():
+    """Agrega las marcas pendientes al CSV. Si no se puede escribir, no interrumpe el arranque."""
+    if not _marcas:
+        return
+    fecha = datetime.now().isoformat(timespec="seconds")
+    equipo = platform.node()
+    try:
+        os.makedirs(os.path.dirname(RUTA_LOG), exist_ok=True)
+        nuevo = not os.path.exists(RUTA_LOG)
+        with open(RUTA_LOG, "a", newline="", encoding="utf-8") as fh:
+            w = csv.writer(fh)
+            if nuevo:
+                w.writerow(["fecha", "equipo", "etapa", "ms"])
+            w.writerows([fecha, equipo, etapa, ms] for etapa, ms in _marcas)
+    except OSError as e:
+        print(f"[arranque] no se pudo guardar la medición: {e}")
+    _marcas.clear()
@@ -0,0 +1,175 @@
+"""
+utils/carga_async.py
+
+Carga de datos en segundo plano para los formularios de escritorio.
+
+Las consultas corren en un QThreadPool compartido, fuera del hilo de la
+interfaz, y el resultado vuelve al hilo de la GUI por una señal encolada:
+los callbacks siempre se ejecutan en el hilo de la GUI y pueden tocar widgets.
+
+Las funciones de carga deben devolver datos planos (tuplas, listas, dicts),
+nunca objetos ORM: la sesión se abre y se cierra dentro del hilo de trabajo.
+consultar_filas(stmt) resuelve el caso común.
+
+Uso desde un formulario:
+
+    self._cargador = CargadorDatos(self)
+    stmt = select(Cliente.id, Cliente.apellidos, ...)
+    self._cargador.ejecutar(consultar_filas, stmt,
+                            al_terminar=self._mostrar, al_fallar=self._error_carga)
+
+Cancelación: lanzar otra tarea con la misma clave cancela la anterior, y al
+destruirse el widget dueño (por ejemplo, al navegar a otro formulario) se
+cancelan todas. Una tarea que ya empezó termina su consulta, pero su
+resultado se descarta y los callbacks no se llaman.
+"""
+
+import traceback
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QCoreApplication, Signal, Slot
+
+from database import get_session
+
+# Conexiones simultáneas que la GUI puede ocupar (el pool de SQLAlchemy es de 5)
+MAX_HILOS = 4
+
+_pool = None
+_despachador = None
+
+
+def consultar_filas(stmt) -> list:
+    """Ejecuta un select() en una sesión propia y devuelve las filas como tuplas."""
+    with get_session() as session:
+        return [tuple(r) for r in session.execute(stmt).all()]
+
+
+class TareaCarga:
+    """Referencia a una carga lanzada; permite cancelarla."""
+
+    def __init__(self, pendientes: dict, clave, al_terminar, al_fallar):
+        self._pendientes = pendientes
+        self._clave = clave
+        self._al_terminar = al_terminar
+        self._al_fallar = al_fallar
+        self._cancelada = False
+
+    @property
+    def cancelada(self) -> bool:
+        return self._cancelada
+
+    def cancelar(self):
+        self._cancelada = True
+        if self._pendientes.get(self._clave) is self:
+            del self._pendientes[self._clave]
+
+    def _entregar(self, resultado, error):
+        # Corre en el hilo de la GUI (ver _Despachador)
+        if self._cancelada:
+            return
+        self.cancelar()   # ya no está pendiente
+        if error is None:
+            self._al_terminar(resultado)
+        elif self._al_fallar is not None:
+            self._al_fallar(error)
+        else:
+            traceback.print_exception(error)
+
+
+class _Despachador(QObject):
+    """Vive en el hilo de la GUI; recibe los resultados de los hilos de trabajo."""
+    listo = Signal(object, object, object)   # tarea, resultado, error
+
+    def __init__(self):
+        super().__init__()
+        self.listo.connect(self._entregar)
+
+    @Slot(object, object, object)
+    def _entregar(self, tarea, resultado, error):
+        tarea._entregar(resultado, error)
+
+
+class _Trabajo(QRunnable):
+    def __init__(self, tarea, funcion, args, kwargs):
+        super().__init__()
+        self._tarea = tarea
+        self._funcion = funcion
+        self._args = args
+        self._kwargs = kwargs
+
+    def run(self):
+        if self._tarea.cancelada:
+            return
+        try:
+            resultado, error = self._funcion(*self._args, **self._kwargs), None
+        except Exception as e:
+            resultado, error = None, e
+        if not self._tarea.cancelada:
+            _despachador.listo.emit(self._tarea, resultado, error)
+
+
+def _iniciar():
+    """Crea el pool y el despachador (desde el hilo de la GUI, la primera vez)."""
+    global _pool, _despachador
+    if _pool is None:
+        _despachador = _Despachador()
+        _pool = QThreadPool()
+        _pool.setMaxThreadCount(MAX_HILOS)
+    return _pool
+
+
+def _cancelar_todas(pendientes: dict):
+    for tarea in list(pendientes.values()):
+        tarea.cancelar()
+
+
+class CargadorDatos(QObject):
+    """
+    Lanza cargas en el pool compartido en nombre de un widget.
+
+    Se crea como hijo del widget: cuando el widget se destruye, las tareas
+    pendientes se cancelan y sus callbacks ya no se llaman.
+    """
+
+    def __init__(self, parent: QObject):
+        super().__init__(parent)
+        self._pendientes = {}
+        pendientes = self._pendientes   # sin referencia a self: se usa durante la destrucción
+        self.destroyed.connect(lambda *_: _cancelar_todas(pendientes))
+
+    def ejecutar(self, funcion, *args, al_terminar, al_fallar=None, clave=None, **kwargs) -> TareaCarga:
+        """
+        Corre funcion(*args, **kwargs) en segundo plano.
+
+        al_terminar(resultado) / al_fallar(excepción) se llaman en el hilo de
+        la GUI. Si ya había una tarea pendiente con la misma clave, se cancela.
+        """
+        anterior = self._pendientes.get(clave)
+        if anterior is not None:
+            anterior.cancelar()
+        tarea = TareaCarga(self._pendientes, clave, al_terminar, al_fallar)
+        self._pendientes[clave] = tarea
+        _iniciar().start(_Trabajo(tarea, funcion, args, kwargs))
+        return tarea
+
+    def cancelar(self, clave=None):
+        """Cancela la tarea pendiente de esa clave."""
+        tarea = self._pendientes.get(clave)
+        if tarea is not None:
+            tarea.cancelar()
+
+    def cancelar_todas(self):
+        _cancelar_todas(self._pendientes)
+
+    def ocupado(self, clave=None) -> bool:
+        return clave in self._pendientes
+
+    @staticmethod
+    def esperar(timeout_ms: int = -1):
+        """
+        Bloquea hasta que el pool termine y entrega los resultados encolados.
+        Pensado para scripts y pruebas, no para usar desde la interfaz.
+        """
+        if _pool is None:
+            return
+        _pool.waitForDone(timeout_ms)
+        QCoreApplication.processEvents()
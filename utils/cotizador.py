@@ -0,0 +1,115 @@
+"""
+utils/cotizador.py
+
+Matrices de cotizacion precalculadas (sistema frances) por TEM y plan de pago.
+
+La cuota francesa es lineal en el monto: cuota = monto * factor(i, n).
+Por eso alcanza con precalcular, para cada plan, el factor de 1 a
+N_CUOTAS_MAX cuotas; cualquier monto (o tabla de montos) se cotiza con
+una multiplicacion, sin volver a calcular potencias fraccionarias.
+
+Las matrices se guardan:
+  - por TEM (LRU), para la TEM que se este usando en FormVenta, y
+  - por producto, asociadas a su tem_base. Si el tem_base cambia la
+    matriz se reconstruye sola en la siguiente consulta; ademas
+    FormProducto llama a invalidar() al guardar.
+
+Tasas como decimales (0.10 = 10%), igual que utils/finanzas.py.
+"""
+
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from utils.finanzas import DIAS_POR_PLAN, calcular_cuota_frances, tasa_efectiva_por_plan
+from utils.finanzas_lote import calcular_cuotas_frances
+
+N_CUOTAS_MAX = 60
+
+# Montos de referencia para las tablas rapidas de mostrador
+MONTOS_REFERENCIA = (
+    50_000, 100_000, 150_000, 200_000, 300_000, 500_000, 750_000, 1_000_000,
+)
+
+
+@dataclass(frozen=True)
+class MatrizCotizacion:
+    """
+    Factores de cuota para una TEM: factores[plan][n - 1] es la cuota de
+    un prestamo de $1 a n cuotas en ese plan.
+    """
+    tem: float
+    factores: dict
+
+    def factor(self, plan: str, n_cuotas: int) -> float:
+        if n_cuotas <= 0:
+            raise ValueError("La cantidad de cuotas debe ser mayor que 0.")
+        if n_cuotas > N_CUOTAS_MAX:
+            # Fuera de la matriz: calculo puntual (no se cachea)
+            return calcular_cuota_frances(1.0, tasa_efectiva_por_plan(self.tem, plan), n_cuotas)
+        try:
+            return float(self.factores[plan][n_cuotas - 1])
+        except KeyError:
+            raise ValueError(f"Plan de pago desconocido: {plan!r}") from None
+
+    def cuota(self, plan: str, monto: float, n_cuotas: int) -> float:
+        """Equivale a calcular_cuota_frances(monto, tasa_efectiva_por_plan(tem, plan), n)."""
+        if monto <= 0:
+            raise ValueError("El monto debe ser mayor que 0.")
+        return monto * self.factor(plan, n_cuotas)
+
+    def tabla(self, plan: str, montos=MONTOS_REFERENCIA) -> np.ndarray:
+        """Cuotas para cada monto (filas) y cada cantidad de cuotas 1..N_CUOTAS_MAX (columnas)."""
+        if plan not in self.factores:
+            raise ValueError(f"Plan de pago desconocido: {plan!r}")
+        return np.asarray(montos, dtype=float)[:, None] * self.factores[plan][None, :]
+
+
+def _construir(tem: float) -> MatrizCotizacion:
+    n = np.arange(1, N_CUOTAS_MAX + 1)
+    factores = {}
+    for plan in DIAS_POR_PLAN:
+        factores[plan] = calcular_cuotas_frances(1.0, tasa_efectiva_por_plan(tem, plan), n)
+        factores[plan].setflags(write=False)
+    return MatrizCotizacion(tem=tem, factores=factores)
+
+
+@lru_cache(maxsize=64)
+def _matriz_tem(tem_redondeada: float) -> MatrizCotizacion:
+    return _construir(tem_redondeada)
+
+
+def matriz_para_tem(tem: float) -> MatrizCotizacion:
+    """Matriz de cotizacion para una TEM cualquiera (cache LRU por valor)."""
+    # Redondeo para que 0.07 y 0.07000000001 compartan entrada
+    return _matriz_tem(round(float(tem), 10))
+
+
+_por_producto: dict = {}
+_lock = threading.Lock()
+
+
+def obtener_matriz(producto_id: int, tem_base: float) -> MatrizCotizacion:
+    """
+    Matriz de cotizacion de un producto. Si su tem_base cambio desde la
+    ultima consulta, se reemplaza por la de la tasa nueva.
+    """
+    tem = round(float(tem_base), 10)
+    with _lock:
+        matriz = _por_producto.get(producto_id)
+        if matriz is None or matriz.tem != tem:
+            matriz = matriz_para_tem(tem)
+            _por_producto[producto_id] = matriz
+        return matriz
+
+
+def invalidar(producto_id: int = None) -> None:
+    """Descarta la matriz de un producto (o de todos si producto_id es None)."""
+    with _lock:
+        if producto_id is None:
+            _por_producto.clear()
+            _matriz_tem.cache_clear()
+        else:
+            _por_producto.pop(producto_id, None)
@@ -0,0 +1,145 @@
+"""
+utils/exportar_excel.py
+
+Exportación de reportes a Excel en streaming (openpyxl write-only).
+
+Un Workbook normal guarda cada celda como objeto en memoria y el
+autoajuste de anchos recorría la hoja entera después de escribirla. Acá
+las filas se escriben a medida que llegan del cursor y no quedan en memoria.
+
+En modo write-only los anchos de columna y la fila congelada deben fijarse
+antes de la primera fila. Por eso se retienen las primeras MUESTRA_ANCHOS
+filas, se calculan los anchos con ellas (y el encabezado) y recién ahí se
+vuelca todo. Los totales se acumulan al pasar.
+"""
+
+from dataclasses import dataclass
+from itertools import chain, islice
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.page import PageMargins
+from openpyxl.worksheet.worksheet import Worksheet
+
+MUESTRA_ANCHOS = 500
+ANCHO_MAX = 45
+FORMATO_IMPORTE = '#,##0.00'
+
+
+@dataclass(frozen=True)
+class ColumnaExcel:
+    titulo: str
+    ancho_min: int = 10
+    formato: str | None = None             # number_format de las celdas de datos
+    alineacion: str | None = None          # 'left' / 'right' / 'center'
+    indent: int = 0
+    titulo_centrado: bool = False
+    sumar: bool = False                    # acumular en la fila de totales
+
+
+def _celda(ws, valor, font=None, alignment=None, formato=None):
+    c = WriteOnlyCell(ws, value=valor)
+    if font is not None:
+        c.font = font
+    if alignment is not None:
+        c.alignment = alignment
+    if formato is not None:
+        c.number_format = formato
+    return c
+
+
+def _largo(valor) -> int:
+    if valor is None:
+        return 0
+    if isinstance(valor, float):
+        return len(f"{valor:,.2f}")
+    return len(str(valor))
+
+
+def exportar_excel(path: str, columnas: list, filas, *, hoja: str = "Reporte",
+                   titulo: str = "", subtitulo: str = "",
+                   etiqueta_total: str | None = None, columna_etiqueta: int = 0,
+                   unir_etiqueta: bool = False) -> int:
+    """
+    Escribe el reporte en 'path' y devuelve la cantidad de filas de datos.
+
+    filas: iterable de tuplas (puede ser un generador que lee de la base).
+    etiqueta_total: si se indica, agrega una fila final con esa etiqueta en
+    'columna_etiqueta' (unida hasta la primera columna sumada si
+    unir_etiqueta) y la suma de las columnas con sumar=True.
+    """
+    n_cols = len(columnas)
+    ultima = get_column_letter(n_cols)
+    filas = iter(filas)
+    muestra = list(islice(filas, MUESTRA_ANCHOS))
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(hoja)
+
+    # ---- Anchos (encabezado + muestra) y formato de hoja: antes de escribir ----
+    largos = [len(c.titulo) for c in columnas]
+    for fila in muestra:
+        for i, v in enumerate(fila):
+            largos[i] = max(largos[i], _largo(v))
+    for i, col in enumerate(columnas):
+        ws.column_dimensions[get_column_letter(i + 1)].width = max(col.ancho_min, min(largos[i] + 2, ANCHO_MAX))
+
+    ws.freeze_panes = "A4"
+    ws.page_setup.orientation = 'landscape'
+    ws.page_setup.paperSize = Worksheet.PAPERSIZE_A4
+    ws.page_setup.fitToWidth = 1
+    ws.page_setup.fitToHeight = 0
+    ws.sheet_properties.pageSetUpPr.fitToPage = True
+    ws.page_margins = PageMargins(left=0.25, right=0.25, top=0.5, bottom=0.5)
+    ws.print_options.horizontalCentered = True
+
+    # ---- Título, subtítulo y encabezados (filas 1 a 3) ----
+    centro = Alignment(horizontal="center", vertical="center")
+    ws.append([_celda(ws, titulo, Font(bold=True, size=12), centro)])
+    ws.append([_celda(ws, subtitulo, Font(italic=True, size=10),
+                      Alignment(horizontal="center", vertical="center", wrap_text=True))])
+    ws.merged_cells.add(f"A1:{ultima}1")
+    ws.merged_cells.add(f"A2:{ultima}2")
+    negrita = Font(bold=True)
+    izquierda = Alignment(horizontal="left", vertical="center")
+    ws.append([_celda(ws, c.titulo, negrita, centro if c.titulo_centrado else izquierda)
+               for c in columnas])
+
+    # ---- Datos ----
+    estilos = [
+        Alignment(horizontal=c.alineacion, vertical="center", indent=c.indent) if c.alineacion else None
+        for c in columnas
+    ]
+    sumadas = [i for i, c in enumerate(columnas) if c.sumar]
+    totales = dict.fromkeys(sumadas, 0.0)
+    n = 0
+    for fila in chain(muestra, filas):
+        ws.append([
+            _celda(ws, v, alignment=estilos[i], formato=columnas[i].formato)
+            if (estilos[i] is not None or columnas[i].formato) else v
+            for i, v in enumerate(fila)
+        ])
+        for i in sumadas:
+            totales[i] += float(fila[i] or 0)
+        n += 1
+
+    ultima_fila = 3 + n
+    # ---- Totales ----
+    if etiqueta_total is not None:
+        ultima_fila += 1
+        fila_total = [None] * n_cols
+        fila_total[columna_etiqueta] = _celda(ws, etiqueta_total, negrita)
+        for i in sumadas:
+            fila_total[i] = _celda(ws, round(totales[i], 2), negrita,
+                                   Alignment(horizontal="right", vertical="center"), FORMATO_IMPORTE)
+        ws.append(fila_total)
+        if unir_etiqueta and sumadas and sumadas[0] - 1 > columna_etiqueta:
+            ws.merged_cells.add(f"{get_column_letter(columna_etiqueta + 1)}{ultima_fila}:"
+                                f"{get_column_letter(sumadas[0])}{ultima_fila}")
+
+    ws.print_area = f"A1:{ultima}{ultima_fila}"
+    ws.auto_filter.ref = f"A3:{ultima}{ultima_fila}"
+    wb.save(path)
+    return n
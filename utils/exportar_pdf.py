@@ -0,0 +1,245 @@
+"""
+utils/exportar_pdf.py
+
+Reportes tabulares a PDF (reportlab) en streaming.
+
+Las filas llegan como tuplas desde un iterable (típicamente
+utils.reportes_consultas.iterar_filas) y se dibujan a medida que llegan:
+el renderer no guarda filas, sólo los totales.
+
+Para que un reporte de 100.000 filas no se vuelva lento:
+  - La disposición de columnas (x, ancho útil, alineación) se calcula una
+    sola vez, no por fila.
+  - Los anchos de texto salen de una tabla de anchos por carácter de la
+    fuente, armada la primera vez que aparece cada carácter (Helvetica no
+    tiene kerning: el ancho de un texto es la suma de sus caracteres).
+  - Cada página es un único objeto de texto PDF; no se abre uno por celda
+    como hace drawString.
+
+Lo que sí crece con el reporte es el contenido de las páginas, que reportlab
+retiene hasta el save() (unos 400 bytes por fila); las páginas se escriben
+comprimidas en el archivo (pageCompression).
+"""
+
+from dataclasses import dataclass
+from typing import Callable
+
+from reportlab.lib.pagesizes import letter, landscape
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfgen import canvas
+
+FUENTE = "Helvetica"
+FUENTE_NEGRITA = "Helvetica-Bold"
+FUENTE_SUBTITULO = "Helvetica-Oblique"
+TAM_TITULO = 12
+TAM_SUBTITULO = 9
+TAM_ENCABEZADO = 8
+TAM_FILA = 7
+ALTO_FILA = 11
+MARGEN_IZQ = 40
+MARGEN_DER = 40
+MARGEN_SUP = 50
+MARGEN_INF = 40
+ELIPSIS = "…"
+
+
+def importe(valor) -> str:
+    return f"$ {float(valor or 0):,.2f}"
+
+
+def entero(valor) -> str:
+    return str(int(valor or 0))
+
+
+@dataclass(frozen=True)
+class ColumnaPDF:
+    titulo: str
+    ancho: float                           # proporcional: se escala al ancho útil de la página
+    alineacion: str = "left"               # 'left' / 'right'
+    titulo_centrado: bool = False
+    sumar: bool = False                    # acumular para la fila de totales
+    formato: Callable | None = None        # valor -> texto (por defecto str)
+    aire: float = 4                        # espacio libre a la derecha de la columna
+
+
+class MetricaFuente:
+    """Anchos de texto para una fuente y tamaño, con caché por carácter."""
+
+    def __init__(self, fuente: str, tam: float):
+        self.fuente = fuente
+        self.tam = tam
+        self._anchos = {}
+        # El carácter más ancho de la fuente: si len(texto) * esto entra, no hace falta medir
+        self.maximo = max(pdfmetrics.stringWidth(ch, fuente, tam) for ch in "W@MmÑ")
+
+    def ancho(self, texto: str) -> float:
+        anchos = self._anchos
+        total = 0.0
+        for ch in texto:
+            w = anchos.get(ch)
+            if w is None:
+                w = anchos[ch] = pdfmetrics.stringWidth(ch, self.fuente, self.tam)
+            total += w
+        return total
+
+    def recortar(self, texto: str, disponible: float) -> str:
+        """Recorta el texto con '…' para que entre en 'disponible' puntos."""
+        if len(texto) * self.maximo <= disponible:
+            return texto
+        anchos = self._anchos
+        limite = disponible - self.ancho(ELIPSIS)
+        total, corte = 0.0, None
+        for i, ch in enumerate(texto):
+            w = anchos.get(ch)
+            if w is None:
+                w = anchos[ch] = pdfmetrics.stringWidth(ch, self.fuente, self.tam)
+            total += w
+            if corte is None and total > limite:
+                corte = i
+            if total > disponible:
+                return texto[:corte] + ELIPSIS
+        return texto
+
+    def envolver(self, texto: str, disponible: float) -> list:
+        """Parte el texto en líneas que entren en 'disponible' (corta por palabras)."""
+        lineas, linea = [], ""
+        for palabra in texto.split():
+            prueba = f"{linea} {palabra}".strip()
+            if not linea or self.ancho(prueba) <= disponible:
+                linea = prueba
+            else:
+                lineas.append(linea)
+                linea = palabra
+        if linea:
+            lineas.append(linea)
+        return lineas
+
+
+@dataclass(frozen=True)
+class _Columna:
+    x: float              # borde izquierdo
+    derecha: float        # borde derecho del texto (x + ancho - aire)
+    disponible: float
+    alineacion: str
+    formato: Callable
+
+
+def _disponer(columnas: list, ancho_pagina: float) -> list:
+    util = ancho_pagina - MARGEN_IZQ - MARGEN_DER
+    escala = util / float(sum(c.ancho for c in columnas))
+    dispuestas, x = [], MARGEN_IZQ
+    for c in columnas:
+        w = c.ancho * escala
+        dispuestas.append(_Columna(x, x + w - c.aire, max(w - c.aire, 1), c.alineacion, c.formato or str))
+        x += w
+    return dispuestas
+
+
+def exportar_pdf(path: str, columnas: list, filas, *, titulo: str = "", subtitulo: str = "",
+                 apaisado: bool = False, etiqueta_total: str | None = None,
+                 columna_etiqueta: int = 0) -> int:
+    """
+    Escribe el reporte en 'path' y devuelve la cantidad de filas dibujadas.
+
+    filas: iterable de tuplas en el orden de 'columnas' (puede ser un
+    generador que lee de la base). Título, subtítulo y encabezados se
+    repiten en cada página. etiqueta_total: agrega al final una fila con
+    esa etiqueta en 'columna_etiqueta' y la suma de las columnas con sumar=True.
+    """
+    tam_pagina = landscape(letter) if apaisado else letter
+    ancho, alto = tam_pagina
+    c = canvas.Canvas(path, pagesize=tam_pagina, pageCompression=1)
+
+    dispuestas = _disponer(columnas, ancho)
+    m_fila = MetricaFuente(FUENTE, TAM_FILA)
+    m_enc = MetricaFuente(FUENTE, TAM_ENCABEZADO)
+    m_total = MetricaFuente(FUENTE_NEGRITA, TAM_ENCABEZADO)
+    m_sub = MetricaFuente(FUENTE_SUBTITULO, TAM_SUBTITULO)
+    lineas_sub = m_sub.envolver(subtitulo, ancho - MARGEN_IZQ - MARGEN_DER) if subtitulo else []
+
+    # Encabezados de columna: posiciones fijas, calculadas una vez
+    encabezados = []
+    for col, d in zip(columnas, dispuestas):
+        texto = m_enc.recortar(col.titulo, d.disponible)
+        if col.titulo_centrado:
+            x = d.x + (d.derecha - d.x - m_enc.ancho(texto)) / 2.0
+        elif d.alineacion == "right":
+            x = d.derecha - m_enc.ancho(texto)
+        else:
+            x = d.x
+        encabezados.append((x, texto))
+
+    y_encabezado = alto - MARGEN_SUP - 15 - ALTO_FILA * len(lineas_sub) - 5
+    y_primera = y_encabezado - 20
+    pagina = [0]
+
+    def cabecera():
+        pagina[0] += 1
+        c.setFont(FUENTE_NEGRITA, TAM_TITULO)
+        c.drawString(MARGEN_IZQ, alto - MARGEN_SUP, titulo)
+        t = c.beginText()
+        t.setFont(FUENTE_SUBTITULO, TAM_SUBTITULO)
+        y = alto - MARGEN_SUP - 15
+        for linea in lineas_sub:
+            t.setTextOrigin(MARGEN_IZQ, y)
+            t.textOut(linea)
+            y -= ALTO_FILA
+        t.setFont(FUENTE, TAM_ENCABEZADO)
+        for x, texto in encabezados:
+            t.setTextOrigin(x, y_encabezado)
+            t.textOut(texto)
+        t.setFont(FUENTE, TAM_FILA)
+        t.setTextOrigin(ancho / 2.0 - 15, MARGEN_INF / 2.0)
+        t.textOut(f"Página {pagina[0]}")
+        c.drawText(t)
+        c.line(MARGEN_IZQ, y_encabezado - 8, ancho - MARGEN_DER, y_encabezado - 8)
+
+    def celda(t, d, texto, metrica, y):
+        if d.alineacion == "right":
+            t.setTextOrigin(d.derecha - metrica.ancho(texto), y)
+        else:
+            t.setTextOrigin(d.x, y)
+        t.textOut(texto)
+
+    sumadas = [i for i, col in enumerate(columnas) if col.sumar]
+    totales = dict.fromkeys(sumadas, 0.0)
+    n = 0
+
+    cabecera()
+    y = y_primera
+    t = c.beginText()
+    t.setFont(FUENTE, TAM_FILA)
+    for fila in filas:
+        if y < MARGEN_INF:
+            c.drawText(t)
+            c.showPage()
+            cabecera()
+            y = y_primera
+            t = c.beginText()
+            t.setFont(FUENTE, TAM_FILA)
+        for d, valor in zip(dispuestas, fila):
+            if valor is None or valor == "":
+                continue
+            celda(t, d, m_fila.recortar(d.formato(valor), d.disponible), m_fila, y)
+        for i in sumadas:
+            totales[i] += float(fila[i] or 0)
+        y -= ALTO_FILA
+        n += 1
+    c.drawText(t)
+
+    if etiqueta_total is not None:
+        if y < MARGEN_INF:
+            c.showPage()
+            cabecera()
+            y = y_primera
+        t = c.beginText()
+        t.setFont(FUENTE_NEGRITA, TAM_ENCABEZADO)
+        t.setTextOrigin(dispuestas[columna_etiqueta].x, y)
+        t.textOut(etiqueta_total)
+        for i in sumadas:
+            d = dispuestas[i]
+            celda(t, d, d.formato(round(totales[i], 2)), m_total, y)
+        c.drawText(t)
+
+    c.save()
+    return n
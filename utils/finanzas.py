@@ -13,6 +13,12 @@ DIAS_MES = 30
 DIAS_SEMANA = 7
 DIAS_DIA = 1
 
+DIAS_POR_PLAN = {
+    "mensual": DIAS_MES,
+    "semanal": DIAS_SEMANA,
+    "diaria": DIAS_DIA,
+}
+
 
 def tna_desde_tem(tem: float) -> float:
     """TNA nominal anual (simple) a partir de la TEM."""
@@ -54,14 +60,25 @@ def tasa_efectiva_por_plan(tem: float, plan: str) -> float:
     Tasa efectiva del periodo segun el plan de pago ('mensual',
     'semanal', 'diaria'), derivada de la TEM base del producto.
     """
-    dias = {
-        "mensual": DIAS_MES,
-        "semanal": DIAS_SEMANA,
-        "diaria": DIAS_DIA,
-    }.get(plan)
+    return tasa_efectiva_periodo(tem, _dias_plan(plan))
+
+
+def tem_desde_tasa_periodo(tasa_periodo: float, plan: str) -> float:
+    """
+    Inversa de tasa_efectiva_por_plan(): TEM equivalente a una tasa
+    efectiva por periodo del plan de pago indicado.
+    """
+    dias = _dias_plan(plan)
+    if dias == DIAS_MES:
+        return tasa_periodo
+    return (1 + tasa_periodo) ** (DIAS_MES / dias) - 1
+
+
+def _dias_plan(plan: str) -> int:
+    dias = DIAS_POR_PLAN.get(plan)
     if dias is None:
         raise ValueError(f"Plan de pago desconocido: {plan!r}")
-    return tasa_efectiva_periodo(tem, dias)
+    return dias
 
 
 def calcular_cuota_frances(monto: float, tasa_periodo: float, n_cuotas: int) -> float:
@@ -90,3 +107,41 @@ def calcular_ptf_frances(monto: float, tasa_periodo: float, n_cuotas: int) -> fl
     """Precio Total Financiado = cuota_frances * n_cuotas."""
     cuota = calcular_cuota_frances(monto, tasa_periodo, n_cuotas)
     return cuota * n_cuotas
+
+
+def tasa_desde_cuota(monto: float, cuota: float, n_cuotas: int,
+                     tolerancia: float = 1e-12, max_iter: int = 100) -> float:
+    """
+    Inversa de calcular_cuota_frances(): recupera la tasa efectiva por
+    periodo implicita en una cuota fija (por ejemplo, cuando el vendedor
+    carga el Valor de Cuota a mano).
+
+    Usa Newton sobre f(i) = cuota_frances(i) - cuota partiendo de
+    i0 = cuota / monto. f es creciente y convexa, y en i0 ya es positiva,
+    asi que las iteraciones bajan monotonamente hacia la raiz.
+
+    Si cuota * n_cuotas == monto la tasa es 0. Si es menor no existe una
+    tasa no negativa y se lanza ValueError.
+    """
+    if monto <= 0:
+        raise ValueError("El monto debe ser mayor que 0.")
+    if n_cuotas <= 0:
+        raise ValueError("La cantidad de cuotas debe ser mayor que 0.")
+    total = cuota * n_cuotas
+    if abs(total - monto) <= tolerancia * monto:
+        return 0.0
+    if total < monto:
+        raise ValueError("La suma de las cuotas es menor que el monto: no hay tasa posible.")
+
+    n = n_cuotas
+    i = cuota / monto
+    for _ in range(max_iter):
+        v = (1 + i) ** -n
+        d = 1 - v
+        f = monto * i / d - cuota
+        df = monto / d - monto * i * n * v / ((1 + i) * d * d)
+        paso = f / df
+        i -= paso
+        if abs(paso) <= tolerancia * max(1.0, i):
+            break
+    return i
@@ -0,0 +1,185 @@
+"""
+utils/finanzas_lote.py
+
+Motor vectorizado (NumPy) del sistema frances para calcular en lote los
+cronogramas de miles de ventas a la vez.
+
+Es la contraparte "en lote" de utils/finanzas.py: usa las mismas
+convenciones (tasas como decimales, 0.10 = 10%) y los mismos planes de
+pago, pero recibe arreglos en lugar de escalares. Los resultados
+coinciden con calcular_cuota_frances() venta por venta.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from utils.finanzas import DIAS_MES, DIAS_POR_PLAN
+
+
+@dataclass
+class CronogramaLote:
+    """
+    Cronogramas de un lote de ventas.
+
+    'cuota' tiene una fila por venta. Las matrices tienen forma
+    (ventas, max_cuotas): la columna k corresponde a la cuota k+1.
+    Los periodos que exceden el n_cuotas de cada venta quedan en 0 y
+    'mascara' los marca como False.
+    """
+    cuota: np.ndarray
+    interes: np.ndarray
+    amortizacion: np.ndarray
+    saldo: np.ndarray
+    mascara: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.cuota)
+
+    def cronograma(self, idx: int) -> list[dict]:
+        """Cronograma de una sola venta del lote, como lista de dicts."""
+        n = int(self.mascara[idx].sum())
+        return [
+            {
+                "numero": k + 1,
+                "cuota": float(self.cuota[idx]),
+                "interes": float(self.interes[idx, k]),
+                "amortizacion": float(self.amortizacion[idx, k]),
+                "saldo": float(self.saldo[idx, k]),
+            }
+            for k in range(n)
+        ]
+
+
+def tasas_efectivas_por_plan(tems, planes) -> np.ndarray:
+    """
+    Version vectorizada de tasa_efectiva_por_plan(): convierte un arreglo
+    de TEM en la tasa efectiva de cada periodo segun su plan de pago.
+    """
+    tems = np.asarray(tems, dtype=float)
+    return (1 + tems) ** (_dias_por_fila(planes, tems.shape) / DIAS_MES) - 1
+
+
+def _dias_por_fila(planes, forma) -> np.ndarray:
+    planes = np.broadcast_to(np.asarray(planes, dtype=object), forma)
+    desconocidos = ~np.isin(planes, list(DIAS_POR_PLAN))
+    if desconocidos.any():
+        raise ValueError(f"Plan de pago desconocido: {planes[desconocidos][0]!r}")
+    dias = np.empty(forma, dtype=float)
+    for plan, valor in DIAS_POR_PLAN.items():
+        dias[planes == plan] = valor
+    return dias
+
+
+def _validar(montos, tasas, n_cuotas):
+    montos = np.asarray(montos, dtype=float)
+    tasas = np.asarray(tasas, dtype=float)
+    n_cuotas = np.asarray(n_cuotas)
+    montos, tasas, n_cuotas = np.broadcast_arrays(montos, tasas, n_cuotas)
+    if montos.ndim != 1:
+        raise ValueError("Se esperan arreglos de una dimension (una fila por venta).")
+    if (montos <= 0).any():
+        raise ValueError("El monto debe ser mayor que 0.")
+    if (n_cuotas <= 0).any():
+        raise ValueError("La cantidad de cuotas debe ser mayor que 0.")
+    return montos, tasas, n_cuotas.astype(np.int64)
+
+
+def calcular_cuotas_frances(montos, tasas_periodo, n_cuotas) -> np.ndarray:
+    """
+    Version vectorizada de calcular_cuota_frances(): una cuota fija por
+    venta. Las ventas con tasa 0 devuelven monto / n_cuotas.
+    """
+    montos, tasas, n = _validar(montos, tasas_periodo, n_cuotas)
+    sin_interes = tasas == 0
+    i = np.where(sin_interes, 1.0, tasas)  # evita 0/0 en las filas sin interes
+    cuota = montos * i / (1 - (1 + i) ** -n)
+    return np.where(sin_interes, montos / n, cuota)
+
+
+def cronograma_frances_lote(montos, tasas_periodo, n_cuotas, planes=None) -> CronogramaLote:
+    """
+    Calcula los cronogramas franceses completos de un lote de ventas.
+
+    Si se pasa 'planes', 'tasas_periodo' se interpreta como la TEM de cada
+    venta y se convierte a la tasa de su plan con tasas_efectivas_por_plan().
+    Sin 'planes', las tasas ya deben estar expresadas por periodo.
+
+    El saldo de cada periodo se obtiene en forma cerrada:
+        saldo_k = monto * (1+i)^k - cuota * ((1+i)^k - 1) / i
+    asi que no hay bucles por cuota ni por venta.
+    """
+    if planes is not None:
+        tasas_periodo = tasas_efectivas_por_plan(tasas_periodo, planes)
+    montos, tasas, n = _validar(montos, tasas_periodo, n_cuotas)
+    cuota = calcular_cuotas_frances(montos, tasas, n)
+
+    max_n = int(n.max()) if n.size else 0
+    k = np.arange(1, max_n + 1)[None, :]
+    mascara = k <= n[:, None]
+
+    i = tasas[:, None]
+    sin_interes = i == 0
+    i_seguro = np.where(sin_interes, 1.0, i)
+    factor = (1 + i_seguro) ** k
+    saldo = montos[:, None] * factor - cuota[:, None] * (factor - 1) / i_seguro
+    saldo = np.where(sin_interes, montos[:, None] - cuota[:, None] * k, saldo)
+    # La ultima cuota deja saldo 0 exacto (sin residuos de punto flotante)
+    saldo = np.where(k == n[:, None], 0.0, saldo)
+
+    saldo_anterior = np.concatenate([montos[:, None], saldo[:, :-1]], axis=1)
+    interes = saldo_anterior * i
+    amortizacion = cuota[:, None] - interes
+
+    return CronogramaLote(
+        cuota=cuota,
+        interes=np.where(mascara, interes, 0.0),
+        amortizacion=np.where(mascara, amortizacion, 0.0),
+        saldo=np.where(mascara, saldo, 0.0),
+        mascara=mascara,
+    )
+
+
+def tasas_desde_cuotas(montos, cuotas, n_cuotas,
+                       tolerancia: float = 1e-12, max_iter: int = 100) -> np.ndarray:
+    """
+    Version vectorizada de tasa_desde_cuota(): tasa efectiva por periodo
+    implicita en la cuota de cada venta, con Newton sobre todo el lote.
+
+    Pensada para auditorias: en lugar de lanzar ValueError, las filas sin
+    solucion (monto <= 0, n_cuotas <= 0 o cuota * n < monto) devuelven NaN.
+    """
+    montos, cuotas, n = np.broadcast_arrays(
+        np.asarray(montos, dtype=float),
+        np.asarray(cuotas, dtype=float),
+        np.asarray(n_cuotas, dtype=float),
+    )
+    tasas = np.full(montos.shape, np.nan)
+    validas = (montos > 0) & (n > 0) & np.isfinite(cuotas)
+    total = np.where(validas, cuotas * n, 0.0)
+    sin_interes = validas & (np.abs(total - montos) <= tolerancia * np.abs(montos))
+    tasas[sin_interes] = 0.0
+
+    pend = validas & ~sin_interes & (total > montos)
+    m, c, nn = montos[pend], cuotas[pend], n[pend]
+    i = c / m
+    activas = np.ones(i.shape, dtype=bool)
+    for _ in range(max_iter):
+        if not activas.any():
+            break
+        ia, ma, ca, na = i[activas], m[activas], c[activas], nn[activas]
+        v = (1 + ia) ** -na
+        d = 1 - v
+        f = ma * ia / d - ca
+        df = ma / d - ma * ia * na * v / ((1 + ia) * d * d)
+        paso = f / df
+        i[activas] = ia - paso
+        activas[activas] = np.abs(paso) > tolerancia * np.maximum(1.0, ia - paso)
+    tasas[pend] = i
+    return tasas
+
+
+def tems_desde_tasas_periodo(tasas_periodo, planes) -> np.ndarray:
+    """Version vectorizada de tem_desde_tasa_periodo()."""
+    tasas = np.asarray(tasas_periodo, dtype=float)
+    return (1 + tasas) ** (DIAS_MES / _dias_por_fila(planes, tasas.shape)) - 1
@@ -1,13 +1,29 @@
 # utils/permisos.py
+import threading
+import time
+from dataclasses import dataclass, field, replace
 from typing import Optional
+
+from sqlalchemy import select
+
 from database import get_session
-from models import Permiso, Usuario
+from models import Permiso, Usuario, Rol, UsuarioPermiso
+
+# Foto de permisos por usuario: cada chequeo (el menú principal hace decenas
+# por pantalla) se resuelve en memoria. La foto se arma desde la base y se
+# descarta a los TTL_SEGUNDOS o cuando FormPermisos guarda cambios
+# (invalidar_permisos), así un cambio de permisos llega a la sesión abierta.
+TTL_SEGUNDOS = 60
+
+_fotos = {}
+_lock = threading.Lock()
+
 
 # Modo compatibilidad: si aun no hay permisos cargados en la base, no
-# bloquear la UI. IMPORTANTE: esto se evalua en CADA chequeo (no una sola
-# vez al importar el modulo), para que un estado transitorio al arrancar
-# la app (ej. base recien creada, o un error puntual de conexion) no deje
-# la aplicacion entera en modo "sin restricciones" durante toda la sesion.
+# bloquear la UI. Se vuelve a evaluar con cada foto (no una sola vez al
+# importar el modulo), para que un estado transitorio al arrancar la app
+# (ej. base recien creada, o un error puntual de conexion) no deje la
+# aplicacion entera en modo "sin restricciones" durante toda la sesion.
 def _modo_compatibilidad() -> bool:
     try:
         with get_session() as _s:
@@ -35,18 +51,104 @@ def es_admin(usuario: Usuario) -> bool:
     except Exception:
         return False
 
+@dataclass(frozen=True)
+class FotoPermisos:
+    """Permisos de un usuario ya resueltos: admin, compatibilidad y nombres."""
+    admin: bool
+    compatibilidad: bool
+    nombres: frozenset                 # nombres exactos
+    minusculas: tuple                  # los mismos, en minúscula (tiene_permiso_match)
+    vence: float = 0.0
+    _matches: dict = field(default_factory=dict, compare=False, repr=False)
+
+    @property
+    def sin_restricciones(self) -> bool:
+        return self.admin or self.compatibilidad
+
+    def permite(self, nombre_permiso: str) -> bool:
+        return self.sin_restricciones or nombre_permiso in self.nombres
+
+    def permite_alguno(self, tokens: tuple) -> bool:
+        if self.sin_restricciones:
+            return True
+        r = self._matches.get(tokens)
+        if r is None:
+            want = [t.lower() for t in tokens if t]
+            r = self._matches[tokens] = any(t in up for up in self.minusculas for t in want)
+        return r
+
+
+def _armar_foto(rol_nombre, nombres, compatibilidad, vence=0.0) -> FotoPermisos:
+    nombres = [n or "" for n in nombres]
+    admin = (rol_nombre or "").strip() in ADMIN_ROLES or ADMIN_WILDCARD_PERMISSION in nombres
+    return FotoPermisos(admin, compatibilidad, frozenset(nombres), tuple(n.lower() for n in nombres), vence)
+
+
+def _foto_en_memoria(usuario) -> FotoPermisos:
+    """Foto desde el objeto tal como está (usuarios sin id o si la base no responde)."""
+    try:
+        rol = getattr(usuario, "rol", None)
+        rol_nombre = rol.nombre if rol else None
+        nombres = [p.nombre for p in getattr(usuario, "permisos", []) or []]
+    except Exception:
+        rol_nombre, nombres = None, []
+    foto = _armar_foto(rol_nombre, nombres, False)
+    return foto if foto.admin else replace(foto, compatibilidad=_modo_compatibilidad())
+
+
+def foto_permisos(usuario: Usuario) -> FotoPermisos:
+    """
+    Foto vigente de los permisos del usuario. La primera vez (y al vencer)
+    lee de la base su rol y sus permisos; después no hace consultas.
+    """
+    uid = getattr(usuario, "id", None) if usuario else None
+    if uid is None:
+        return _foto_en_memoria(usuario) if usuario else _armar_foto(None, [], False)
+    ahora = time.monotonic()
+    with _lock:
+        foto = _fotos.get(uid)
+    if foto is not None and foto.vence > ahora:
+        return foto
+    try:
+        with get_session() as s:
+            rol_nombre = s.execute(
+                select(Rol.nombre).select_from(Usuario)
+                .outerjoin(Rol, Rol.id == Usuario.rol_id)
+                .where(Usuario.id == uid)
+            ).scalar()
+            nombres = s.execute(
+                select(Permiso.nombre)
+                .join(UsuarioPermiso, UsuarioPermiso.permiso_id == Permiso.id)
+                .where(UsuarioPermiso.usuario_id == uid)
+            ).scalars().all()
+            foto = _armar_foto(rol_nombre, nombres, False, ahora + TTL_SEGUNDOS)
+            # Si el COUNT falla, se sale por el except: el fail-open no queda cacheado
+            if not foto.admin and s.query(Permiso).count() == 0:
+                foto = replace(foto, compatibilidad=True)
+    except Exception:
+        return _foto_en_memoria(usuario)   # sin cachear: se reintenta en el próximo chequeo
+    with _lock:
+        _fotos[uid] = foto
+    return foto
+
+
+def invalidar_permisos(usuario_id: Optional[int] = None) -> None:
+    """Descarta la foto de un usuario (o todas): el próximo chequeo relee la base."""
+    with _lock:
+        if usuario_id is None:
+            _fotos.clear()
+        else:
+            _fotos.pop(usuario_id, None)
+
+
 def tiene_permiso(usuario: Usuario, nombre_permiso: str) -> bool:
     """
     - Admin => True siempre.
     - Compatibilidad: si no hay permisos en DB, True (no romper UI).
     - Caso normal: True si el usuario posee el permiso exacto.
     """
-    if es_admin(usuario):
-        return True
-    if _modo_compatibilidad():
-        return True
     try:
-        return any((p.nombre == nombre_permiso) for p in getattr(usuario, "permisos", []) or [])
+        return foto_permisos(usuario).permite(nombre_permiso)
     except Exception:
         return False
 
@@ -80,18 +182,8 @@ def tiene_permiso_match(usuario: Usuario, *tokens: str) -> bool:
     - Ejemplo: tokens ("cargar_cliente", "0010") => True si el permiso se llama
       "0010 (crear) clientes" o "cargar_cliente" o "ventas.cargar_cliente", etc.
     """
-    if es_admin(usuario):
-        return True
-    if _modo_compatibilidad():
-        return True
     try:
-        user_perms = [(p.nombre or "").lower() for p in getattr(usuario, "permisos", []) or []]
-        want = [t.lower() for t in tokens if t]
-        for up in user_perms:
-            for t in want:
-                if t in up:
-                    return True
-        return False
+        return foto_permisos(usuario).permite_alguno(tokens)
     except Exception:
         return False
 
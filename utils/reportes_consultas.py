@@ -0,0 +1,323 @@
+"""
+utils/reportes_consultas.py
+
+Consultas de FormConsultas como select() de columnas (sin objetos ORM).
+
+FormConsultas resuelve los filtros de la pantalla en un CriterioConsulta
+(ids ya elegidos, fechas, textos) y este módulo arma la sentencia. La misma
+sentencia alimenta la tabla en pantalla y las exportaciones, que la
+recorren en streaming con un cursor del lado del servidor (iterar_filas):
+un reporte de un año no se materializa entero en memoria. La pantalla
+muestra sólo las primeras MAX_FILAS_PANTALLA filas (vista_previa), con los
+totales de todo el reporte.
+
+Cada fila del reporte es una tupla en el orden de COLUMNAS_VENTAS o
+COLUMNAS_COBROS, con los importes como float y los textos ya armados.
+
+Modo resumen (CriterioConsulta.agrupar): en lugar del detalle, la base
+devuelve una fila por día, producto, personal o calificación con GROUP BY
+(cantidad, monto, PTF, cobrado y pendiente). Es lo que suelen mirar los
+gerentes y no trae cada venta por la red para sumarla acá.
+"""
+
+from dataclasses import dataclass
+from datetime import date
+
+from sqlalchemy import select, func, case
+from sqlalchemy.orm import aliased
+
+from database import engine
+from models import Venta, Cliente, Producto, Cobro, Cuota, Usuario, Personal
+
+TIPO_COBROS = "Cobros por fecha"
+LOTE = 2000   # filas por viaje al servidor al recorrer en streaming
+MAX_FILAS_PANTALLA = 1000   # filas que se muestran en la tabla; se exportan todas
+
+COLUMNAS_VENTAS = ["Fecha", "Cliente", "Producto", "Monto", "Cuotas", "PTF", "Estado", "Calif. Cliente"]
+COLUMNAS_COBROS = ["Fecha", "Venta #", "Cliente", "Cuota", "Monto", "Tipo", "Método", "Lugar", "Comprobante", "Usuario"]
+
+# Resumen: la primera columna es el grupo (su título es la agrupación elegida)
+AGRUPACIONES = ("Día", "Producto", "Personal", "Calificación")
+COLUMNAS_RESUMEN_VENTAS = ["Ventas", "Monto", "PTF", "Cobrado", "Pendiente"]
+COLUMNAS_RESUMEN_COBROS = ["Cobros", "Monto"]
+
+_CAMPO_PERSONAL = {
+    "Coordinador": Venta.coordinador_id,
+    "Vendedor": Venta.vendedor_id,
+    "Cobrador": Venta.cobrador_id,
+}
+
+
+@dataclass(frozen=True)
+class VistaPrevia:
+    """Lo que muestra la pantalla: las primeras filas y los totales del reporte entero."""
+    filas: list
+    total_filas: int
+    totales: tuple   # suma de cada columna numérica; None en las de texto
+
+    @property
+    def recortada(self) -> bool:
+        return self.total_filas > len(self.filas)
+
+
+@dataclass(frozen=True)
+class CriterioConsulta:
+    """Filtros ya resueltos de una consulta (lo que el usuario eligió al buscar)."""
+    tipo: str
+    inicio: date
+    fin: date
+    cliente_id: int | None = None
+    producto_id: int | None = None
+    producto_texto: str | None = None
+    calificacion: str | None = None
+    rol: str | None = None
+    personal_id: int | None = None
+    descripcion_filtro: str = ""   # para el subtítulo, ej. ' | Producto: "Moto"'
+    agrupar: str | None = None     # una de AGRUPACIONES: modo resumen
+
+    @property
+    def es_cobros(self) -> bool:
+        return self.tipo == TIPO_COBROS
+
+    @property
+    def columnas(self) -> list:
+        if self.agrupar:
+            return [self.agrupar] + (COLUMNAS_RESUMEN_COBROS if self.es_cobros else COLUMNAS_RESUMEN_VENTAS)
+        return COLUMNAS_COBROS if self.es_cobros else COLUMNAS_VENTAS
+
+    @property
+    def rol_personal(self) -> str:
+        """Rol por el que se agrupa 'Personal': el del filtro, o el natural del reporte."""
+        return self.rol or ("Cobrador" if self.es_cobros else "Vendedor")
+
+    def periodo(self) -> str:
+        return f"Período: {self.inicio:%Y-%m-%d} a {self.fin:%Y-%m-%d}"
+
+    def subtitulo(self) -> str:
+        resumen = ""
+        if self.agrupar:
+            por = f"{self.agrupar} ({self.rol_personal})" if self.agrupar == "Personal" else self.agrupar
+            resumen = f" | Resumen por {por.lower()}"
+        return f"Consulta: {self.tipo} | {self.periodo()}{self.descripcion_filtro}{resumen}"
+
+
+# ---------- Sentencias ----------
+def sentencia_ventas(c: CriterioConsulta):
+    stmt = (
+        select(
+            Venta.fecha, Cliente.apellidos, Cliente.nombres, Producto.nombre,
+            Venta.monto, Venta.num_cuotas, Venta.ptf, Venta.anulada, Venta.finalizada,
+            Cliente.calificacion,
+        )
+        .outerjoin(Cliente, Cliente.id == Venta.cliente_id)
+        .outerjoin(Producto, Producto.id == Venta.producto_id)
+        .order_by(Venta.fecha, Venta.id)
+    )
+    return _filtrar_ventas(stmt, c)
+
+
+def _filtrar_ventas(stmt, c: CriterioConsulta):
+    """Filtros del tipo de consulta (la sentencia ya tiene Cliente y Producto unidos)."""
+    stmt = stmt.where(Venta.fecha >= c.inicio, Venta.fecha <= c.fin)
+    if c.tipo == "Ventas por cliente":
+        stmt = stmt.where(Venta.cliente_id == c.cliente_id)
+    elif c.tipo == "Ventas por producto":
+        if c.producto_id:
+            stmt = stmt.where(Venta.producto_id == c.producto_id)
+        else:
+            stmt = stmt.where(Producto.nombre.ilike(f"%{c.producto_texto or ''}%"))
+    elif c.tipo == "Ventas por calificación de cliente":
+        if c.calificacion == "Sin Calificación":
+            stmt = stmt.where(Venta.cliente.has(Cliente.calificacion.is_(None)))
+        elif c.calificacion and c.calificacion != "Todas":
+            stmt = stmt.where(Venta.cliente.has(Cliente.calificacion == c.calificacion))
+    elif c.tipo == "Ventas por personal":
+        stmt = stmt.where(_CAMPO_PERSONAL[c.rol] == c.personal_id)
+    elif c.tipo == "Ventas anuladas":
+        stmt = stmt.where(Venta.anulada.is_(True))
+    return stmt
+
+
+def sentencia_cobros(c: CriterioConsulta):
+    return (
+        select(
+            Cobro.fecha, Cobro.venta_id, Cliente.apellidos, Cliente.nombres,
+            Cuota.numero, Cobro.cuota_id, Cobro.monto, Cobro.tipo,
+            Cobro.metodo, Cobro.lugar, Cobro.comprobante, Usuario.nombre,
+        )
+        .join(Venta, Venta.id == Cobro.venta_id)
+        .outerjoin(Cliente, Cliente.id == Venta.cliente_id)
+        .outerjoin(Cuota, Cuota.id == Cobro.cuota_id)
+        .outerjoin(Usuario, Usuario.id == Cobro.registrado_por_id)
+        .where(Cobro.fecha >= c.inicio, Cobro.fecha <= c.fin)
+        .order_by(Cobro.fecha, Cobro.id)
+    )
+
+
+def _claves_grupo(c: CriterioConsulta, fecha):
+    """
+    Columnas por las que se agrupa y los joins extra que necesitan.
+    Devuelve (columnas, unir), donde unir(stmt) agrega los joins.
+    """
+    if c.agrupar == "Día":
+        return [fecha], lambda stmt: stmt
+    if c.agrupar == "Producto":
+        return [Producto.nombre], lambda stmt: stmt
+    if c.agrupar == "Calificación":
+        return [Cliente.calificacion], lambda stmt: stmt
+    if c.agrupar == "Personal":
+        persona = aliased(Personal)
+        campo = _CAMPO_PERSONAL[c.rol_personal]
+        return ([persona.id, persona.apellidos, persona.nombres],
+                lambda stmt: stmt.outerjoin(persona, persona.id == campo))
+    raise ValueError(f"Agrupación desconocida: {c.agrupar}")
+
+
+def _ordenar_grupos(stmt, c: CriterioConsulta, claves, monto):
+    # Por día en orden cronológico; el resto, de mayor a menor monto
+    return stmt.order_by(*claves) if c.agrupar == "Día" else stmt.order_by(monto.desc(), *claves)
+
+
+def sentencia_resumen_ventas(c: CriterioConsulta):
+    # Cobrado y saldo de cada venta, sumados en la base a partir de sus cuotas
+    saldos = (
+        select(
+            Cuota.venta_id,
+            func.sum(func.coalesce(Cuota.monto_pagado, 0)).label("cobrado"),
+            func.sum(Cuota.monto_original - func.coalesce(Cuota.monto_pagado, 0)).label("saldo"),
+        )
+        .group_by(Cuota.venta_id)
+        .subquery()
+    )
+    claves, unir = _claves_grupo(c, Venta.fecha)
+    monto = func.sum(Venta.monto)
+    stmt = (
+        select(
+            *claves,
+            func.count(Venta.id),
+            monto,
+            func.sum(Venta.ptf),
+            func.sum(func.coalesce(saldos.c.cobrado, 0)),
+            # Una venta anulada no tiene nada pendiente de cobro
+            func.sum(case((Venta.anulada.is_(True), 0), else_=func.coalesce(saldos.c.saldo, 0))),
+        )
+        .select_from(Venta)
+        .outerjoin(Cliente, Cliente.id == Venta.cliente_id)
+        .outerjoin(Producto, Producto.id == Venta.producto_id)
+        .outerjoin(saldos, saldos.c.venta_id == Venta.id)
+    )
+    stmt = _filtrar_ventas(unir(stmt), c).group_by(*claves)
+    return _ordenar_grupos(stmt, c, claves, monto)
+
+
+def sentencia_resumen_cobros(c: CriterioConsulta):
+    claves, unir = _claves_grupo(c, Cobro.fecha)
+    monto = func.sum(Cobro.monto)
+    stmt = (
+        select(*claves, func.count(Cobro.id), monto)
+        .select_from(Cobro)
+        .join(Venta, Venta.id == Cobro.venta_id)
+        .outerjoin(Cliente, Cliente.id == Venta.cliente_id)
+        .outerjoin(Producto, Producto.id == Venta.producto_id)
+        .where(Cobro.fecha >= c.inicio, Cobro.fecha <= c.fin)
+    )
+    stmt = unir(stmt).group_by(*claves)
+    return _ordenar_grupos(stmt, c, claves, monto)
+
+
+def sentencia(c: CriterioConsulta):
+    if c.agrupar:
+        return sentencia_resumen_cobros(c) if c.es_cobros else sentencia_resumen_ventas(c)
+    return sentencia_cobros(c) if c.es_cobros else sentencia_ventas(c)
+
+
+# ---------- Formato de filas ----------
+def _cliente_txt(apellidos, nombres) -> str:
+    if apellidos is None and nombres is None:
+        return ""
+    return f"{apellidos}, {nombres}"
+
+
+def cuota_txt(numero, cuota_id, tipo) -> str:
+    """Número de cuota, o una etiqueta según el tipo de cobro si no tiene cuota."""
+    if numero is not None:
+        return str(numero)
+    if cuota_id:
+        return str(cuota_id)
+    return {"entrega": "Entrega", "pago_total": "Pago total",
+            "refinanciacion": "Refinanciación"}.get(tipo, "")
+
+
+def fila_venta(r) -> tuple:
+    fecha, ap, no, producto, monto, cuotas, ptf, anulada, finalizada, calif = r
+    estado = "Anulada" if anulada else "Finalizada" if finalizada else "Activa"
+    return (str(fecha or ""), _cliente_txt(ap, no), producto or "", float(monto or 0),
+            int(cuotas or 0), float(ptf or 0), estado, calif or "")
+
+
+def fila_cobro(r) -> tuple:
+    fecha, venta_id, ap, no, numero, cuota_id, monto, tipo, metodo, lugar, comp, usuario = r
+    return (str(fecha or ""), str(venta_id or ""), _cliente_txt(ap, no),
+            cuota_txt(numero, cuota_id, tipo), float(monto or 0), tipo or "",
+            metodo or "", lugar or "", comp or "", usuario or "")
+
+
+def etiqueta_grupo(agrupar: str, claves) -> str:
+    if agrupar == "Día":
+        return str(claves[0] or "")
+    if agrupar == "Producto":
+        return claves[0] or "Sin producto"
+    if agrupar == "Calificación":
+        return claves[0] or "Sin Calificación"
+    _, apellidos, nombres = claves
+    return _cliente_txt(apellidos, nombres) or "Sin asignar"
+
+
+def _formateador(c: CriterioConsulta):
+    if not c.agrupar:
+        return fila_cobro if c.es_cobros else fila_venta
+    n_claves = 3 if c.agrupar == "Personal" else 1
+
+    def fila_resumen(r) -> tuple:
+        cantidad, *importes = r[n_claves:]
+        return (etiqueta_grupo(c.agrupar, r[:n_claves]), int(cantidad or 0),
+                *(float(v or 0) for v in importes))
+    return fila_resumen
+
+
+# ---------- Ejecución ----------
+def iterar_filas(c: CriterioConsulta, lote: int = LOTE):
+    """
+    Recorre el reporte en streaming (cursor del lado del servidor, de a
+    'lote' filas) y va entregando tuplas ya formateadas.
+    """
+    formatear = _formateador(c)
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=lote).execute(sentencia(c))
+        for particion in result.partitions():
+            for r in particion:
+                yield formatear(r)
+
+
+def cargar_filas(c: CriterioConsulta) -> list:
+    """Todas las filas del reporte, en una lista."""
+    return list(iterar_filas(c))
+
+
+def vista_previa(c: CriterioConsulta, limite: int = MAX_FILAS_PANTALLA) -> VistaPrevia:
+    """
+    Recorre el reporte en streaming y guarda sólo las primeras 'limite'
+    filas; del resto cuenta las filas y suma las columnas numéricas, para
+    que la fila de TOTAL de la pantalla sea la del reporte completo.
+    """
+    filas, total_filas, totales = [], 0, None
+    for fila in iterar_filas(c):
+        if totales is None:
+            totales = [0.0 if isinstance(v, (int, float)) else None for v in fila]
+        for i, v in enumerate(fila):
+            if totales[i] is not None:
+                totales[i] += v
+        if total_filas < limite:
+            filas.append(fila)
+        total_filas += 1
+    return VistaPrevia(filas, total_filas, tuple(totales or ()))
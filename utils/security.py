@@ -1,10 +1,30 @@
 import hashlib
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-from passlib.hash import argon2
+from passlib.hash import argon2 as _argon2_base
 
 PEPPER = os.environ.get("APP_PEPPER", "")
 
+# Parámetros de Argon2id. Los defaults son los de passlib; calibrar_argon2.py
+# sugiere valores para que un login tarde lo deseado en el servidor.
+ARGON2_TIME_COST = int(os.environ.get("ARGON2_TIME_COST", "3"))
+ARGON2_MEMORY_KIB = int(os.environ.get("ARGON2_MEMORY_KIB", "65536"))
+ARGON2_PARALLELISM = int(os.environ.get("ARGON2_PARALLELISM", "4"))
+
+# Cuántos hashes corren a la vez; el resto espera en la cola del ejecutor
+ARGON2_CONCURRENCIA = int(os.environ.get("ARGON2_CONCURRENCIA", str(os.cpu_count() or 2)))
+
+argon2 = _argon2_base.using(
+    rounds=ARGON2_TIME_COST,
+    memory_cost=ARGON2_MEMORY_KIB,
+    parallelism=ARGON2_PARALLELISM,
+)
+
+_ejecutor = None
+_ejecutor_lock = threading.Lock()
+
 
 def hash_password(pwd: str) -> str:
     return argon2.hash(pwd + PEPPER)
@@ -23,3 +43,38 @@ def verify_password(pwd: str, stored: str) -> tuple[bool, bool]:
         pass
     legacy = hashlib.sha256(pwd.encode()).hexdigest()
     return (legacy == stored, True if legacy == stored else False)
+
+
+def needs_rehash(stored: str) -> bool:
+    """True si el hash es legacy o Argon2 con parámetros distintos a los actuales."""
+    if not stored.startswith("$argon2"):
+        return True
+    try:
+        return argon2.needs_update(stored)
+    except Exception:
+        return True
+
+
+def verify_and_rehash(pwd: str, stored: str) -> tuple[bool, str | None]:
+    """
+    Verifica y, si la contraseña es correcta pero el hash quedó viejo (legacy o
+    parámetros anteriores), calcula el nuevo. Devuelve (es_valida, hash_nuevo o None).
+    Todo el trabajo de Argon2 de un login en una sola llamada, para el ejecutor.
+    """
+    ok, _legacy = verify_password(pwd, stored)
+    if ok and needs_rehash(stored):
+        return True, hash_password(pwd)
+    return ok, None
+
+
+def hash_executor() -> ThreadPoolExecutor:
+    """
+    Ejecutor compartido para Argon2, con ARGON2_CONCURRENCIA hilos. argon2-cffi
+    libera el GIL, así que los hashes corren en paralelo sin ocupar el hilo que
+    atiende el request (ni la GUI) y sin pasar de esa cantidad a la vez.
+    """
+    global _ejecutor
+    with _ejecutor_lock:
+        if _ejecutor is None:
+            _ejecutor = ThreadPoolExecutor(max_workers=ARGON2_CONCURRENCIA, thread_name_prefix="argon2")
+        return _ejecutor